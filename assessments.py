@@ -0,0 +1,289 @@
+import math
+from fractions import Fraction
+
+import numpy as np
+import pandas as pd
+
+from scoring import (
+    batch_aaa_factor,
+    batch_complaint_score,
+    batch_downrate_score,
+    batch_ontime_score,
+    batch_resolve_rate_score,
+    batch_success_score,
+    round2,
+)
+
+# --------------------------
+# 三项考核的结果表计算（不依赖 streamlit，页面和命令行共用）
+# score_* 返回与页面一致的结果表，最后一行为全市汇总；
+# *_rows / *_city_row 分别计算区县行和全市行，供增量计算复用（见 incremental.py）
+# --------------------------
+
+
+# 各项考核的汇总规则（区县输入键 -> 规则），页面全市行与多级组织汇总（hierarchy.py）共用：
+# "sum" 为求和；("mean", 权重键) 为平均值，参与汇总的单位均提供权重时按权重加权，
+# 否则取简单平均；权重键为 None 时始终取简单平均
+COMPLAINT_ROLLUP = {"投诉次数": "sum", "重复投诉": "sum", "解决率": ("mean", "重复故障数")}
+DELIVERY_ROLLUP = {"及时率(%)": ("mean", "应完成工单数"), "成功率(%)": ("mean", "已结束工单数")}
+DOWNSERVICE_ROLLUP = {"退服率(%)": ("mean", "专线总数"), "AAA中断次数": ("mean", None)}
+
+
+def exact_value(value):
+    """转为可精确加减的值：整数/布尔转为 int，小数按其十进制写法转为分数"""
+    if isinstance(value, (bool, int, np.integer, np.bool_)):
+        return int(value)
+    return Fraction(repr(float(value)))
+
+
+def unit_totals(unit, rules):
+    """一个区县对汇总的贡献（精确值），键为 (输入键, 累加量)"""
+    totals = {}
+    for key, rule in rules.items():
+        value = exact_value(unit[key])
+        totals[(key, "合计")] = value
+        if rule == "sum":
+            continue
+        weight = unit.get(rule[1]) if rule[1] else None
+        missing = weight is None or pd.isna(weight)
+        weight = 0 if missing else exact_value(weight)
+        totals[(key, "个数")] = 1
+        totals[(key, "缺权重")] = int(missing)
+        totals[(key, "权重")] = weight
+        totals[(key, "加权合计")] = weight * value
+    return totals
+
+
+def add_totals(totals, delta, sign=1):
+    """将 delta 按 sign（1 或 -1）累加到 totals，用于按差值增减汇总"""
+    for key, value in delta.items():
+        totals[key] = totals.get(key, 0) + sign * value
+
+
+def sum_totals(units, rules):
+    """精确累加各区县的汇总贡献；合计可按差值增减而不产生浮点误差"""
+    totals = {}
+    for unit in units:
+        add_totals(totals, unit_totals(unit, rules))
+    return totals
+
+
+def is_weighted(totals, key):
+    """该输入的汇总是否按权重加权（各单位均有权重且权重合计大于0）"""
+    return totals.get((key, "缺权重"), 1) == 0 and totals[(key, "权重")] > 0
+
+
+def rollup_weight(units, rules, key):
+    """汇总该输入时实际使用的权重键，取简单平均时返回 None"""
+    rule = rules[key]
+    if rule == "sum" or not rule[1]:
+        return None
+    return rule[1] if is_weighted(sum_totals(units, {key: rule}), key) else None
+
+
+def rollup_mean(totals, key):
+    """由精确合计求平均值（加权或简单平均），返回分数"""
+    if is_weighted(totals, key):
+        return Fraction(totals[(key, "加权合计")]) / totals[(key, "权重")]
+    return Fraction(totals[(key, "合计")]) / totals[(key, "个数")]
+
+
+def round_half_up2(value, denominator=None):
+    """精确值四舍五入保留两位小数
+
+    合计按差值增减时仍保持精确，平均值不受累加顺序和浮点误差影响。
+    与早期版本的 round(np.mean(...), 2) 不同：浮点平均值在 .xx5 处常略小于真实值（如 90.00、90.01
+    的平均值 90.005 存为 90.00499…，按浮点取整得 90.00），此处按精确值进位得 90.01，个别全市值因此相差 0.01。
+    给出 denominator 时 value、denominator 为整数（数组），按 value / denominator 个 0.01
+    （如以 0.01 为单位的加权合计除以权重合计）用整数运算批量取整，结果与逐个按分数计算一致。
+    """
+    if denominator is None:
+        return math.floor(Fraction(value) * 100 + Fraction(1, 2)) / 100
+    value = np.asarray(value, dtype=np.int64)
+    denominator = np.asarray(denominator, dtype=np.int64)
+    return np.floor_divide(2 * value + denominator, 2 * denominator) / 100
+
+
+def with_city_row(rows, city):
+    """在各区县结果行后追加全市行"""
+    return pd.concat([rows, pd.DataFrame([city])], ignore_index=True)
+
+
+def complaint_units(district_params, district_data):
+    """合并投诉数据与各区县挑战值/基准值，返回 {区县: 输入}（不含全市）"""
+    return {d: {**district_data[d], **district_params[d]} for d in district_data}
+
+
+def complaint_rows(units, resolve_rate_base, resolve_rate_challenge):
+    """投诉及重复故障管理：计算各区县得分行（不含全市）"""
+    names = list(units)
+    complaints = np.array([units[d]["投诉次数"] for d in names], dtype=np.int64)
+    repeated = np.array([bool(units[d]["重复投诉"]) for d in names], dtype=bool)
+    rates = np.array([units[d]["解决率"] for d in names], dtype=np.float64)
+    challenge = np.array([units[d]["挑战值"] for d in names], dtype=np.int64)
+    base = np.array([units[d]["基准值"] for d in names], dtype=np.int64)
+
+    complaint_scores = batch_complaint_score(complaints, challenge, base, has_repeated=repeated)
+    resolve_scores = batch_resolve_rate_score(rates, resolve_rate_base, resolve_rate_challenge)
+    return pd.DataFrame({
+        "区县": names,
+        "投诉次数": complaints,
+        "是否重复投诉": ["是" if r else "否" for r in repeated],
+        "解决率(%)": rates,
+        "投诉得分": complaint_scores,
+        "解决率得分": resolve_scores,
+        "总分": round2(complaint_scores + resolve_scores),
+    })
+
+
+def complaint_city_row(totals, resolve_rate_base, resolve_rate_challenge, city_params):
+    """投诉及重复故障管理：由各区县合计计算全市行（全市忽略重复投诉）"""
+    total_complaints = int(totals[("投诉次数", "合计")])
+    avg_resolve_rate = round_half_up2(rollup_mean(totals, "解决率"))
+    city_complaint_score = float(batch_complaint_score(
+        total_complaints, city_params["挑战值"], city_params["基准值"], is_city=True
+    ))
+    city_resolve_score = float(batch_resolve_rate_score(avg_resolve_rate, resolve_rate_base, resolve_rate_challenge))
+    return {
+        "区县": "全市",
+        "投诉次数": total_complaints,
+        "是否重复投诉": "是" if totals[("重复投诉", "合计")] > 0 else "否",
+        "解决率(%)": avg_resolve_rate,
+        "投诉得分": city_complaint_score,
+        "解决率得分": city_resolve_score,
+        "总分": float(round2(city_complaint_score + city_resolve_score)),
+    }
+
+
+def score_complaints(district_params, district_data, resolve_rate_base, resolve_rate_challenge):
+    """投诉及重复故障管理：计算各区县及全市得分"""
+    units = complaint_units(district_params, district_data)
+    rows = complaint_rows(units, resolve_rate_base, resolve_rate_challenge)
+    city = complaint_city_row(
+        sum_totals(units.values(), COMPLAINT_ROLLUP),
+        resolve_rate_base, resolve_rate_challenge, district_params["全市"]
+    )
+    return with_city_row(rows, city)
+
+
+def delivery_rows(units, ontime_base, ontime_challenge, success_base, success_challenge):
+    """集客业务交付管理：计算各区县得分行（不含全市）"""
+    names = list(units)
+    rates = np.array([units[d]["及时率(%)"] for d in names], dtype=np.float64)
+    success = np.array([units[d]["成功率(%)"] for d in names], dtype=np.float64)
+    ontime_scores = batch_ontime_score(rates, ontime_base, ontime_challenge)
+    success_scores = batch_success_score(success, success_base, success_challenge)
+    return pd.DataFrame({
+        "区县": names,
+        "及时率(%)": rates,
+        "及时率得分": ontime_scores,
+        "成功率(%)": success,
+        "成功率得分": success_scores,
+        "总分": round2(ontime_scores + success_scores),
+    })
+
+
+def delivery_city_row(totals, ontime_base, ontime_challenge, success_base, success_challenge):
+    """集客业务交付管理：全市取各区县平均值（按汇总规则加权）"""
+    avg_ontime_rate = round_half_up2(rollup_mean(totals, "及时率(%)"))
+    avg_success_rate = round_half_up2(rollup_mean(totals, "成功率(%)"))
+    ontime_score = float(batch_ontime_score(avg_ontime_rate, ontime_base, ontime_challenge))
+    success_score = float(batch_success_score(avg_success_rate, success_base, success_challenge))
+    return {
+        "区县": "全市",
+        "及时率(%)": avg_ontime_rate,
+        "及时率得分": ontime_score,
+        "成功率(%)": avg_success_rate,
+        "成功率得分": success_score,
+        "总分": float(round2(ontime_score + success_score)),
+    }
+
+
+def score_delivery(delivery_data, ontime_base, ontime_challenge, success_base, success_challenge):
+    """集客业务交付管理：计算各区县及全市得分"""
+    rows = delivery_rows(delivery_data, ontime_base, ontime_challenge, success_base, success_challenge)
+    city = delivery_city_row(
+        sum_totals(delivery_data.values(), DELIVERY_ROLLUP),
+        ontime_base, ontime_challenge, success_base, success_challenge
+    )
+    return with_city_row(rows, city)
+
+
+def downservice_rows(units, downrate_base, downrate_challenge, aaa_factors):
+    """专线退服管控：计算各区县得分行（不含全市）"""
+    names = list(units)
+    rates = np.array([units[d]["退服率(%)"] for d in names], dtype=np.float64)
+    counts = np.array([int(units[d]["AAA中断次数"]) for d in names], dtype=np.int64)
+    downrate_scores = batch_downrate_score(rates, downrate_base, downrate_challenge)
+    factors = batch_aaa_factor(counts, aaa_factors)
+    return pd.DataFrame({
+        "区县": names,
+        "退服率(%)": rates,
+        "退服率得分": downrate_scores,
+        "AAA中断次数": counts,
+        "AAA系数": factors,
+        "总分": round2(downrate_scores * factors),
+    })
+
+
+def downservice_city_row(totals, downrate_base, downrate_challenge, aaa_factors):
+    """专线退服管控：全市取各区县平均值（按汇总规则加权）"""
+    avg_down_rate = round_half_up2(rollup_mean(totals, "退服率(%)"))
+    avg_aaa_interruptions = round(rollup_mean(totals, "AAA中断次数"))
+    downrate_score = float(batch_downrate_score(avg_down_rate, downrate_base, downrate_challenge))
+    factor = float(batch_aaa_factor(avg_aaa_interruptions, aaa_factors))
+    return {
+        "区县": "全市",
+        "退服率(%)": avg_down_rate,
+        "退服率得分": downrate_score,
+        "AAA中断次数": avg_aaa_interruptions,
+        "AAA系数": factor,
+        "总分": float(round2(downrate_score * factor)),
+    }
+
+
+def score_downservice(downservice_data, downrate_base, downrate_challenge, aaa_factors):
+    """专线退服管控：计算各区县及全市得分"""
+    rows = downservice_rows(downservice_data, downrate_base, downrate_challenge, aaa_factors)
+    city = downservice_city_row(
+        sum_totals(downservice_data.values(), DOWNSERVICE_ROLLUP),
+        downrate_base, downrate_challenge, aaa_factors
+    )
+    return with_city_row(rows, city)
+
+
+# 三项考核的名称（输入文件中的键 -> 中文名称）
+ASSESSMENTS = {
+    "complaint": "投诉及重复故障管理",
+    "delivery": "集客业务交付管理",
+    "downservice": "专线退服管控",
+}
+
+
+def score_inputs(inputs):
+    """按输入字典计算其中包含的各项考核，返回 {考核键: 结果表}
+
+    inputs 的格式与命令行输入文件相同，见 cli.py。
+    """
+    results = {}
+    if "complaint" in inputs:
+        section = inputs["complaint"]
+        results["complaint"] = score_complaints(
+            section["params"], section["data"],
+            section["resolve_rate_base"], section["resolve_rate_challenge"]
+        )
+    if "delivery" in inputs:
+        section = inputs["delivery"]
+        results["delivery"] = score_delivery(
+            section["data"],
+            section["ontime_base"], section["ontime_challenge"],
+            section["success_base"], section["success_challenge"]
+        )
+    if "downservice" in inputs:
+        section = inputs["downservice"]
+        results["downservice"] = score_downservice(
+            section["data"],
+            section["downrate_base"], section["downrate_challenge"],
+            dict(enumerate(section["aaa_factors"]))
+        )
+    return results
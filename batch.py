@@ -0,0 +1,101 @@
+"""多进程批量评分：遍历目录树下的所有输入文件，汇总为每项考核一张总表
+
+用法：
+    python batch.py 输入根目录 [-o 输出目录] [-j 进程数] [--pattern "*.json"] [--org-tree 组织树.json]
+
+输入文件格式见 cli.py，指定 --org-tree 时按组织树逐级计算（同 cli.py）。推荐按“地市/月份.json”组织目录，汇总表中会增加
+“地市”（相对根目录的上级目录）、“考核期”（文件名）和“来源文件”三列。
+结果按完成顺序逐个追加写入输出目录下的“考核名称.csv”（已有同名文件会被覆盖），
+不在内存中累积。
+"""
+import argparse
+import fnmatch
+import os
+import sys
+from multiprocessing import Pool
+
+from assessments import ASSESSMENTS
+from cli import score_file
+from hierarchy import load_org_tree
+
+# 子进程中的组织树（由 _init_worker 在进程启动时设置一次，不随每个任务传递）
+_tree = None
+
+
+def iter_input_files(root, pattern="*.json"):
+    """按文件名排序遍历 root 下所有匹配 pattern 的文件"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(fnmatch.filter(filenames, pattern)):
+            yield os.path.join(dirpath, filename)
+
+
+def _init_worker(tree):
+    global _tree
+    _tree = tree
+
+
+def _score_one(task):
+    """子进程：计算一个输入文件并补充来源信息，失败时返回错误信息"""
+    root, path = task
+    relpath = os.path.relpath(path, root)
+    try:
+        results = score_file(path, _tree)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        return relpath, None, repr(e)
+
+    region = os.path.dirname(relpath)
+    period = os.path.splitext(os.path.basename(relpath))[0]
+    for result_df in results.values():
+        result_df.insert(0, "考核期", period)
+        result_df.insert(0, "地市", region)
+        result_df["来源文件"] = relpath
+    return relpath, results, None
+
+
+def run_batch(root, out_dir, workers=None, pattern="*.json", chunksize=4, tree=None):
+    """并行计算 root 下全部输入文件，边完成边追加写入汇总表；tree 为组织树时按组织树逐级计算
+
+    返回 (成功文件数, 失败文件列表)。
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    out_paths = {key: os.path.join(out_dir, f"{name}.csv") for key, name in ASSESSMENTS.items()}
+    for path in out_paths.values():
+        if os.path.exists(path):
+            os.remove(path)
+
+    tasks = ((root, path) for path in iter_input_files(root, pattern))
+    succeeded, failed = 0, []
+    with Pool(processes=workers, initializer=_init_worker, initargs=(tree,)) as pool:
+        for relpath, results, error in pool.imap_unordered(_score_one, tasks, chunksize=chunksize):
+            if error is not None:
+                failed.append((relpath, error))
+                continue
+            for key, result_df in results.items():
+                path = out_paths[key]
+                header = not os.path.exists(path)
+                result_df.to_csv(path, mode="a", header=header, index=False,
+                                 encoding="utf-8-sig" if header else "utf-8")
+            succeeded += 1
+    return succeeded, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="区县集客业务考核多进程批量评分")
+    parser.add_argument("root", help="输入根目录")
+    parser.add_argument("-o", "--output", default="output", help="输出目录，默认 output")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="进程数，默认等于CPU核数")
+    parser.add_argument("--pattern", default="*.json", help="输入文件名匹配模式，默认 *.json")
+    parser.add_argument("--org-tree", help="组织树配置文件（JSON），指定后按组织树逐级汇总计算")
+    args = parser.parse_args(argv)
+
+    tree = load_org_tree(args.org_tree) if args.org_tree else None
+    succeeded, failed = run_batch(args.root, args.output, workers=args.jobs, pattern=args.pattern, tree=tree)
+    for relpath, error in failed:
+        print(f"{relpath}: 评分失败：{error}", file=sys.stderr)
+    print(f"完成 {succeeded} 个文件，失败 {len(failed)} 个，结果已写入 {args.output}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
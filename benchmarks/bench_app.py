@@ -0,0 +1,124 @@
+"""页面端到端基准：用 streamlit 的 AppTest 无界面运行 computeScore1.py，计时各标签页的提交路径
+
+用法：
+    python benchmarks/bench_app.py [-o 结果文件.json] [--districts 6 60 600] [--repeat 5]
+
+每个区县数在独立子进程中运行（组织树通过环境变量 ORG_TREE 指定，6 个区县时使用默认配置）：
+先计时页面首次运行，再对每个标签页计时提交（每次改动一个区县的输入，不命中结果缓存）
+和原样再次提交（命中结果缓存）。历史库写入临时文件，不影响正式数据。
+结果写入 JSON，可用 compare.py 对比两个版本。
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "computeScore1.py")
+sys.path.insert(0, ROOT)
+
+from common import default_output, write_results  # noqa: E402
+
+# 标签页 -> (提交按钮键, 每次提交前改动的控件名, 改动值)
+SUBMIT_PATHS = {
+    "complaint": ("FormSubmitter:district_data_form-计算得分", "complaints", lambda i: i + 1),
+    "delivery": ("FormSubmitter:delivery_data_form-计算交付得分", "ontime_rate", lambda i: 90.0 + i * 0.01),
+    "downservice": ("FormSubmitter:downservice_data_form-计算退服管控得分", "down_rate", lambda i: 3.0 + i * 0.01),
+}
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def summarize(name, districts, samples):
+    return {
+        "path": name,
+        "districts": districts,
+        "seconds": min(samples),
+        "seconds_median": statistics.median(samples),
+        "samples": samples,
+    }
+
+
+def run_single(districts, repeat):
+    """在当前进程中计时一种区县数（组织树已由环境变量指定），返回结果记录列表"""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP, default_timeout=600)
+    records = [summarize("initial_run", districts, [timed(at.run)])]
+    if at.exception:
+        raise RuntimeError(at.exception)
+
+    from hierarchy import load_org_tree
+
+    district = load_org_tree().units_at("区县")[0]
+    for tab, (button_key, widget, value) in SUBMIT_PATHS.items():
+        submit, resubmit = [], []
+        for i in range(repeat):
+            at.number_input(key=f"{district}_{widget}").set_value(value(i))
+            submit.append(timed(at.button(key=button_key).click().run))
+            resubmit.append(timed(at.button(key=button_key).click().run))
+            if at.exception:
+                raise RuntimeError(at.exception)
+        records.append(summarize(f"{tab}_submit", districts, submit))
+        records.append(summarize(f"{tab}_resubmit", districts, resubmit))
+    return records
+
+
+def write_org_tree(path, districts):
+    """生成含 districts 个区县的两级组织树配置"""
+    children = [{"name": f"区县{i:04d}"} for i in range(districts)]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"levels": ["全市", "区县"], "tree": {"name": "全市", "children": children}}, f, ensure_ascii=False)
+
+
+def run(district_counts, repeat):
+    """每种区县数在独立子进程中计时（组织树在模块导入时读取）"""
+    records = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for districts in district_counts:
+            env = dict(os.environ, SCORE_HISTORY_DB=os.path.join(tmp, "history.sqlite3"))
+            if districts != 6:
+                tree_path = os.path.join(tmp, f"org_tree_{districts}.json")
+                write_org_tree(tree_path, districts)
+                env["ORG_TREE"] = tree_path
+            completed = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--single", str(districts), "--repeat", str(repeat)],
+                env=env, capture_output=True, text=True, cwd=ROOT
+            )
+            if completed.returncode != 0:
+                raise RuntimeError(f"区县数 {districts} 运行失败：\n{completed.stderr}")
+            records.extend(json.loads(completed.stdout.splitlines()[-1]))
+            print(f"区县数={districts} 完成", file=sys.stderr)
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="页面端到端基准（AppTest 无界面运行）")
+    parser.add_argument("-o", "--output", default=None, help="结果文件，默认 benchmarks/results/app-时间.json")
+    parser.add_argument("--districts", type=int, nargs="+", default=[6, 60], help="区县数，默认 6 和 60")
+    parser.add_argument("--repeat", type=int, default=5, help="每个提交路径的计时次数，默认 5")
+    parser.add_argument("--single", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.single is not None:
+        print(json.dumps(run_single(args.single, args.repeat), ensure_ascii=False))
+        return 0
+
+    records = run(args.districts, args.repeat)
+    path = write_results("app", records, args.output or default_output("app"))
+    for r in records:
+        print(f"{r['path']:<22}{r['districts']:>6}  最短 {r['seconds'] * 1e3:9.1f} ms  中位 {r['seconds_median'] * 1e3:9.1f} ms")
+    print(f"结果已写入 {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
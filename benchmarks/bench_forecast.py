@@ -0,0 +1,91 @@
+"""月末预测基准：不同区县数、模拟次数下预测三项考核月末得分（含汇总）的耗时
+
+用法：
+    python benchmarks/bench_forecast.py [-o 结果文件.json] [--districts 6 30] [--draws 10000 100000] [--repeat 3]
+
+每种组合重复 --repeat 次取最短耗时，同时记录中位数。结果写入 JSON，可用 compare.py 对比两个版本。
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common import default_output, write_results  # noqa: E402
+from forecast import forecast_month  # noqa: E402
+
+DAYS_ELAPSED, DAYS_IN_MONTH = 12, 31
+
+
+def make_inputs(districts, seed=0):
+    """生成 districts 个区县月初至今的随机计数（格式同 forecast.forecast_month 的输入）"""
+    rng = np.random.default_rng(seed)
+    names = [f"区县{i + 1}" for i in range(districts)]
+    params = {d: {"挑战值": int(rng.integers(0, 2)), "基准值": int(rng.integers(2, 5))} for d in names}
+    params["全市"] = {"挑战值": 0, "基准值": 2 * districts}
+    complaint_data, delivery_data, downservice_data = {}, {}, {}
+    for d in names:
+        faults, due, closed = (int(n) for n in rng.integers(0, 60, 3))
+        complaint_data[d] = {"投诉次数": int(rng.integers(0, 4)), "重复投诉": bool(rng.random() < 0.2),
+                             "解决率": 90.0, "重复故障数": faults, "已解决重复故障数": int(faults * 0.9)}
+        delivery_data[d] = {"及时率(%)": 95.0, "成功率(%)": 93.0, "应完成工单数": due,
+                            "按时完成工单数": int(due * 0.95), "已结束工单数": closed, "成功工单数": int(closed * 0.92)}
+        downservice_data[d] = {"退服率(%)": 3.0, "退服时长(小时)": float(rng.uniform(0, 200)),
+                               "退服次数": int(rng.integers(0, 30)), "专线总数": int(rng.integers(100, 500)),
+                               "AAA中断次数": int(rng.integers(0, 2))}
+    return {
+        "complaint": {"resolve_rate_base": 85, "resolve_rate_challenge": 100, "params": params,
+                      "data": complaint_data},
+        "delivery": {"ontime_base": 94, "ontime_challenge": 96, "success_base": 90, "success_challenge": 95,
+                     "data": delivery_data},
+        "downservice": {"downrate_base": 4, "downrate_challenge": 3.5, "aaa_factors": [1.0, 0.8, 0.6, 0.0],
+                        "data": downservice_data},
+    }
+
+
+def run(district_counts, draw_counts, repeat):
+    """逐种区县数、模拟次数计时，返回结果记录列表"""
+    records = []
+    for districts in district_counts:
+        inputs = make_inputs(districts)
+        for draws in draw_counts:
+            samples = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                forecasts = forecast_month(inputs, DAYS_ELAPSED, DAYS_IN_MONTH, draws=draws, seed=0)
+                for forecast in forecasts.values():
+                    forecast.summary()
+                samples.append(time.perf_counter() - start)
+            records.append({
+                "districts": districts,
+                "draws": draws,
+                "seconds": min(samples),
+                "seconds_median": float(np.median(samples)),
+                "samples": len(samples),
+            })
+        print(f"districts={districts} 完成", file=sys.stderr)
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="月末预测基准（蒙特卡洛模拟）")
+    parser.add_argument("-o", "--output", default=None, help="结果文件，默认 benchmarks/results/forecast-时间.json")
+    parser.add_argument("--districts", type=int, nargs="+", default=[6, 30], help="区县数，默认 6 30")
+    parser.add_argument("--draws", type=int, nargs="+", default=[10_000, 100_000], help="模拟次数，默认 10000 100000")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数（取最短），默认 3")
+    args = parser.parse_args(argv)
+
+    records = run(args.districts, args.draws, args.repeat)
+    path = write_results("forecast", records, args.output or default_output("forecast"))
+    for r in records:
+        print(f"{r['districts']:>4} 区县{r['draws']:>9} 次  {r['seconds'] * 1e3:10.1f} ms"
+              f"  中位数 {r['seconds_median'] * 1e3:10.1f} ms")
+    print(f"结果已写入 {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""排行榜基准：不同单位数、变化单位数下更新排行并取前 N 名的耗时（增量更新与整列重新排序对比）
+
+用法：
+    python benchmarks/bench_leaderboard.py [-o 结果文件.json] [--units 10000 200000] [--changed 1 100] [--repeat 5]
+
+每种组合重复 --repeat 次取最短耗时，同时记录中位数。结果写入 JSON，可用 compare.py 对比两个版本。
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common import default_output, write_results  # noqa: E402
+from leaderboard import Leaderboard  # noqa: E402
+
+TOP_N = 20
+
+
+def make_frame(units, seed=0):
+    """生成 units 个单位的随机总分表（得分为两位小数，有大量并列）"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "区县": [f"网格{i + 1}" for i in range(units)],
+        "总分": np.round(rng.uniform(0, 11, units), 2),
+    })
+
+
+def full_sort(frame):
+    """对照：每次整列排序后计算名次、百分位并取前 N 名"""
+    values = frame["总分"].to_numpy(dtype=np.float64)
+    ordered = np.sort(values)
+    ranks = len(values) - np.searchsorted(ordered, values, side="right") + 1
+    percentiles = np.searchsorted(ordered, values, side="right") / len(values) * 100
+    top = np.argsort(-values, kind="stable")[:TOP_N]
+    return ranks[top], percentiles[top]
+
+
+def run(unit_counts, changed_counts, repeat):
+    """逐种单位数、变化单位数计时，返回结果记录列表"""
+    records = []
+    for units in unit_counts:
+        base = make_frame(units)
+        rng = np.random.default_rng(1)
+        for changed in changed_counts:
+            timings = {"incremental": [], "full_sort": []}
+            for _ in range(repeat):
+                board = Leaderboard(["总分"])
+                board.update(base)
+                frame = base.copy()
+                positions = rng.choice(units, min(changed, units), replace=False)
+                frame.loc[positions, "总分"] = np.round(rng.uniform(0, 11, len(positions)), 2)
+
+                start = time.perf_counter()
+                board.update(frame)
+                board.standings("总分", n=TOP_N)
+                timings["incremental"].append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                full_sort(frame)
+                timings["full_sort"].append(time.perf_counter() - start)
+            for method, samples in timings.items():
+                records.append({
+                    "units": units,
+                    "changed": changed,
+                    "method": method,
+                    "seconds": min(samples),
+                    "seconds_median": float(np.median(samples)),
+                    "samples": len(samples),
+                })
+        print(f"units={units} 完成", file=sys.stderr)
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="排行榜基准（增量更新与整列排序对比）")
+    parser.add_argument("-o", "--output", default=None, help="结果文件，默认 benchmarks/results/leaderboard-时间.json")
+    parser.add_argument("--units", type=int, nargs="+", default=[10_000, 200_000], help="单位数，默认 10000 200000")
+    parser.add_argument("--changed", type=int, nargs="+", default=[1, 100], help="变化单位数，默认 1 100")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数（取最短），默认 5")
+    args = parser.parse_args(argv)
+
+    records = run(args.units, args.changed, args.repeat)
+    path = write_results("leaderboard", records, args.output or default_output("leaderboard"))
+    for r in records:
+        print(f"{r['units']:>8} 单位{r['changed']:>6} 变化  {r['method']:<12}{r['seconds'] * 1e3:10.2f} ms"
+              f"  中位数 {r['seconds_median'] * 1e3:10.2f} ms")
+    print(f"结果已写入 {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
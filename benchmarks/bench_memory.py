@@ -0,0 +1,162 @@
+"""原始记录内存基准：不同列类型下读取并汇总一年原始记录的内存占用
+
+用法：
+    python benchmarks/bench_memory.py [-o 结果文件.json] [--rows 1000000]
+
+需要 Linux（读取 /proc/self/status）。先生成投诉工单、交付工单、退服事件三种 CSV
+（各 --rows 行）并写入上传缓存，再对每种记录、每种列类型在独立子进程中读取并汇总，
+记录 DataFrame 占用及进程峰值内存增量：
+    object   各列为 Python 对象（最初的读取方式）
+    string   各列为字符串（Arrow 字符串）
+    compact  按 schema.py 转为分类/时间/布尔
+结果写入 JSON，可用 compare.py 对比两个版本。
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from common import default_output, write_results  # noqa: E402
+from complaints import detect_repeats, ticket_schema  # noqa: E402
+from delivery import order_schema, summarize_delivery  # noqa: E402
+from exports import ExportCache  # noqa: E402
+from outages import event_schema, summarize_outages  # noqa: E402
+from schema import memory_usage  # noqa: E402
+
+DISTRICTS = ["东区", "西区", "仁和", "米易", "盐边", "高新"]
+YEAR_START = pd.Timestamp("2025-01-01")
+
+# 记录类型 -> (读取时的紧凑列类型, 汇总计算)
+RECORDS = {
+    "tickets": (
+        ticket_schema(resolved_col="是否解决"),
+        lambda frame: detect_repeats(frame, resolved_col="是否解决"),
+    ),
+    "orders": (
+        order_schema(),
+        lambda frame: summarize_delivery(frame, as_of=YEAR_START + pd.DateOffset(years=1)),
+    ),
+    "events": (
+        event_schema(),
+        lambda frame: summarize_outages(frame, YEAR_START, YEAR_START + pd.DateOffset(years=1)),
+    ),
+}
+LAYOUTS = ["object", "string", "compact"]
+
+
+def make_records(kind, rows, seed=0):
+    """生成一年的随机原始记录（时间为导出文件中常见的文本格式）"""
+    rng = np.random.default_rng(seed)
+    seconds = rng.integers(0, 365 * 86_400, rows)
+    start = (YEAR_START + pd.to_timedelta(seconds, unit="s")).strftime("%Y-%m-%d %H:%M:%S")
+    end = (YEAR_START + pd.to_timedelta(seconds + rng.integers(60, 86_400 * 10, rows), unit="s")) \
+        .strftime("%Y-%m-%d %H:%M:%S")
+    district = rng.choice(DISTRICTS, rows)
+    circuit = np.char.add("ZX", rng.integers(0, rows // 20 + 1, rows).astype(str))
+    if kind == "tickets":
+        return pd.DataFrame({"区县": district, "电路编号": circuit, "受理时间": start,
+                             "是否解决": rng.choice(["是", "否"], rows)})
+    if kind == "orders":
+        return pd.DataFrame({"区县": district, "创建时间": start, "承诺时间": "", "完成时间": end,
+                             "工单状态": rng.choice(["竣工", "退单", "处理中"], rows)})
+    return pd.DataFrame({"区县": district, "电路编号": circuit, "开始时间": start, "结束时间": end,
+                         "是否AAA": rng.choice(["是", "否"], rows, p=[0.1, 0.9])})
+
+
+def memory_status(field):
+    """/proc/self/status 中的内存项（字节），VmRSS 为当前常驻内存，VmHWM 为峰值"""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) * 1024
+    raise RuntimeError(f"/proc/self/status 中没有 {field}")
+
+
+def reset_peak():
+    """将峰值常驻内存重置为当前值（Linux 4.0 及以上），排除导入模块等准备阶段的峰值"""
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+
+
+def schema_columns(schema):
+    """schema 中列出的列（缓存按读取的列分别保存）"""
+    return [column for column in schema if column]
+
+
+def run_single(kind, layout, path, cache_dir):
+    """在当前进程中读取并汇总一种记录，返回结果记录"""
+    schema, summarize = RECORDS[kind]
+    cache = ExportCache(cache_dir)
+    reset_peak()
+    baseline = memory_status("VmRSS")
+    start = time.perf_counter()
+    frame = cache.load(path, columns=schema_columns(schema), schema=schema if layout == "compact" else None)
+    if layout == "object":
+        frame = frame.astype(object)
+    frame_bytes = memory_usage(frame)
+    summarize(frame)
+    seconds = time.perf_counter() - start
+    peak = memory_status("VmHWM")
+    return {
+        "records": kind,
+        "layout": layout,
+        "rows": len(frame),
+        "frame_bytes": frame_bytes,
+        "peak_bytes": max(peak - baseline, 0),
+        "seconds": seconds,
+    }
+
+
+def run(rows):
+    """生成数据后逐种记录、逐种列类型在子进程中计时及测量内存"""
+    records = []
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = os.path.join(tmp, "cache")
+        for kind in RECORDS:
+            path = os.path.join(tmp, f"{kind}.csv")
+            make_records(kind, rows).to_csv(path, index=False)
+            # 预先写入缓存，各子进程只计读取和汇总
+            ExportCache(cache_dir).load(path, columns=schema_columns(RECORDS[kind][0]))
+            for layout in LAYOUTS:
+                completed = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--single", kind, layout, path, cache_dir],
+                    capture_output=True, text=True, cwd=ROOT
+                )
+                if completed.returncode != 0:
+                    raise RuntimeError(f"{kind}/{layout} 运行失败：\n{completed.stderr}")
+                records.append(json.loads(completed.stdout.splitlines()[-1]))
+            print(f"{kind} 完成", file=sys.stderr)
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="原始记录内存基准（对象/字符串/紧凑列类型）")
+    parser.add_argument("-o", "--output", default=None, help="结果文件，默认 benchmarks/results/memory-时间.json")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="每种记录的行数，默认 1000000")
+    parser.add_argument("--single", nargs=4, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.single is not None:
+        print(json.dumps(run_single(*args.single)))
+        return 0
+
+    records = run(args.rows)
+    path = write_results("memory", records, args.output or default_output("memory"))
+    for r in records:
+        print(f"{r['records']:<8}{r['layout']:<8}{r['rows']:>10}  表 {r['frame_bytes'] / 2**20:8.1f} MB"
+              f"  峰值增量 {r['peak_bytes'] / 2**20:8.1f} MB  {r['seconds']:7.2f} s")
+    print(f"结果已写入 {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""评分核心微基准：逐条计算与批量计算在不同输入规模下的耗时
+
+用法：
+    python benchmarks/bench_scoring.py [-o 结果文件.json] [--sizes 100 1000 ...] [--max-scalar 100000]
+
+每个指标分别计时逐条计算（benchmarks/scalar_reference.py）和批量计算（scoring.py），
+逐条计算超过 --max-scalar 条时跳过（耗时过长）。结果写入 JSON，可用 compare.py 对比两个版本。
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scalar_reference as scalar  # noqa: E402
+from common import default_output, write_results  # noqa: E402
+from scoring import (  # noqa: E402
+    batch_aaa_factor,
+    batch_complaint_score,
+    batch_downrate_score,
+    batch_ontime_score,
+    batch_resolve_rate_score,
+    batch_success_score,
+)
+
+DEFAULT_SIZES = [10 ** k for k in range(2, 8)]
+AAA_FACTORS = {0: 1.0, 1: 0.8, 2: 0.6, 3: 0.0}
+
+
+def make_inputs(n, seed=0):
+    """生成 n 条随机输入（覆盖满分、线性段和不得分三种情况）"""
+    rng = np.random.default_rng(seed)
+    return {
+        "complaints": rng.integers(0, 15, n),
+        "challenge": rng.integers(0, 3, n),
+        "base": rng.integers(3, 12, n),
+        "repeated": rng.random(n) < 0.1,
+        "rates": np.round(rng.uniform(80, 100, n), 2),
+        "down_rates": np.round(rng.uniform(0, 6, n), 2),
+        "interruptions": rng.integers(0, 6, n),
+    }
+
+
+# 指标名称 -> (逐条计算, 批量计算)，两者的参数均由输入字典给出
+METRICS = {
+    "complaint": (
+        lambda x: [scalar.complaint_score(c, ch, b, r) for c, ch, b, r in zip(
+            x["complaints"].tolist(), x["challenge"].tolist(), x["base"].tolist(), x["repeated"].tolist())],
+        lambda x: batch_complaint_score(x["complaints"], x["challenge"], x["base"], has_repeated=x["repeated"]),
+    ),
+    "resolve": (
+        lambda x: [scalar.resolve_rate_score(r, 85.0, 100.0) for r in x["rates"].tolist()],
+        lambda x: batch_resolve_rate_score(x["rates"], 85.0, 100.0),
+    ),
+    "ontime": (
+        lambda x: [scalar.ontime_score(r, 94.0, 96.0) for r in x["rates"].tolist()],
+        lambda x: batch_ontime_score(x["rates"], 94.0, 96.0),
+    ),
+    "success": (
+        lambda x: [scalar.success_score(r, 90.0, 95.0) for r in x["rates"].tolist()],
+        lambda x: batch_success_score(x["rates"], 90.0, 95.0),
+    ),
+    "downrate": (
+        lambda x: [scalar.downrate_score(r, 4.0, 3.5) for r in x["down_rates"].tolist()],
+        lambda x: batch_downrate_score(x["down_rates"], 4.0, 3.5),
+    ),
+    "aaa": (
+        lambda x: [scalar.aaa_factor(k, AAA_FACTORS) for k in x["interruptions"].tolist()],
+        lambda x: batch_aaa_factor(x["interruptions"], AAA_FACTORS),
+    ),
+}
+
+
+def best_time(fn, arg, repeat):
+    """重复 repeat 次取最短耗时（秒）及最后一次的结果"""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(arg)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run(sizes, max_scalar, repeat=3):
+    """逐个规模、逐个指标计时，返回结果记录列表"""
+    records = []
+    for n in sizes:
+        inputs = make_inputs(n)
+        rounds = repeat if n <= 10 ** 5 else 1
+        for metric, (scalar_fn, batch_fn) in METRICS.items():
+            batch_seconds, batch_result = best_time(batch_fn, inputs, rounds)
+            records.append({"metric": metric, "impl": "batch", "n": n, "seconds": batch_seconds})
+            if n > max_scalar:
+                continue
+            scalar_seconds, scalar_result = best_time(scalar_fn, inputs, rounds)
+            if not np.array_equal(np.asarray(scalar_result, dtype=np.float64), batch_result):
+                raise AssertionError(f"{metric} 批量计算结果与逐条计算不一致（n={n}）")
+            records.append({"metric": metric, "impl": "scalar", "n": n, "seconds": scalar_seconds})
+        print(f"n={n} 完成", file=sys.stderr)
+    for record in records:
+        record["ns_per_item"] = record["seconds"] * 1e9 / record["n"]
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="评分核心微基准（逐条 vs 批量）")
+    parser.add_argument("-o", "--output", default=None, help="结果文件，默认 benchmarks/results/scoring-时间.json")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="输入规模，默认 10^2 到 10^7")
+    parser.add_argument("--max-scalar", type=int, default=10 ** 5, help="逐条计算的最大规模，默认 100000")
+    parser.add_argument("--repeat", type=int, default=3, help="小规模时的重复次数（取最短），默认 3")
+    args = parser.parse_args(argv)
+
+    records = run(args.sizes, args.max_scalar, args.repeat)
+    path = write_results("scoring", records, args.output or default_output("scoring"))
+    for r in records:
+        print(f"{r['metric']:<10}{r['impl']:<8}{r['n']:>10}  {r['seconds'] * 1e3:10.3f} ms  {r['ns_per_item']:10.1f} ns/条")
+    print(f"结果已写入 {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""评分服务吞吐基准：本机启动 server.py 的服务，多个客户端线程以长连接并发请求
+
+用法：
+    python benchmarks/bench_server.py [-o 结果文件.json] [--clients 1 4 8] [--requests 500] [--batch-size 12]
+
+依次计时 /score（一个考核期的三项考核）、/batch（--batch-size 个考核期）和 /metrics
+（1000 个单位的及时率），记录每秒请求数及延迟分位数。结果写入 JSON，可用 compare.py 对比两个版本。
+"""
+import argparse
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common import default_output, write_results  # noqa: E402
+from server import ScoreServer  # noqa: E402
+
+DISTRICTS = ["东区", "西区", "仁和", "米易", "盐边", "高新"]
+
+
+def sample_inputs(seed=0):
+    """一个考核期的随机输入（格式同 cli.py）"""
+    rng = np.random.default_rng(seed)
+    params = {d: {"挑战值": int(rng.integers(0, 2)), "基准值": int(rng.integers(2, 5))} for d in DISTRICTS}
+    params["全市"] = {"挑战值": 0, "基准值": 12}
+    return {
+        "complaint": {
+            "resolve_rate_base": 85, "resolve_rate_challenge": 100, "params": params,
+            "data": {d: {"投诉次数": int(rng.integers(0, 5)), "重复投诉": bool(rng.random() < 0.2),
+                         "解决率": round(float(rng.uniform(80, 100)), 2)} for d in DISTRICTS},
+        },
+        "delivery": {
+            "ontime_base": 94, "ontime_challenge": 96, "success_base": 90, "success_challenge": 95,
+            "data": {d: {"及时率(%)": round(float(rng.uniform(90, 100)), 2),
+                         "成功率(%)": round(float(rng.uniform(88, 100)), 2)} for d in DISTRICTS},
+        },
+        "downservice": {
+            "downrate_base": 4, "downrate_challenge": 3.5, "aaa_factors": [1.0, 0.8, 0.6, 0.0],
+            "data": {d: {"退服率(%)": round(float(rng.uniform(2, 5)), 2),
+                         "AAA中断次数": int(rng.integers(0, 4))} for d in DISTRICTS},
+        },
+    }
+
+
+def request_bodies(batch_size):
+    """各接口的请求体"""
+    rng = np.random.default_rng(0)
+    return {
+        "/score": sample_inputs(),
+        "/batch": {"items": [{"id": "全市", "period": f"2024-{m % 12 + 1:02d}", "inputs": sample_inputs(m)}
+                             for m in range(batch_size)]},
+        "/metrics": {"metric": "ontime", "values": np.round(rng.uniform(90, 100, 1000), 2).tolist(),
+                     "base": 94, "challenge": 96},
+    }
+
+
+def client(port, path, body, count, latencies):
+    """以一个长连接依次发送 count 个请求，记录每个请求的延迟"""
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    headers = {"Content-Type": "application/json"}
+    try:
+        for _ in range(count):
+            start = time.perf_counter()
+            conn.request("POST", path, body=body, headers=headers)
+            response = conn.getresponse()
+            payload = response.read()
+            if response.status != 200:
+                raise RuntimeError(f"{path} 返回 {response.status}：{payload.decode('utf-8')}")
+            latencies.append(time.perf_counter() - start)
+    finally:
+        conn.close()
+
+
+def run(client_counts, requests, batch_size):
+    """逐个接口、逐种并发数计时，返回结果记录列表"""
+    server = ScoreServer(("127.0.0.1", 0))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    records = []
+    try:
+        for path, body in request_bodies(batch_size).items():
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            client(port, path, data, 5, [])  # 预热
+            for clients in client_counts:
+                latencies = []
+                per_client = max(requests // clients, 1)
+                threads = [threading.Thread(target=client, args=(port, path, data, per_client, latencies))
+                           for _ in range(clients)]
+                start = time.perf_counter()
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                seconds = time.perf_counter() - start
+                if len(latencies) != per_client * clients:
+                    raise RuntimeError(f"{path} 有请求失败")
+                ms = np.asarray(latencies) * 1e3
+                records.append({
+                    "path": path,
+                    "clients": clients,
+                    "requests": len(latencies),
+                    "seconds": seconds,
+                    "requests_per_second": len(latencies) / seconds,
+                    "p50_ms": float(np.percentile(ms, 50)),
+                    "p99_ms": float(np.percentile(ms, 99)),
+                })
+            print(f"{path} 完成", file=sys.stderr)
+    finally:
+        server.shutdown()
+        server.server_close()
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="评分服务吞吐基准（本机）")
+    parser.add_argument("-o", "--output", default=None, help="结果文件，默认 benchmarks/results/server-时间.json")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 4, 8], help="并发客户端数，默认 1 4 8")
+    parser.add_argument("--requests", type=int, default=500, help="每种并发数的请求总数，默认 500")
+    parser.add_argument("--batch-size", type=int, default=12, help="/batch 每个请求的考核期数，默认 12")
+    args = parser.parse_args(argv)
+
+    records = run(args.clients, args.requests, args.batch_size)
+    path = write_results("server", records, args.output or default_output("server"))
+    for r in records:
+        print(f"{r['path']:<10}{r['clients']:>4} 客户端  {r['requests_per_second']:8.1f} 请求/秒"
+              f"  P50 {r['p50_ms']:7.2f} ms  P99 {r['p99_ms']:7.2f} ms")
+    print(f"结果已写入 {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""基准测试结果文件的公共读写（JSON，带运行环境信息，便于跨版本对比）"""
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def default_output(suite):
+    """默认结果文件路径：benchmarks/results/套件名-时间.json"""
+    return os.path.join(RESULTS_DIR, f"{suite}-{datetime.now():%Y%m%d-%H%M%S}.json")
+
+
+def git_revision():
+    """当前代码的 git 提交号，不在 git 仓库中时返回 None"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(RESULTS_DIR),
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    """运行环境信息"""
+    info = {
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+    try:
+        import streamlit
+
+        info["streamlit"] = streamlit.__version__
+    except ImportError:
+        pass
+    return info
+
+
+def write_results(suite, records, path):
+    """写入结果文件，返回路径"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "suite": suite,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "environment": environment(),
+            "results": records,
+        }, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def load_results(path):
+    """读取结果文件"""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,79 @@
+"""对比两个基准结果文件（同一套件），按测量值（耗时、内存、吞吐量）比值列出变化并标记退化
+
+用法：
+    python benchmarks/compare.py 旧结果.json 新结果.json [--threshold 1.2] [--field seconds]
+
+按记录中除测量值外的字段（如 metric/impl/n 或 path/districts）配对，
+比较所选测量值（默认为耗时，内存基准可用 --field peak_bytes，服务基准可用 --field requests_per_second）。
+比值按变差方向计算：越小越好的测量值为新/旧，吞吐量等越大越好的为旧/新，
+比值超过 --threshold 的记为退化，有退化时退出码为 1。
+"""
+import argparse
+import sys
+
+from common import load_results
+
+# 非配对字段（测量值及其派生值）：字段 -> (显示倍数, 单位, 是否越大越好)
+MEASUREMENTS = {
+    "seconds": (1e3, "ms", False),
+    "seconds_median": (1e3, "ms", False),
+    "samples": (1, "次", False),
+    "ns_per_item": (1, "ns", False),
+    "frame_bytes": (2 ** -20, "MB", False),
+    "peak_bytes": (2 ** -20, "MB", False),
+    "requests_per_second": (1, "req/s", True),
+    "p50_ms": (1, "ms", False),
+    "p99_ms": (1, "ms", False),
+}
+
+
+def record_key(record):
+    return tuple((k, v) for k, v in record.items() if k not in MEASUREMENTS)
+
+
+def compare(old, new, threshold, field="seconds"):
+    """返回 [(配对字段, 旧值, 新值, 比值, 是否退化)]，仅含两边都有的记录
+
+    比值按变差方向计算（越大越好的测量值取旧/新），大于 1 表示变差。
+    """
+    higher_is_better = MEASUREMENTS[field][2]
+    old_records = {record_key(r): r for r in old["results"]}
+    rows = []
+    for record in new["results"]:
+        key = record_key(record)
+        if key not in old_records:
+            continue
+        before, after = old_records[key][field], record[field]
+        worse, better = (before, after) if higher_is_better else (after, before)
+        ratio = worse / better if better > 0 else float("inf")
+        rows.append((key, before, after, ratio, ratio > threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="对比两个基准结果文件")
+    parser.add_argument("old", help="旧版本结果文件")
+    parser.add_argument("new", help="新版本结果文件")
+    parser.add_argument("--threshold", type=float, default=1.2, help="变差比值超过该值视为退化，默认 1.2")
+    parser.add_argument("--field", default="seconds", choices=sorted(MEASUREMENTS),
+                        help="对比的测量值，默认 seconds（耗时）")
+    args = parser.parse_args(argv)
+
+    old, new = load_results(args.old), load_results(args.new)
+    if old["suite"] != new["suite"]:
+        parser.error(f"套件不同：{old['suite']} 与 {new['suite']}")
+    print(f"{old['suite']}：{old.get('revision')} -> {new.get('revision')}")
+
+    rows = compare(old, new, args.threshold, args.field)
+    scale, unit, _ = MEASUREMENTS[args.field]
+    for key, before, after, ratio, regressed in rows:
+        label = " ".join(f"{k}={v}" for k, v in key)
+        mark = "  退化" if regressed else ""
+        print(f"{label:<40}{before * scale:12.3f} {unit}{after * scale:12.3f} {unit}{ratio:8.2f}x{mark}")
+    regressions = sum(row[4] for row in rows)
+    print(f"共 {len(rows)} 项，退化 {regressions} 项（阈值 {args.threshold:.2f}x）")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""逐条计算的评分函数（与最初版本页面中逐区县调用的函数相同），作为批量评分的对照基准"""
+
+
+def complaint_score(complaints, challenge, base, has_repeated=False, is_city=False):
+    """按线性规则计算投诉压降得分"""
+    if not is_city and has_repeated:
+        return 0.0  # 非全市且有重复投诉，得0分
+
+    if complaints <= challenge:
+        return 1.5  # 达到挑战值得满分
+    elif complaints <= base:
+        score_range = 1.5 * 0.4
+        x_range = base - challenge
+        if x_range == 0:
+            return 1.5
+        score_per_unit = score_range / x_range
+        return round(1.5 - score_per_unit * (complaints - challenge), 2)
+    else:
+        return 0.0  # 超过基准值不得分
+
+
+def _rate_score(rate, base, challenge, full_score, base_score, score_range):
+    if rate >= challenge:
+        return full_score  # 达到挑战值得满分
+    elif rate >= base:
+        rate_range = challenge - base
+        if rate_range == 0:
+            return full_score
+        score_per_percent = score_range / rate_range
+        return round(base_score + score_per_percent * (rate - base), 2)
+    else:
+        return 0.0  # 低于基准值不得分
+
+
+def resolve_rate_score(rate, base, challenge):
+    """按线性规则计算重复故障解决率得分"""
+    return _rate_score(rate, base, challenge, 1.5, 0.9, 1.5 * 0.4)
+
+
+def ontime_score(rate, base, challenge):
+    """按线性规则计算交付及时率得分"""
+    return _rate_score(rate, base, challenge, 2.0, 1.2, 2.0 - 1.2)
+
+
+def success_score(rate, base, challenge):
+    """按线性规则计算交付成功率得分"""
+    return _rate_score(rate, base, challenge, 2.0, 1.2, 2.0 - 1.2)
+
+
+def downrate_score(rate, base, challenge):
+    """按线性规则计算专线退服率得分（退服率越低越好）"""
+    if rate <= challenge:
+        return 4.0  # 达到挑战值得满分
+    elif rate <= base:
+        score_range = 4.0 - 2.4
+        rate_range = base - challenge
+        if rate_range == 0:
+            return 4.0
+        score_per_percent = score_range / rate_range
+        return round(2.4 + score_per_percent * (base - rate), 2)
+    else:
+        return 0.0  # 超过基准值不得分
+
+
+def aaa_factor(interruptions, aaa_factors):
+    """查询AAA中断系数，3次及以上使用同一系数"""
+    return aaa_factors[min(interruptions, 3)]
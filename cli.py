@@ -0,0 +1,94 @@
+"""区县集客业务考核命令行评分工具（不依赖 streamlit，适合定时任务批量调用）
+
+用法：
+    python cli.py 输入文件.json [输入文件.json ...] -o 输出目录 [--format csv|xlsx]
+
+输入文件为 JSON，可包含 complaint / delivery / downservice 中任意几项，
+参数名与页面控件一致：
+
+    {
+      "complaint": {
+        "resolve_rate_base": 85, "resolve_rate_challenge": 100,
+        "params": {"东区": {"挑战值": 0, "基准值": 3}, ..., "全市": {"挑战值": 0, "基准值": 12}},
+        "data": {"东区": {"投诉次数": 2, "重复投诉": false, "解决率": 90.5}, ...}
+      },
+      "delivery": {
+        "ontime_base": 94, "ontime_challenge": 96, "success_base": 90, "success_challenge": 95,
+        "data": {"东区": {"及时率(%)": 95, "成功率(%)": 93}, ...}
+      },
+      "downservice": {
+        "downrate_base": 4, "downrate_challenge": 3.5, "aaa_factors": [1.0, 0.8, 0.6, 0.0],
+        "data": {"东区": {"退服率(%)": 3, "AAA中断次数": 0}, ...}
+      }
+    }
+
+每个输入文件的每项考核输出一张结果表，文件名为“输入文件名_考核名称”。
+
+指定 --org-tree 组织树配置（格式见 org_tree.json）时，data 中为最底层单位的数据，
+可附带汇总权重（投诉“重复故障数”、交付“应完成工单数”/“已结束工单数”、退服“专线总数”），
+结果表包含组织树中每一级单位的得分；投诉的 params 需给出各级单位的挑战值/基准值。
+"""
+import argparse
+import json
+import os
+import sys
+
+from assessments import ASSESSMENTS, score_inputs
+from hierarchy import load_org_tree, score_tree_inputs
+
+
+def score_file(path, tree=None):
+    """读取一个输入文件并计算其中各项考核，返回 {考核键: 结果表}；tree 为组织树时按组织树逐级计算"""
+    with open(path, encoding="utf-8") as f:
+        inputs = json.load(f)
+    if tree is not None:
+        return score_tree_inputs(tree, inputs)
+    return score_inputs(inputs)
+
+
+def write_results(results, out_dir, stem, fmt="csv"):
+    """将一个输入文件的结果表写入输出目录，返回写出的文件路径列表"""
+    os.makedirs(out_dir, exist_ok=True)
+    if fmt == "xlsx":
+        path = os.path.join(out_dir, f"{stem}.xlsx")
+        import pandas as pd
+
+        with pd.ExcelWriter(path) as writer:
+            for key, result_df in results.items():
+                result_df.to_excel(writer, sheet_name=ASSESSMENTS[key], index=False)
+        return [path]
+
+    paths = []
+    for key, result_df in results.items():
+        path = os.path.join(out_dir, f"{stem}_{ASSESSMENTS[key]}.csv")
+        result_df.to_csv(path, index=False, encoding="utf-8-sig")  # 带BOM便于Excel直接打开
+        paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="区县集客业务考核批量评分")
+    parser.add_argument("inputs", nargs="+", help="输入文件（JSON）")
+    parser.add_argument("-o", "--output", default="output", help="输出目录，默认 output")
+    parser.add_argument("--format", choices=["csv", "xlsx"], default="csv", help="输出格式，默认 csv")
+    parser.add_argument("--org-tree", help="组织树配置文件（JSON），指定后按组织树逐级汇总计算")
+    args = parser.parse_args(argv)
+
+    tree = load_org_tree(args.org_tree) if args.org_tree else None
+
+    failed = 0
+    for path in args.inputs:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        try:
+            results = score_file(path, tree)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"{path}: 评分失败：{e!r}", file=sys.stderr)
+            failed += 1
+            continue
+        for out_path in write_results(results, args.output, stem, args.format):
+            print(out_path)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from exports import DEFAULT_CHUNKSIZE, iter_export_chunks
+from schema import as_code, as_flag, as_name, as_time, factorize_names, name_isin
+
+# --------------------------
+# 投诉工单统计：按区县计数及重复故障判定（不依赖 streamlit）
+# --------------------------
+
+
+def count_complaints(chunks, district_col="区县"):
+    """逐块按区县累计投诉次数，内存占用只与区县数相关"""
+    counts = Counter()
+    for chunk in chunks:
+        if district_col not in chunk.columns:
+            raise ValueError(f"工单文件缺少列：{district_col}")
+        districts = as_name(chunk[district_col]).value_counts()
+        counts.update(districts[districts > 0].to_dict())
+    return dict(counts)
+
+
+def load_complaint_counts(source, name=None, district_col="区县", chunksize=DEFAULT_CHUNKSIZE):
+    """读取工单导出文件并返回 {区县: 投诉次数}"""
+    chunks = iter_export_chunks(source, name=name, columns=[district_col], chunksize=chunksize)
+    return count_complaints(chunks, district_col=district_col)
+
+
+# --------------------------
+# 重复故障判定：同一电路/客户在 N 天窗口内再次报障
+# --------------------------
+
+# 视为“已解决”的取值
+RESOLVED_VALUES = {"是", "已解决", "解决", "1", "true", "True", "TRUE", "y", "Y"}
+
+
+def _to_resolved(values):
+    """将解决标识列转换为布尔数组"""
+    if values.dtype == bool:
+        return values.to_numpy()
+    return name_isin(values, RESOLVED_VALUES)
+
+
+def ticket_schema(district_col="区县", circuit_col="电路编号", time_col="受理时间", resolved_col=None):
+    """工单的紧凑列类型（见 schema.py），供读取时转换"""
+    return {
+        district_col: as_name,
+        circuit_col: as_code,
+        time_col: as_time,
+        resolved_col: as_flag(RESOLVED_VALUES),
+    }
+
+
+def detect_repeats(tickets, window_days=30, district_col="区县", circuit_col="电路编号",
+                   time_col="受理时间", resolved_col=None):
+    """按电路排序后顺序扫描，找出 window_days 天内的重复故障
+
+    返回 (各区县汇总, 重复电路明细) 两个DataFrame。汇总以区县为索引，
+    包含“重复投诉”“重复故障数”“重复故障解决率(%)”三列；未提供解决标识列
+    或区县没有重复故障时，解决率为 NaN。
+    """
+    missing = [col for col in (district_col, circuit_col, time_col, resolved_col)
+               if col and col not in tickets.columns]
+    if missing:
+        raise ValueError(f"工单文件缺少列：{', '.join(missing)}")
+
+    times = as_time(tickets[time_col])
+    valid = (times.notna() & tickets[circuit_col].notna() & tickets[district_col].notna()).to_numpy()
+
+    district_codes, district_names = factorize_names(tickets[district_col][valid])
+    circuit_codes, circuit_names = factorize_names(tickets[circuit_col][valid], strip=False)
+    stamps = times.to_numpy(dtype="datetime64[ns]")[valid].view("i8")
+
+    # 先按电路、再按受理时间排序，相邻两条同电路工单间隔不超过窗口即为重复
+    order = np.lexsort((stamps, circuit_codes))
+    sorted_codes = circuit_codes[order]
+    gaps = np.diff(stamps[order])
+    window = np.int64(window_days) * 86_400 * 10**9
+    is_repeat = np.zeros(len(order), dtype=bool)
+    is_repeat[1:] = (sorted_codes[1:] == sorted_codes[:-1]) & (gaps <= window)
+
+    repeat_rows = order[is_repeat]
+    repeat_districts = district_codes[repeat_rows]
+    repeat_counts = np.bincount(repeat_districts, minlength=len(district_names))
+
+    summary = pd.DataFrame({"重复故障数": repeat_counts}, index=pd.Index(district_names, name="区县"))
+    summary["重复投诉"] = summary["重复故障数"] > 0
+    summary["重复故障解决率(%)"] = np.nan
+    if resolved_col:
+        resolved = _to_resolved(tickets[resolved_col][valid])
+        resolved_counts = np.bincount(repeat_districts, weights=resolved[repeat_rows], minlength=len(district_names))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            summary["重复故障解决率(%)"] = np.round(resolved_counts / repeat_counts * 100, 2)
+    summary = summary.sort_index()
+
+    # 重复电路明细：同一区县同一电路的重复次数
+    pair_codes = repeat_districts.astype(np.int64) * len(circuit_names) + circuit_codes[repeat_rows]
+    pairs, pair_counts = np.unique(pair_codes, return_counts=True)
+    circuit_detail = pd.DataFrame({
+        "区县": district_names[pairs // len(circuit_names)],
+        "电路": circuit_names[pairs % len(circuit_names)],
+        "重复次数": pair_counts,
+    }).sort_values(["区县", "重复次数"], ascending=[True, False], ignore_index=True)
+    return summary, circuit_detail
@@ -1,7 +1,45 @@
+import functools
+import json
+import os
+import sqlite3
+import uuid
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 
+from assessments import (
+    ASSESSMENTS,
+    COMPLAINT_ROLLUP,
+    DELIVERY_ROLLUP,
+    DOWNSERVICE_ROLLUP,
+    complaint_units,
+    rollup_weight,
+)
+from complaints import count_complaints, detect_repeats, ticket_schema
+from delivery import FAILED_STATUSES, SUCCESS_STATUSES, order_schema, summarize_delivery
+from diagnostics import PERCENTILES, RerunTimer, TimingStore
+from exports import ExportCache
+from forecast import forecast_month
+from hierarchy import load_org_tree
+from history import list_metrics, normalize_period, query_trend, record_run, trend_changes
+from incremental import ResultCache, new_table
+from leaderboard import Leaderboard
+from outages import event_schema, summarize_outages
+from schema import unparsed_message
+from scorecard import (
+    SECTION_FULL,
+    TOTAL_FULL,
+    WATCHED_SUMMARIES,
+    active_summary,
+    add_import_weights,
+    score_card,
+)
+from scoring import RULES
+from sweep import score_distribution, sweep_complaint, sweep_frame, sweep_rate_metric, threshold_grid
+from targets import TARGET_METRICS, solve_targets, target_max_score
+from watcher import DEFAULT_WATCH_DIR, FolderWatcher
+
 # 页面设置
 st.set_page_config(
     page_title="区县集客业务管理工具",
@@ -12,17 +50,267 @@ st.set_page_config(
 # 标题
 st.title("区县集客业务管理工具")
 
-# 创建Tab标签页（新增第3个标签）
-tab1, tab2, tab3 = st.tabs([
-    "投诉及重复故障管理",
-    "集客业务交付管理",
-    "专线退服管控"
-])
+# 历史评分结果库，可通过环境变量 SCORE_HISTORY_DB 指定位置
+HISTORY_DB = os.environ.get(
+    "SCORE_HISTORY_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "score_history.sqlite3")
+)
+
+# 考核期（各标签页的评分结果按考核期记入历史库）
+period = st.sidebar.text_input(
+    "考核期（YYYY-MM）",
+    value=pd.Timestamp.today().strftime("%Y-%m"),
+    key="period"
+)
+
+# 诊断模式：记录各标签页每次重跑的分阶段耗时，默认关闭（环境变量 SCORE_DIAGNOSTICS=1 时默认开启）；
+# 设置环境变量 SCORE_DIAGNOSTICS_LOG 时，计时记录同时追加写入该文件（JSON Lines，供监控采集）
+DIAGNOSTICS_LOG = os.environ.get("SCORE_DIAGNOSTICS_LOG")
+diagnostics = st.sidebar.toggle(
+    "诊断模式（记录各阶段耗时）",
+    value=os.environ.get("SCORE_DIAGNOSTICS") == "1",
+    key="diagnostics"
+)
+
+# 结果表显示格式（列名 -> printf 格式，None 为原样显示），由浏览器端按列格式化
+COMPLAINT_FORMATS = {
+    "投诉次数": "%d次",
+    "解决率(%)": "%.2f%%",  # 显示两位小数
+    "投诉得分": None,
+    "解决率得分": None,
+    "总分": None
+}
+DELIVERY_FORMATS = {
+    "及时率(%)": "%.2f%%",  # 显示两位小数
+    "及时率得分": None,
+    "成功率(%)": "%.2f%%",
+    "成功率得分": None,
+    "总分": None
+}
+DOWNSERVICE_FORMATS = {
+    "退服率(%)": "%.2f%%",
+    "退服率得分": None,
+    "AAA中断次数": "%d次",
+    "AAA系数": None,
+    "总分": None
+}
+
+# 结果缓存容量（跨会话共享，超出后淘汰最近最少使用的结果）
+RESULT_CACHE_ENTRIES = 256
+
+# 结果表每页行数（不超过最小页行数时不分页）
+PAGE_SIZES = [50, 100, 500]
+
+
+def result_column_config(columns, formats):
+    """结果表各列的显示配置：数据居中，区县列固定在左侧"""
+    config = {}
+    for column in columns:
+        if column in formats:
+            config[column] = st.column_config.NumberColumn(format=formats[column], alignment="center")
+        else:
+            config[column] = st.column_config.TextColumn(alignment="center", pinned=column == "区县")
+    return config
+
+
+def show_table(result_df, formats, key):
+    """分页显示结果表（全市行固定在末尾）
+
+    排序和分页在服务端完成，只将当前页发送到浏览器；格式化由列配置在浏览器端完成。
+    """
+    rows, city = result_df.iloc[:-1], result_df.iloc[-1:]
+    if len(rows) > PAGE_SIZES[0]:
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            sort_by = st.selectbox("排序列", ["（默认顺序）"] + list(result_df.columns[1:]), key=f"{key}_sort_by")
+        with col2:
+            descending = st.checkbox("降序", key=f"{key}_descending")
+        with col3:
+            page_size = st.selectbox("每页行数", PAGE_SIZES, key=f"{key}_page_size")
+        pages = -(-len(rows) // page_size)
+        if st.session_state.get(f"{key}_page", 1) > pages:
+            st.session_state[f"{key}_page"] = pages  # 调大每页行数后页数变少
+        with col4:
+            page = st.number_input(f"页码（共{pages}页）", min_value=1, max_value=pages, step=1, key=f"{key}_page")
+
+        if sort_by != "（默认顺序）":
+            rows = rows.sort_values(sort_by, ascending=not descending, kind="stable")
+        rows = rows.iloc[(page - 1) * page_size:page * page_size]
+
+    st.dataframe(
+        pd.concat([rows, city]),
+        hide_index=True,
+        column_config=result_column_config(result_df.columns, formats),
+        width="stretch"
+    )
+
+
+def session_table(assessment):
+    """当前会话的增量结果表：再次提交时只重算有改动的区县行，全市汇总按差值调整"""
+    key = f"{assessment}_incremental_table"
+    if key not in st.session_state:
+        st.session_state[key] = new_table(assessment)
+    return st.session_state[key]
+
+
+@st.cache_resource
+def result_cache():
+    """跨会话共享的结果缓存"""
+    return ResultCache(RESULT_CACHE_ENTRIES)
+
+
+def scored_table(assessment, units, shared, *city_args):
+    """以参数和各区县输入为键缓存计算结果，多人查看同一月份时直接返回已有结果
+
+    未命中时由当前会话的增量结果表计算后存入缓存；命中时当前会话的增量结果表按差值同步到该结果，
+    下次提交仍只重算有改动的区县行。缓存的结果表在会话间共享，返回副本。
+    """
+    key = ResultCache.key(assessment, units, shared, city_args)
+    table = session_table(assessment)
+    result_df = result_cache().get(key)
+    if result_df is None:
+        result_df = table.update(units, shared, *city_args)
+        result_cache().put(key, result_df)
+    else:
+        table.adopt(units, shared, result_df)
+    return result_df.copy()
+
+
+def complaint_result(district_params, district_data, resolve_rate_base, resolve_rate_challenge):
+    return scored_table(
+        "complaint",
+        complaint_units(district_params, district_data),
+        (resolve_rate_base, resolve_rate_challenge),
+        district_params["全市"]
+    )
+
+
+def delivery_result(delivery_data, ontime_base, ontime_challenge, success_base, success_challenge):
+    return scored_table("delivery", delivery_data, (ontime_base, ontime_challenge, success_base, success_challenge))
+
+
+def downservice_result(downservice_data, downrate_base, downrate_challenge, aaa_factors):
+    return scored_table("downservice", downservice_data, (downrate_base, downrate_challenge, aaa_factors))
+
+
+def save_history(assessment, result_df, params):
+    """记录本次评分结果，历史库不可用时只提示，不影响评分"""
+    try:
+        period = normalize_period(st.session_state.get("period", ""))
+    except ValueError:
+        st.warning("考核期格式应为 YYYY-MM，本次结果未记入历史库")
+        return
+    try:
+        record_run(HISTORY_DB, period, assessment, result_df, params)
+    except sqlite3.Error as e:
+        st.warning(f"评分结果未能写入历史库：{e}")
+
+
+@st.cache_resource
+def export_cache():
+    """上传文件的列式磁盘缓存，跨会话共享：同一文件只解析一次，修改列名或参数后直接读取已解析的列"""
+    return ExportCache()
+
+
+def load_upload(upload, columns, schema):
+    """经磁盘缓存读取上传文件中需要的列并转为紧凑列类型，有无法解析的时间时提示"""
+    frame = export_cache().load(upload, columns=columns, schema=schema)
+    message = unparsed_message(frame)
+    if message:
+        st.warning(message)
+    return frame
+
+
+@st.cache_resource
+def timing_store():
+    """诊断模式的重跑计时记录，跨会话共享"""
+    return TimingStore(log_path=DIAGNOSTICS_LOG)
+
+
+def timed_tab(tab):
+    """标签页计时：被装饰的函数以计时器为参数，用 timer.lap(阶段) 标记各阶段结束；
+    诊断模式下每次重跑结束后记入 timing_store()"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper():
+            session = st.session_state.setdefault("diagnostics_session", uuid.uuid4().hex[:8])
+            timer = RerunTimer(tab, session=session, enabled=st.session_state.get("diagnostics", False))
+            try:
+                return func(timer)
+            finally:
+                if timer.enabled:
+                    timing_store().add(timer.record())
+        return wrapper
+    return decorator
+
+
+# 组织树（见 org_tree.json，可通过环境变量 ORG_TREE 指定），页面按其中的区县层级录入数据；
+# 前三个区县的控件键无后缀，其余带“_2”后缀
+ORG_TREE = load_org_tree()
+DISTRICTS = ORG_TREE.units_at("区县")
+
+
+def widget_key(district, name):
+    """区县输入控件的键"""
+    suffix = "" if DISTRICTS.index(district) < 3 else "_2"
+    return f"{district}_{name}{suffix}"
+
+
+def mean_label(data, rules, key):
+    """全市平均值的说明文字，按权重加权时注明权重"""
+    weight_key = rollup_weight(data.values(), rules, key)
+    return f"加权平均值（按{weight_key}）" if weight_key else "平均值"
+
+
+def current_inputs():
+    """从各标签页的控件状态读取当前参数和区县数据，格式与命令行输入文件相同"""
+    state = st.session_state
+    district_params = {
+        d: {"挑战值": state.get(widget_key(d, "challenge"), 0), "基准值": state.get(widget_key(d, "base"), 0)}
+        for d in DISTRICTS
+    }
+    district_params["全市"] = {"挑战值": state.get("city_challenge", 0), "基准值": state.get("city_base", 12)}
+    return {
+        "complaint": {
+            "resolve_rate_base": state.get("resolve_rate_base", 85.00),
+            "resolve_rate_challenge": state.get("resolve_rate_challenge", 100.00),
+            "params": district_params,
+            "data": {d: {
+                "投诉次数": state.get(widget_key(d, "complaints"), 0),
+                "重复投诉": state.get(widget_key(d, "repeated"), False),
+                "解决率": state.get(widget_key(d, "resolve_rate"), 85.00)
+            } for d in DISTRICTS}
+        },
+        "delivery": {
+            "ontime_base": state.get("ontime_base", 94.00),
+            "ontime_challenge": state.get("ontime_challenge", 96.00),
+            "success_base": state.get("success_base", 90.00),
+            "success_challenge": state.get("success_challenge", 95.00),
+            "data": {d: {
+                "及时率(%)": state.get(widget_key(d, "ontime_rate"), 95.00),
+                "成功率(%)": state.get(widget_key(d, "success_rate"), 93.00)
+            } for d in DISTRICTS}
+        },
+        "downservice": {
+            "downrate_base": state.get("downrate_base", 4.00),
+            "downrate_challenge": state.get("downrate_challenge", 3.50),
+            "aaa_factors": [state.get(k, v) for k, v in zip(
+                ("factor_0", "factor_1", "factor_2", "factor_3plus"), RULES["aaa"].default
+            )],
+            "data": {d: {
+                "退服率(%)": state.get(widget_key(d, "down_rate"), 3.00),
+                "AAA中断次数": state.get(widget_key(d, "aaa_interruptions"), 0)
+            } for d in DISTRICTS}
+        }
+    }
+
 
 # --------------------------
 # Tab1: 投诉及重复故障管理
+# 每个标签页以 fragment 运行，控件变化只重跑所在标签页，不会重跑其他标签页
 # --------------------------
-with tab1:
+@st.fragment
+@timed_tab("complaint")
+def complaint_tab(timer):
     st.write("先设置各区县及全市的基准值和挑战值，再输入投诉数据进行计算")
 
     # 1. 参数设置模块
@@ -53,7 +341,6 @@ with tab1:
 
     # 区县投诉考核参数设置
     st.write("#### 各区县投诉考核参数")
-    districts = ["东区", "高新", "西区", "仁和", "米易", "盐边", "全市"]
     district_params = {}
 
     # 定义各区县默认基准值
@@ -63,13 +350,12 @@ with tab1:
         "西区": 2,
         "仁和": 2,
         "米易": 2,
-        "盐边": 2,
-        "全市": 12
+        "盐边": 2
     }
 
     col1, col2 = st.columns(2)
     with col1:
-        for district in districts[:3]:
+        for district in DISTRICTS[:3]:
             with st.container():
                 st.write(f"##### {district}")
                 challenge = st.number_input(
@@ -84,12 +370,12 @@ with tab1:
                     min_value=0,
                     step=1,
                     key=f"{district}_base",
-                    value=default_bases[district]
+                    value=default_bases.get(district, 0)
                 )
                 district_params[district] = {"挑战值": challenge, "基准值": base}
 
     with col2:
-        for district in districts[3:6]:
+        for district in DISTRICTS[3:]:
             with st.container():
                 st.write(f"##### {district}")
                 challenge = st.number_input(
@@ -104,7 +390,7 @@ with tab1:
                     min_value=0,
                     step=1,
                     key=f"{district}_base_2",
-                    value=default_bases[district]
+                    value=default_bases.get(district, 0)
                 )
                 district_params[district] = {"挑战值": challenge, "基准值": base}
 
@@ -127,6 +413,94 @@ with tab1:
             )
             district_params["全市"] = {"挑战值": challenge, "基准值": base}
 
+    timer.lap("widgets")
+
+    # 投诉工单导入（可选）：按块读取导出文件，自动填充各区县投诉次数及重复故障情况
+    with st.expander("从投诉工单导出文件导入投诉数据（可选）"):
+        col1, col2 = st.columns(2)
+        with col1:
+            district_col = st.text_input("区县列名", value="区县", key="complaint_district_col")
+            detect_repeated = st.checkbox(
+                "根据工单自动判定重复投诉及解决率",
+                key="complaint_detect_repeated"
+            )
+            repeat_window = st.number_input(
+                "重复故障判定窗口(天)",
+                min_value=1,
+                step=1,
+                key="complaint_repeat_window",
+                value=30
+            )
+        with col2:
+            circuit_col = st.text_input("电路/客户列名", value="电路编号", key="complaint_circuit_col")
+            time_col = st.text_input("受理时间列名", value="受理时间", key="complaint_time_col")
+            resolved_col = st.text_input("是否解决列名（留空则不计算解决率）", value="是否解决",
+                                         key="complaint_resolved_col")
+
+        ticket_file = st.file_uploader(
+            "上传投诉工单导出文件（CSV/XLSX）",
+            type=["csv", "xlsx"],
+            key="complaint_ticket_file"
+        )
+        import_key = (
+            ticket_file.file_id if ticket_file is not None else None,
+            district_col, detect_repeated, repeat_window, circuit_col, time_col, resolved_col
+        )
+        if ticket_file is not None and st.session_state.get("complaint_import_key") != import_key:
+            try:
+                if detect_repeated:
+                    columns = [district_col, circuit_col, time_col] + ([resolved_col] if resolved_col else [])
+                    tickets = load_upload(ticket_file, columns, ticket_schema(
+                        district_col, circuit_col, time_col, resolved_col or None
+                    ))
+                    complaint_counts = count_complaints([tickets], district_col=district_col)
+                    repeat_summary, repeat_circuits = detect_repeats(
+                        tickets,
+                        window_days=repeat_window,
+                        district_col=district_col,
+                        circuit_col=circuit_col,
+                        time_col=time_col,
+                        resolved_col=resolved_col or None
+                    )
+                else:
+                    complaint_counts = count_complaints(
+                        [export_cache().load(ticket_file, columns=[district_col])], district_col=district_col
+                    )
+                    repeat_summary, repeat_circuits = None, None
+            except ValueError as e:
+                st.error(str(e))
+            else:
+                for i, district in enumerate(DISTRICTS):
+                    suffix = "" if i < 3 else "_2"
+                    st.session_state[f"{district}_complaints{suffix}"] = int(complaint_counts.get(district, 0))
+                    if repeat_summary is not None:
+                        st.session_state[f"{district}_repeated{suffix}"] = bool(
+                            district in repeat_summary.index and repeat_summary.at[district, "重复投诉"]
+                        )
+                        if district in repeat_summary.index and pd.notna(repeat_summary.at[district, "重复故障解决率(%)"]):
+                            st.session_state[f"{district}_resolve_rate{suffix}"] = float(
+                                repeat_summary.at[district, "重复故障解决率(%)"]
+                            )
+                st.session_state["complaint_import_key"] = import_key
+                st.session_state["complaint_repeat_circuits"] = repeat_circuits
+                st.session_state["complaint_repeat_summary"] = repeat_summary
+                st.session_state[WATCHED_SUMMARIES] = st.session_state.get(WATCHED_SUMMARIES, set()) - {"complaint_repeat_summary"}
+
+                unknown = sorted(set(complaint_counts) - set(DISTRICTS))
+                st.success(f"已导入 {sum(complaint_counts.values())} 条投诉工单")
+                if unknown:
+                    st.warning(f"以下区县不在考核范围内，已忽略：{'、'.join(unknown)}")
+
+        repeat_circuits = st.session_state.get("complaint_repeat_circuits")
+        if ticket_file is not None and repeat_circuits is not None:
+            st.write(f"##### 重复故障电路（{repeat_window}天内再次报障）")
+            if repeat_circuits.empty:
+                st.write("未发现重复故障电路")
+            else:
+                st.dataframe(repeat_circuits, hide_index=True)
+
+    timer.lap("import")
+
     # 2. 数据输入模块
     with st.form("district_data_form"):
         st.subheader("2. 各区县投诉数据输入")
@@ -135,7 +509,7 @@ with tab1:
         col1, col2 = st.columns(2)
 
         with col1:
-            for district in districts[:3]:
+            for district in DISTRICTS[:3]:
                 st.write(f"### {district}")
                 complaints = st.number_input(
                     f"{district}投诉次数",
@@ -148,13 +522,13 @@ with tab1:
                     f"{district}是否有重复投诉",
                     key=f"{district}_repeated"
                 )
+                st.session_state.setdefault(f"{district}_resolve_rate", 85.00)  # 可能已由工单导入填充
                 resolve_rate = st.number_input(
                     f"{district}重复故障解决率(%)",
                     min_value=0.00,
                     max_value=100.00,
                     step=0.01,
-                    key=f"{district}_resolve_rate",
-                    value=85.00
+                    key=f"{district}_resolve_rate"
                 )
                 district_data[district] = {
                     "投诉次数": complaints,
@@ -163,7 +537,7 @@ with tab1:
                 }
 
         with col2:
-            for district in districts[3:6]:
+            for district in DISTRICTS[3:]:
                 st.write(f"### {district}")
                 complaints = st.number_input(
                     f"{district}投诉次数",
@@ -176,13 +550,13 @@ with tab1:
                     f"{district}是否有重复投诉",
                     key=f"{district}_repeated_2"
                 )
+                st.session_state.setdefault(f"{district}_resolve_rate_2", 85.00)
                 resolve_rate = st.number_input(
                     f"{district}重复故障解决率(%)",
                     min_value=0.00,
                     max_value=100.00,
                     step=0.01,
-                    key=f"{district}_resolve_rate_2",
-                    value=85.00
+                    key=f"{district}_resolve_rate_2"
                 )
                 district_data[district] = {
                     "投诉次数": complaints,
@@ -192,122 +566,50 @@ with tab1:
 
         # 提交按钮
         submitted = st.form_submit_button("计算得分", type="primary")
+    timer.lap("widgets")
 
+    # 已按工单判定重复故障时，全市解决率按各区县重复故障数加权
+    add_import_weights(st.session_state, "complaint", district_data)
 
-    # 计算投诉压降得分函数
-    def calculate_complaint_score(complaints, district, has_repeated):
-        """按线性规则计算投诉压降得分"""
-        if district != "全市" and has_repeated:
-            return 0.0  # 非全市且有重复投诉，得0分
-
-        challenge = district_params[district]["挑战值"]
-        base = district_params[district]["基准值"]
-
-        if complaints <= challenge:
-            return 1.5  # 达到挑战值得满分
-        elif complaints <= base:
-            score_range = 1.5 * 0.4
-            x_range = base - challenge
-            if x_range == 0:
-                return 1.5
-            score_per_unit = score_range / x_range
-            return round(1.5 - score_per_unit * (complaints - challenge), 2)
-        else:
-            return 0.0  # 超过基准值不得分
-
-
-    # 计算重复故障解决率得分函数
-    def calculate_resolve_rate_score(rate):
-        """按线性规则计算重复故障解决率得分"""
-        if rate >= resolve_rate_challenge:
-            return 1.5  # 达到挑战值得满分
-        elif rate >= resolve_rate_base:
-            score_range = 1.5 * 0.4
-            rate_range = resolve_rate_challenge - resolve_rate_base
-            if rate_range == 0:
-                return 1.5
-            score_per_percent = score_range / rate_range
-            return round(0.9 + score_per_percent * (rate - resolve_rate_base), 2)
-        else:
-            return 0.0  # 低于基准值不得分
-
-
-    # 显示计算结果
+    # 计算结果保存在会话中，排序/翻页时无需重新提交
     if submitted:
-        st.subheader("各区县及全市得分计算结果")
-
-        # 准备区县数据
-        results = []
-        for district, data in district_data.items():
-            complaint_score = calculate_complaint_score(
-                data["投诉次数"], district, data["重复投诉"]
-            )
-            resolve_score = calculate_resolve_rate_score(data["解决率"])
-            total_score = round(complaint_score + resolve_score, 2)
-
-            results.append({
-                "区县": district,
-                "投诉次数": data["投诉次数"],
-                "是否重复投诉": "是" if data["重复投诉"] else "否",
-                "解决率(%)": data["解决率"],
-                "投诉得分": complaint_score,
-                "解决率得分": resolve_score,
-                "总分": total_score
-            })
-
-        # 自动汇总全市数据
-        total_complaints = sum([data["投诉次数"] for data in district_data.values()])
-        has_city_repeated = any([data["重复投诉"] for data in district_data.values()])
-        avg_resolve_rate = round(
-            np.mean([data["解决率"] for data in district_data.values()]), 2
-        )
-
-        # 计算全市得分（忽略重复投诉）
-        city_complaint_score = calculate_complaint_score(
-            total_complaints, "全市", has_repeated=False
+        result_df = complaint_result(
+            district_params, district_data, resolve_rate_base, resolve_rate_challenge
         )
-        city_resolve_score = calculate_resolve_rate_score(avg_resolve_rate)
-        city_total_score = round(city_complaint_score + city_resolve_score, 2)
-
-        # 添加全市数据到结果
-        results.append({
-            "区县": "全市",
-            "投诉次数": total_complaints,
-            "是否重复投诉": "是" if has_city_repeated else "否",
-            "解决率(%)": avg_resolve_rate,
-            "投诉得分": city_complaint_score,
-            "解决率得分": city_resolve_score,
-            "总分": city_total_score
+        timer.lap("scoring")
+        city = result_df.iloc[-1]
+        save_history("complaint", result_df, {
+            "resolve_rate_base": resolve_rate_base,
+            "resolve_rate_challenge": resolve_rate_challenge,
+            "params": district_params
         })
-
-        # 显示表格（数据居中显示）
-        result_df = pd.DataFrame(results)
-        st.table(result_df.style.set_table_styles([
-            {"selector": "td", "props": [("text-align", "center")]},
-            {"selector": "th", "props": [("text-align", "center")]}
-        ]).format({
-            "投诉次数": lambda x: f"{x}次",
-            "解决率(%)": lambda x: f"{x:.2f}%",  # 显示两位小数
-            "投诉得分": lambda x: f"{x}",
-            "解决率得分": lambda x: f"{x}",
-            "总分": lambda x: f"{x}"
-        }))
+        timer.lap("history")
 
         # 全市数据明细说明
-        st.markdown(f"""
+        st.session_state["complaint_result"] = (result_df, f"""
         #### 全市得分计算说明
-        - 投诉次数：{total_complaints}次（各区县之和）
-        - 重复投诉状态：{"有" if has_city_repeated else "无"}
-        - 解决率平均值：{avg_resolve_rate:.2f}%
-        - 投诉压降得分：{city_complaint_score}/1.5分（挑战值:{district_params["全市"]["挑战值"]}, 基准值:{district_params["全市"]["基准值"]}）
-        - 解决率得分：{city_resolve_score}/1.5分（基准值:{resolve_rate_base:.2f}%, 挑战值:{resolve_rate_challenge:.2f}%）
-        - 全市总分：{city_total_score}/3分
+        - 投诉次数：{city["投诉次数"]}次（各区县之和）
+        - 重复投诉状态：{"有" if city["是否重复投诉"] == "是" else "无"}
+        - 解决率{mean_label(district_data, COMPLAINT_ROLLUP, "解决率")}：{city["解决率(%)"]:.2f}%
+        - 投诉压降得分：{city["投诉得分"]}/{RULES["complaint"].max_score:g}分（挑战值:{district_params["全市"]["挑战值"]}, 基准值:{district_params["全市"]["基准值"]}）
+        - 解决率得分：{city["解决率得分"]}/{RULES["resolve"].max_score:g}分（基准值:{resolve_rate_base:.2f}%, 挑战值:{resolve_rate_challenge:.2f}%）
+        - 全市总分：{city["总分"]}/{RULES["complaint"].max_score + RULES["resolve"].max_score:g}分
         """)
 
+    # 显示计算结果
+    if "complaint_result" in st.session_state:
+        st.subheader("各区县及全市得分计算结果")
+        result_df, explanation = st.session_state["complaint_result"]
+        show_table(result_df, COMPLAINT_FORMATS, key="complaint_result")
+        st.markdown(explanation)
+        timer.lap("table")
+
 # --------------------------
 # Tab2: 集客业务交付管理
 # --------------------------
-with tab2:
+@st.fragment
+@timed_tab("delivery")
+def delivery_tab(timer):
     st.write("设置集客业务交付的考核标准，输入各区县及时率和成功率数据计算得分")
 
     # 1. 交付考核参数设置（可修改，带默认值）
@@ -353,32 +655,124 @@ with tab2:
             value=95.00
         )
 
+    timer.lap("widgets")
+
+    # 交付工单导入（可选）：按SLA及工作日日历自动计算各区县及时率和成功率
+    with st.expander("从交付工单导出文件计算及时率及成功率（可选）"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            sla_days = st.number_input(
+                "交付时限(工作日)",
+                min_value=0,
+                step=1,
+                key="delivery_sla_days",
+                value=5
+            )
+            holidays_text = st.text_area(
+                "节假日（每行一个日期，如2025-10-01）",
+                key="delivery_holidays"
+            )
+            use_committed = st.checkbox(
+                "有承诺时间的工单按承诺时间考核",
+                key="delivery_use_committed",
+                value=True
+            )
+            as_of = st.date_input("统计截止日期", key="delivery_as_of")
+        with col2:
+            delivery_district_col = st.text_input("区县列名", value="区县", key="delivery_district_col")
+            created_col = st.text_input("创建时间列名", value="创建时间", key="delivery_created_col")
+            committed_col = st.text_input("承诺时间列名", value="承诺时间", key="delivery_committed_col")
+            completed_col = st.text_input("完成时间列名", value="完成时间", key="delivery_completed_col")
+        with col3:
+            status_col = st.text_input("工单状态列名", value="工单状态", key="delivery_status_col")
+            success_text = st.text_input(
+                "成功状态（逗号分隔）", value="，".join(SUCCESS_STATUSES), key="delivery_success_statuses"
+            )
+            failed_text = st.text_input(
+                "失败状态（逗号分隔）", value="，".join(FAILED_STATUSES), key="delivery_failed_statuses"
+            )
+
+        order_file = st.file_uploader(
+            "上传交付工单导出文件（CSV/XLSX）",
+            type=["csv", "xlsx"],
+            key="delivery_order_file"
+        )
+        holidays = [line.strip() for line in holidays_text.splitlines() if line.strip()]
+        success_statuses = [x.strip() for x in success_text.replace("，", ",").split(",") if x.strip()]
+        failed_statuses = [x.strip() for x in failed_text.replace("，", ",").split(",") if x.strip()]
+        delivery_key = (
+            order_file.file_id if order_file is not None else None, sla_days, tuple(holidays), use_committed,
+            as_of, delivery_district_col, created_col, committed_col, completed_col, status_col,
+            tuple(success_statuses), tuple(failed_statuses)
+        )
+        if order_file is not None and st.session_state.get("delivery_import_key") != delivery_key:
+            try:
+                columns = [delivery_district_col, created_col, completed_col, status_col]
+                if use_committed:
+                    columns.append(committed_col)
+                orders = load_upload(order_file, columns, order_schema(
+                    delivery_district_col, created_col, committed_col if use_committed else None, completed_col, status_col
+                ))
+                delivery_summary = summarize_delivery(
+                    orders,
+                    as_of=pd.Timestamp(as_of) + pd.Timedelta(days=1),  # 包含截止当天
+                    sla_days=sla_days,
+                    holidays=holidays,
+                    use_committed=use_committed,
+                    district_col=delivery_district_col,
+                    created_col=created_col,
+                    committed_col=committed_col if use_committed else None,
+                    completed_col=completed_col,
+                    status_col=status_col,
+                    success_statuses=success_statuses,
+                    failed_statuses=failed_statuses
+                )
+            except ValueError as e:
+                st.error(str(e))
+            else:
+                for i, district in enumerate(DISTRICTS):
+                    suffix = "" if i < 3 else "_2"
+                    if district not in delivery_summary.index:
+                        continue
+                    for key, column in (("ontime_rate", "及时率(%)"), ("success_rate", "成功率(%)")):
+                        rate = delivery_summary.at[district, column]
+                        if pd.notna(rate):
+                            st.session_state[f"{district}_{key}{suffix}"] = float(rate)
+                st.session_state["delivery_import_key"] = delivery_key
+                st.session_state["delivery_summary"] = delivery_summary
+                st.session_state[WATCHED_SUMMARIES] = st.session_state.get(WATCHED_SUMMARIES, set()) - {"delivery_summary"}
+
+        delivery_summary = st.session_state.get("delivery_summary")
+        if order_file is not None and delivery_summary is not None:
+            st.dataframe(delivery_summary)
+
+    timer.lap("import")
+
     # 2. 数据输入模块（数字输入框，支持小数点后两位）
     with st.form("delivery_data_form"):
         st.subheader("2. 各区县交付数据输入")
 
-        districts = ["东区", "高新", "西区", "仁和", "米易", "盐边"]
         delivery_data = {}
         col1, col2 = st.columns(2)
 
         with col1:
-            for district in districts[:3]:
+            for district in DISTRICTS[:3]:
                 st.write(f"### {district}")
+                st.session_state.setdefault(f"{district}_ontime_rate", 95.00)  # 默认值，可能已由交付工单填充
+                st.session_state.setdefault(f"{district}_success_rate", 93.00)
                 ontime_rate = st.number_input(
                     f"{district}交付及时率(%)",
                     min_value=0.00,
                     max_value=100.00,
                     step=0.01,
-                    key=f"{district}_ontime_rate",
-                    value=95.00  # 默认值
+                    key=f"{district}_ontime_rate"
                 )
                 success_rate = st.number_input(
                     f"{district}交付成功率(%)",
                     min_value=0.00,
                     max_value=100.00,
                     step=0.01,
-                    key=f"{district}_success_rate",
-                    value=93.00  # 默认值
+                    key=f"{district}_success_rate"
                 )
                 delivery_data[district] = {
                     "及时率(%)": ontime_rate,
@@ -386,23 +780,23 @@ with tab2:
                 }
 
         with col2:
-            for district in districts[3:]:
+            for district in DISTRICTS[3:]:
                 st.write(f"### {district}")
+                st.session_state.setdefault(f"{district}_ontime_rate_2", 95.00)
+                st.session_state.setdefault(f"{district}_success_rate_2", 93.00)
                 ontime_rate = st.number_input(
                     f"{district}交付及时率(%)",
                     min_value=0.00,
                     max_value=100.00,
                     step=0.01,
-                    key=f"{district}_ontime_rate_2",
-                    value=95.00
+                    key=f"{district}_ontime_rate_2"
                 )
                 success_rate = st.number_input(
                     f"{district}交付成功率(%)",
                     min_value=0.00,
                     max_value=100.00,
                     step=0.01,
-                    key=f"{district}_success_rate_2",
-                    value=93.00
+                    key=f"{district}_success_rate_2"
                 )
                 delivery_data[district] = {
                     "及时率(%)": ontime_rate,
@@ -411,111 +805,50 @@ with tab2:
 
         # 提交按钮
         submit_delivery = st.form_submit_button("计算交付得分", type="primary")
+    timer.lap("widgets")
 
+    # 已导入交付工单时，全市及时率/成功率按各区县工单数加权
+    add_import_weights(st.session_state, "delivery", delivery_data)
 
-    # 计算及时率得分函数（满分2分）
-    def calculate_ontime_score(rate):
-        if rate >= ontime_challenge:
-            return 2.0  # 达到挑战值得满分
-        elif rate >= ontime_base:
-            # 基准值得60%（1.2分），挑战值与基准值间线性得分
-            score_range = 2.0 - 1.2  # 0.8分区间
-            rate_range = ontime_challenge - ontime_base
-            if rate_range == 0:
-                return 2.0
-            score_per_unit = score_range / rate_range
-            return round(1.2 + score_per_unit * (rate - ontime_base), 2)
-        else:
-            return 0.0  # 低于基准值不得分
-
-
-    # 计算成功率得分函数（满分2分）
-    def calculate_success_score(rate):
-        if rate >= success_challenge:
-            return 2.0  # 达到挑战值得满分
-        elif rate >= success_base:
-            # 基准值得60%（1.2分），挑战值与基准值间线性得分
-            score_range = 2.0 - 1.2  # 0.8分区间
-            rate_range = success_challenge - success_base
-            if rate_range == 0:
-                return 2.0
-            score_per_unit = score_range / rate_range
-            return round(1.2 + score_per_unit * (rate - success_base), 2)
-        else:
-            return 0.0  # 低于基准值不得分
-
-
-    # 显示计算结果
+    # 计算结果保存在会话中，排序/翻页时无需重新提交
     if submit_delivery:
-        st.subheader("各区县交付得分计算结果")
-
-        # 准备结果数据
-        results = []
-        total_ontime_rate = 0.0
-        total_success_rate = 0.0
-
-        for district, data in delivery_data.items():
-            ontime_score = calculate_ontime_score(data["及时率(%)"])
-            success_score = calculate_success_score(data["成功率(%)"])
-            total_score = round(ontime_score + success_score, 2)
-
-            results.append({
-                "区县": district,
-                "及时率(%)": data["及时率(%)"],
-                "及时率得分": ontime_score,
-                "成功率(%)": data["成功率(%)"],
-                "成功率得分": success_score,
-                "总分": total_score
-            })
-
-            # 累加计算全市平均值
-            total_ontime_rate += data["及时率(%)"]
-            total_success_rate += data["成功率(%)"]
-
-        # 计算全市平均值
-        avg_ontime_rate = round(total_ontime_rate / len(districts), 2)
-        avg_success_rate = round(total_success_rate / len(districts), 2)
-        city_ontime_score = calculate_ontime_score(avg_ontime_rate)
-        city_success_score = calculate_success_score(avg_success_rate)
-        city_total_score = round(city_ontime_score + city_success_score, 2)
-
-        # 添加全市数据到结果
-        results.append({
-            "区县": "全市",
-            "及时率(%)": avg_ontime_rate,
-            "及时率得分": city_ontime_score,
-            "成功率(%)": avg_success_rate,
-            "成功率得分": city_success_score,
-            "总分": city_total_score
+        result_df = delivery_result(
+            delivery_data, ontime_base, ontime_challenge, success_base, success_challenge
+        )
+        timer.lap("scoring")
+        city = result_df.iloc[-1]
+        save_history("delivery", result_df, {
+            "ontime_base": ontime_base,
+            "ontime_challenge": ontime_challenge,
+            "success_base": success_base,
+            "success_challenge": success_challenge
         })
-
-        # 显示表格（数据居中显示）
-        result_df = pd.DataFrame(results)
-        st.table(result_df.style.set_table_styles([
-            {"selector": "td", "props": [("text-align", "center")]},
-            {"selector": "th", "props": [("text-align", "center")]}
-        ]).format({
-            "及时率(%)": lambda x: f"{x:.2f}%",  # 显示两位小数
-            "及时率得分": lambda x: f"{x}",
-            "成功率(%)": lambda x: f"{x:.2f}%",
-            "成功率得分": lambda x: f"{x}",
-            "总分": lambda x: f"{x}"
-        }))
+        timer.lap("history")
 
         # 全市数据明细说明
-        st.markdown(f"""
+        st.session_state["delivery_result"] = (result_df, f"""
         #### 全市得分计算说明
-        - 及时率平均值：{avg_ontime_rate:.2f}%
-        - 及时率得分：{city_ontime_score}/2分（基准值:{ontime_base:.2f}%, 挑战值:{ontime_challenge:.2f}%）
-        - 成功率平均值：{avg_success_rate:.2f}%
-        - 成功率得分：{city_success_score}/2分（基准值:{success_base:.2f}%, 挑战值:{success_challenge:.2f}%）
-        - 全市总分：{city_total_score}/4分
+        - 及时率{mean_label(delivery_data, DELIVERY_ROLLUP, "及时率(%)")}：{city["及时率(%)"]:.2f}%
+        - 及时率得分：{city["及时率得分"]}/{RULES["ontime"].max_score:g}分（基准值:{ontime_base:.2f}%, 挑战值:{ontime_challenge:.2f}%）
+        - 成功率{mean_label(delivery_data, DELIVERY_ROLLUP, "成功率(%)")}：{city["成功率(%)"]:.2f}%
+        - 成功率得分：{city["成功率得分"]}/{RULES["success"].max_score:g}分（基准值:{success_base:.2f}%, 挑战值:{success_challenge:.2f}%）
+        - 全市总分：{city["总分"]}/{RULES["ontime"].max_score + RULES["success"].max_score:g}分
         """)
 
+    # 显示计算结果
+    if "delivery_result" in st.session_state:
+        st.subheader("各区县交付得分计算结果")
+        result_df, explanation = st.session_state["delivery_result"]
+        show_table(result_df, DELIVERY_FORMATS, key="delivery_result")
+        st.markdown(explanation)
+        timer.lap("table")
+
 # --------------------------
 # Tab3: 专线退服管控（新增）
 # --------------------------
-with tab3:
+@st.fragment
+@timed_tab("downservice")
+def downservice_tab(timer):
     st.write("设置专线退服率考核标准和AAA专线故障系数，输入各区县数据计算得分")
 
     # 1. 退服率考核参数设置
@@ -554,7 +887,7 @@ with tab3:
             max_value=1.0,
             step=0.01,
             key="factor_0",
-            value=1.0
+            value=RULES["aaa"].default[0]
         )
     with col2:
         factor_1 = st.number_input(
@@ -563,7 +896,7 @@ with tab3:
             max_value=1.0,
             step=0.01,
             key="factor_1",
-            value=0.8
+            value=RULES["aaa"].default[1]
         )
     with col3:
         factor_2 = st.number_input(
@@ -572,7 +905,7 @@ with tab3:
             max_value=1.0,
             step=0.01,
             key="factor_2",
-            value=0.6
+            value=RULES["aaa"].default[2]
         )
     with col4:
         factor_3plus = st.number_input(
@@ -581,7 +914,7 @@ with tab3:
             max_value=1.0,
             step=0.01,
             key="factor_3plus",
-            value=0.0
+            value=RULES["aaa"].default[3]
         )
 
     # 创建中断次数到系数的映射
@@ -592,24 +925,100 @@ with tab3:
         3: factor_3plus  # 3次及以上使用相同系数
     }
 
+    timer.lap("widgets")
+
+    # 退服日志导入（可选）：合并各电路重叠退服区间，自动计算退服率和AAA中断次数
+    with st.expander("从专线退服事件日志计算退服率及AAA中断次数（可选）"):
+        col1, col2 = st.columns(2)
+        with col1:
+            outage_period = st.date_input(
+                "考核期（起止日期）",
+                value=(pd.Timestamp.today().replace(day=1).date(), pd.Timestamp.today().date()),
+                key="outage_period"
+            )
+            outage_district_col = st.text_input("区县列名", value="区县", key="outage_district_col")
+            outage_circuit_col = st.text_input("电路编号列名", value="电路编号", key="outage_circuit_col")
+        with col2:
+            outage_start_col = st.text_input("退服开始时间列名", value="开始时间", key="outage_start_col")
+            outage_end_col = st.text_input("退服结束时间列名", value="结束时间", key="outage_end_col")
+            outage_aaa_col = st.text_input("AAA标识列名", value="是否AAA", key="outage_aaa_col")
+
+        st.write("各区县专线总数（填0则以日志中出现的电路数计算）")
+        line_count_df = st.data_editor(
+            pd.DataFrame({"区县": DISTRICTS, "专线总数": [0] * len(DISTRICTS)}),
+            hide_index=True,
+            disabled=["区县"],
+            key="outage_line_counts"
+        )
+        outage_file = st.file_uploader(
+            "上传专线退服事件日志（CSV/XLSX）",
+            type=["csv", "xlsx"],
+            key="outage_event_file"
+        )
+        line_counts = dict(zip(line_count_df["区县"], line_count_df["专线总数"]))
+        outage_key = (
+            outage_file.file_id if outage_file is not None else None, tuple(outage_period),
+            outage_district_col, outage_circuit_col, outage_start_col, outage_end_col, outage_aaa_col,
+            tuple(sorted(line_counts.items()))
+        )
+        if outage_file is not None and len(outage_period) == 2 \
+                and st.session_state.get("outage_import_key") != outage_key:
+            try:
+                outage_columns = [
+                    outage_district_col, outage_circuit_col, outage_start_col, outage_end_col, outage_aaa_col
+                ]
+                events = load_upload(outage_file, outage_columns, event_schema(*outage_columns))
+                outage_summary = summarize_outages(
+                    events,
+                    period_start=outage_period[0],
+                    period_end=pd.Timestamp(outage_period[1]) + pd.Timedelta(days=1),  # 包含结束当天
+                    line_counts=line_counts,
+                    district_col=outage_district_col,
+                    circuit_col=outage_circuit_col,
+                    start_col=outage_start_col,
+                    end_col=outage_end_col,
+                    aaa_col=outage_aaa_col
+                )
+            except ValueError as e:
+                st.error(str(e))
+            else:
+                for i, district in enumerate(DISTRICTS):
+                    suffix = "" if i < 3 else "_2"
+                    if district in outage_summary.index:
+                        down_rate = float(outage_summary.at[district, "退服率(%)"])
+                        aaa_interruptions = int(outage_summary.at[district, "AAA中断次数"])
+                    else:
+                        down_rate, aaa_interruptions = 0.0, 0
+                    st.session_state[f"{district}_down_rate{suffix}"] = min(down_rate, 100.0)
+                    st.session_state[f"{district}_aaa_interruptions{suffix}"] = min(aaa_interruptions, 10)
+                st.session_state["outage_import_key"] = outage_key
+                st.session_state["outage_summary"] = outage_summary
+                st.session_state[WATCHED_SUMMARIES] = st.session_state.get(WATCHED_SUMMARIES, set()) - {"outage_summary"}
+
+        outage_summary = st.session_state.get("outage_summary")
+        if outage_file is not None and outage_summary is not None:
+            st.dataframe(outage_summary)
+
+    timer.lap("import")
+
     # 3. 数据输入模块
     with st.form("downservice_data_form"):
         st.subheader("3. 各区县专线退服数据输入")
 
-        districts = ["东区", "高新", "西区", "仁和", "米易", "盐边"]
         downservice_data = {}
         col1, col2 = st.columns(2)
 
         with col1:
-            for district in districts[:3]:
+            for district in DISTRICTS[:3]:
                 st.write(f"### {district}")
+                st.session_state.setdefault(f"{district}_down_rate", 3.00)  # 默认值，可能已由退服日志填充
+                st.session_state.setdefault(f"{district}_aaa_interruptions", 0)
                 down_rate = st.number_input(
                     f"{district}专线退服率(%)",
                     min_value=0.00,
                     max_value=100.00,
                     step=0.01,
-                    key=f"{district}_down_rate",
-                    value=3.00  # 默认值
+                    key=f"{district}_down_rate"
                 )
                 aaa_interruptions = st.number_input(
                     f"{district}AAA专线中断次数",
@@ -617,7 +1026,6 @@ with tab3:
                     max_value=10,
                     step=1,
                     key=f"{district}_aaa_interruptions",
-                    value=0,
                     format="%d"
                 )
                 downservice_data[district] = {
@@ -626,15 +1034,16 @@ with tab3:
                 }
 
         with col2:
-            for district in districts[3:]:
+            for district in DISTRICTS[3:]:
                 st.write(f"### {district}")
+                st.session_state.setdefault(f"{district}_down_rate_2", 3.00)
+                st.session_state.setdefault(f"{district}_aaa_interruptions_2", 0)
                 down_rate = st.number_input(
                     f"{district}专线退服率(%)",
                     min_value=0.00,
                     max_value=100.00,
                     step=0.01,
-                    key=f"{district}_down_rate_2",
-                    value=3.00
+                    key=f"{district}_down_rate_2"
                 )
                 aaa_interruptions = st.number_input(
                     f"{district}AAA专线中断次数",
@@ -642,7 +1051,6 @@ with tab3:
                     max_value=10,
                     step=1,
                     key=f"{district}_aaa_interruptions_2",
-                    value=0,
                     format="%d"
                 )
                 downservice_data[district] = {
@@ -652,97 +1060,654 @@ with tab3:
 
         # 提交按钮
         submit_downservice = st.form_submit_button("计算退服管控得分", type="primary")
+    timer.lap("widgets")
 
+    # 已导入退服日志时，全市退服率按各区县专线总数加权
+    add_import_weights(st.session_state, "downservice", downservice_data)
 
-    # 计算退服率得分函数（满分4分）
-    def calculate_downrate_score(rate):
-        if rate <= downrate_challenge:
-            return 4.0  # 达到挑战值得满分
-        elif rate <= downrate_base:
-            # 基准值得60%（2.4分），挑战值与基准值间线性得分
-            score_range = 4.0 - 2.4  # 1.6分区间
-            rate_range = downrate_base - downrate_challenge
-            if rate_range == 0:
-                return 4.0
-            score_per_unit = score_range / rate_range
-            return round(2.4 + score_per_unit * (downrate_base - rate), 2)
-        else:
-            return 0.0  # 超过基准值不得分
-
-
-    # 计算AAA中断系数
-    def get_aaa_factor(interruptions):
-        return aaa_factors[min(interruptions, 3)]  # 3次及以上使用factor_3plus
+    # 计算结果保存在会话中，排序/翻页时无需重新提交
+    if submit_downservice:
+        result_df = downservice_result(
+            downservice_data, downrate_base, downrate_challenge, aaa_factors
+        )
+        timer.lap("scoring")
+        city = result_df.iloc[-1]
+        save_history("downservice", result_df, {
+            "downrate_base": downrate_base,
+            "downrate_challenge": downrate_challenge,
+            "aaa_factors": list(aaa_factors.values())
+        })
+        timer.lap("history")
 
+        # 全市数据明细说明
+        st.session_state["downservice_result"] = (result_df, f"""
+        #### 全市得分计算说明
+        - 退服率{mean_label(downservice_data, DOWNSERVICE_ROLLUP, "退服率(%)")}：{city["退服率(%)"]:.2f}%
+        - 退服率得分：{city["退服率得分"]}/{RULES["downrate"].max_score:g}分（基准值:{downrate_base:.2f}%, 挑战值:{downrate_challenge:.2f}%）
+        - AAA中断次数平均值：{city["AAA中断次数"]}次
+        - AAA系数：{city["AAA系数"]}
+        - 全市总分：{city["总分"]}/{RULES["downrate"].max_score:g}分
+        """)
 
     # 显示计算结果
-    if submit_downservice:
+    if "downservice_result" in st.session_state:
         st.subheader("各区县专线退服管控得分计算结果")
+        result_df, explanation = st.session_state["downservice_result"]
+        show_table(result_df, DOWNSERVICE_FORMATS, key="downservice_result")
+        st.markdown(explanation)
+        timer.lap("table")
+
+
+# --------------------------
+# Tab4: 综合计分卡
+# --------------------------
+SCORECARD_FORMATS = {
+    "投诉得分": None,
+    "解决率得分": None,
+    ASSESSMENTS["complaint"]: None,
+    "及时率得分": None,
+    "成功率得分": None,
+    ASSESSMENTS["delivery"]: None,
+    "退服率得分": None,
+    "AAA系数": None,
+    ASSESSMENTS["downservice"]: None,
+    "总分": None,
+    **{f"{name}排名": "%d" for name in list(ASSESSMENTS.values()) + ["总分"]},
+}
+
+
+def weighted_inputs():
+    """当前页面输入，并按各标签页导入的汇总表加入全市汇总权重（与各标签页计算一致）"""
+    inputs = current_inputs()
+    for assessment in ASSESSMENTS:
+        add_import_weights(st.session_state, assessment, inputs[assessment]["data"])
+    return inputs
+
+
+@st.fragment
+@timed_tab("scorecard")
+def scorecard_tab(timer):
+    st.write("一次计算三项考核的各区县及全市得分，并列显示各项总分、合计及区县排名")
+
+    inputs = selected_inputs("scorecard", current=weighted_inputs)
+    if inputs is None:
+        return
+    timer.lap("widgets")
+
+    try:
+        card = score_card(inputs)
+    except (KeyError, ValueError) as e:
+        st.error(f"无法计算综合计分卡：{e}")
+        return
+    timer.lap("scoring")
+
+    st.caption("满分：" + "，".join(f"{ASSESSMENTS[key]} {full:g} 分" for key, full in SECTION_FULL.items())
+               + f"，合计 {TOTAL_FULL:g} 分；排名按得分从高到低，并列取相同名次")
+    show_table(card, SCORECARD_FORMATS, key="scorecard")
+    timer.lap("table")
+
+
+# --------------------------
+# Tab5: 排行榜
+# --------------------------
+# 排行榜数据来源 -> 会话中保存结果表的键（None 为按当前页面输入计算的综合计分卡）
+LEADERBOARD_SOURCES = {
+    "综合计分卡（当前页面输入）": None,
+    ASSESSMENTS["complaint"]: "complaint_result",
+    ASSESSMENTS["delivery"]: "delivery_result",
+    ASSESSMENTS["downservice"]: "downservice_result",
+}
+
+
+def score_columns(result_df):
+    """结果表中可排名的得分列（各单项得分、各项总分及合计）"""
+    return [c for c in result_df.columns
+            if c.endswith("得分") or c == "总分" or c in ASSESSMENTS.values()]
+
+
+def session_leaderboard(source, columns):
+    """当前会话中一个数据来源的排行榜，结果表再次更新时只调整变化单位的得分"""
+    key = f"leaderboard_{source}"
+    board = st.session_state.get(key)
+    if board is None or board.columns != columns:
+        board = st.session_state[key] = Leaderboard(columns)
+    return board
+
+
+@st.fragment
+@timed_tab("leaderboard")
+def leaderboard_tab(timer):
+    st.write("按各标签页的计算结果列出各单项得分、各项总分及合计的前/后 N 名和百分位，可按名称和百分位筛选")
+
+    source = st.selectbox("数据来源", list(LEADERBOARD_SOURCES), key="leaderboard_source")
+    result_key = LEADERBOARD_SOURCES[source]
+    if result_key is None:
+        try:
+            result_df = score_card(weighted_inputs())
+        except (KeyError, ValueError) as e:
+            st.error(f"无法计算综合计分卡：{e}")
+            return
+    elif result_key in st.session_state:
+        result_df = st.session_state[result_key][0]
+    else:
+        st.info(f"请先在“{source}”标签页计算得分", icon="📋")
+        return
+    rows = result_df.iloc[:-1]  # 全市不参与排名
+    columns = score_columns(rows)
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        column = st.selectbox("排名指标", columns, index=len(columns) - 1, key="leaderboard_metric")
+    with col2:
+        largest = st.radio("排行", ["前 N 名", "后 N 名"], horizontal=True, key="leaderboard_order") == "前 N 名"
+    with col3:
+        n = st.number_input("N", min_value=1, value=min(10, max(len(rows), 1)), step=1, key="leaderboard_n")
+    with col4:
+        contains = st.text_input("名称包含", key="leaderboard_contains").strip()
+    percentile_range = st.slider("百分位范围(%)", 0.0, 100.0, (0.0, 100.0), step=1.0,
+                                 key="leaderboard_percentiles")
+    timer.lap("widgets")
+
+    board = session_leaderboard(source, columns)
+    board.update(rows)
+    standings = board.standings(column, n=n, largest=largest, contains=contains or None,
+                                percentile_range=percentile_range)
+    timer.lap("scoring")
+
+    st.caption(f"共 {len(rows)} 个单位，筛选后显示 {len(standings)} 个；名次和百分位为在全部单位中的位置，"
+               "并列取相同名次，百分位为得分不高于该单位的单位占比")
+    st.dataframe(
+        standings,
+        hide_index=True,
+        column_config={
+            "名次": st.column_config.NumberColumn(format="%d"),
+            "百分位(%)": st.column_config.NumberColumn(format="%.2f%%"),
+        }
+    )
+    timer.lap("table")
+
+
+# --------------------------
+# Tab6: 参数模拟
+# --------------------------
+# 可模拟的指标：名称 -> (指标键, 所属考核, 基准值默认范围, 挑战值默认范围)
+SWEEP_OPTIONS = {
+    "重复故障解决率": ("resolve", "complaint", (80.00, 95.00), (90.00, 100.00)),
+    "交付及时率": ("ontime", "delivery", (90.00, 96.00), (94.00, 100.00)),
+    "交付成功率": ("success", "delivery", (85.00, 95.00), (90.00, 100.00)),
+    "专线退服率": ("downrate", "downservice", (3.00, 6.00), (2.00, 5.00)),
+}
+
+
+def range_inputs(label, default_range, step, key, integer=False):
+    """起止值及步长输入，返回候选值序列"""
+    col1, col2, col3 = st.columns(3)
+    number = int if integer else float
+    with col1:
+        start = st.number_input(f"{label}起始", value=number(default_range[0]), step=number(step),
+                                key=f"{key}_start")
+    with col2:
+        stop = st.number_input(f"{label}结束", value=number(default_range[1]), step=number(step),
+                               key=f"{key}_stop")
+    with col3:
+        step = st.number_input(f"{label}步长", min_value=1 if integer else 0.01, value=number(step),
+                               step=number(step), key=f"{key}_step")
+    return np.arange(start, stop + 1, step) if integer else threshold_grid(start, stop, step)
+
+
+def selected_inputs(key, current=current_inputs):
+    """选择区县数据来源（当前页面输入或上传的历史输入文件），返回输入字典，未上传或解析失败时返回 None
+
+    current 为读取当前页面输入的函数。
+    """
+    source = st.radio("区县数据来源", ["当前页面输入", "上传历史输入文件（JSON，格式同命令行）"],
+                      horizontal=True, key=f"{key}_source")
+    if source == "当前页面输入":
+        return current()
+    history_file = st.file_uploader("上传历史输入文件", type=["json"], key=f"{key}_history_file")
+    if history_file is None:
+        st.info("请上传历史输入文件", icon="📋")
+        return None
+    try:
+        return json.load(history_file)
+    except ValueError as e:
+        st.error(f"文件解析失败：{e}")
+        return None
+
+
+@st.fragment
+@timed_tab("sweep")
+def sweep_tab(timer):
+    st.write("对一组候选基准值/挑战值一次性计算各区县及全市得分，比较不同阈值设置下的得分分布")
+
+    inputs = selected_inputs("sweep", current=weighted_inputs)
+    if inputs is None:
+        return
+
+    metric_name = st.selectbox("模拟指标", ["投诉压降"] + list(SWEEP_OPTIONS), key="sweep_metric")
+    if metric_name == "投诉压降":
+        section = inputs.get("complaint")
+        if section is None:
+            st.warning("输入文件中没有投诉考核数据")
+            return
+        st.write("在各区县及全市现有挑战值/基准值上叠加统一调整量")
+        base_values = range_inputs("基准值调整量", (-2, 3), 1, "sweep_complaint_base", integer=True)
+        challenge_values = range_inputs("挑战值调整量", (0, 2), 1, "sweep_complaint_challenge", integer=True)
+        base_label, challenge_label = "基准值调整量", "挑战值调整量"
+        names = list(section["data"]) + ["全市"]
+        complaints = [section["data"][d]["投诉次数"] for d in names[:-1]]
+        repeated = [bool(section["data"][d]["重复投诉"]) for d in names[:-1]] + [False]
+        timer.lap("widgets")
+        scores = sweep_complaint(
+            complaints + [sum(complaints)],
+            repeated,
+            [section["params"][d]["挑战值"] for d in names],
+            [section["params"][d]["基准值"] for d in names],
+            challenge_values,
+            base_values
+        )
+    else:
+        metric, assessment, base_range, challenge_range = SWEEP_OPTIONS[metric_name]
+        section = inputs.get(assessment)
+        if section is None:
+            st.warning(f"输入文件中没有{metric_name}数据")
+            return
+        base_values = range_inputs("基准值(%)", base_range, 0.05, f"sweep_{metric}_base")
+        challenge_values = range_inputs("挑战值(%)", challenge_range, 0.05, f"sweep_{metric}_challenge")
+        base_label, challenge_label = "基准值(%)", "挑战值(%)"
+        names = list(section["data"]) + ["全市"]
+        timer.lap("widgets")
+        scores = sweep_rate_metric(
+            metric, [section["data"][d] for d in names[:-1]], base_values, challenge_values
+        )
+
+    timer.lap("scoring")
+    st.write(f"共 {len(base_values) * len(challenge_values)} 种阈值组合（无效组合不计入统计）")
+    if scores.size == 0:
+        return
+
+    st.write("#### 各区县及全市得分分布")
+    st.dataframe(score_distribution(scores, names))
+    timer.lap("table")
+
+    st.write("#### 得分热力图")
+    target = st.selectbox("显示对象", names[::-1], key="sweep_target")
+    frame = sweep_frame(scores, names, base_values, challenge_values, base_label, challenge_label)
+    st.vega_lite_chart(frame[[base_label, challenge_label, target]].dropna(), {
+        "mark": {"type": "rect", "tooltip": True},
+        "encoding": {
+            "x": {"field": base_label, "type": "ordinal", "axis": {"labelOverlap": True}},
+            "y": {"field": challenge_label, "type": "ordinal", "sort": "descending", "axis": {"labelOverlap": True}},
+            "color": {"field": target, "type": "quantitative", "title": "得分", "scale": {"scheme": "viridis"}},
+        },
+    }, width="stretch")
+    timer.lap("chart")
+
+
+# --------------------------
+# Tab7: 目标反推
+# --------------------------
+def parse_targets(text):
+    """解析以逗号或空格分隔的目标得分"""
+    return sorted({float(v) for v in text.replace("，", ",").replace(",", " ").split()})
+
+
+@st.fragment
+@timed_tab("targets")
+def targets_tab(timer):
+    st.write("由目标得分反推各区县及全市需要达到的指标值（如投诉次数最多几次、退服率最高多少），"
+             "已计入重复投诉和AAA中断系数的影响")
+
+    inputs = selected_inputs("targets")
+    if inputs is None:
+        return
+
+    metric = st.selectbox("指标", list(TARGET_METRICS), format_func=lambda m: TARGET_METRICS[m][0],
+                          key="targets_metric")
+    max_score = target_max_score(metric)
+    text = st.text_input(
+        "目标得分（多个用逗号分隔）",
+        value=", ".join(f"{v:g}" for v in (round(max_score * 0.6, 2), round(max_score * 0.8, 2), max_score)),
+        key=f"targets_scores_{metric}"
+    )
+    try:
+        targets = parse_targets(text)
+    except ValueError:
+        st.error("目标得分应为数字，多个用逗号分隔")
+        return
+    if not targets:
+        return
+    if TARGET_METRICS[metric][1] not in inputs:
+        st.warning(f"输入文件中没有{TARGET_METRICS[metric][0]}数据")
+        return
+    timer.lap("widgets")
+
+    frame = solve_targets(inputs, metric, targets)
+    timer.lap("scoring")
+
+    value_label = "最多投诉次数" if metric == "complaint" else (
+        "所需值（上限）" if metric in ("downrate", "downservice") else "所需值（下限）"
+    )
+    value_format = "%d" if metric == "complaint" else "%.2f"
+    if "最多AAA中断次数" in frame:
+        frame["最多AAA中断次数"] = [
+            "不限" if np.isinf(v) else ("" if np.isnan(v) else f"{v:.0f}") for v in frame["最多AAA中断次数"]
+        ]
+    st.caption("达不到的所需值留空并注明原因；差距为所需值减当前值")
+    st.dataframe(
+        frame.replace([np.inf, -np.inf], np.nan).rename(columns={"所需值": value_label}),
+        hide_index=True,
+        column_config={
+            "当前值": st.column_config.NumberColumn(format=value_format),
+            value_label: st.column_config.NumberColumn(format=value_format),
+            "差距": st.column_config.NumberColumn(format=value_format),
+        }
+    )
+    timer.lap("table")
 
-        # 准备结果数据
-        results = []
-        total_down_rate = 0.0
-        total_aaa_interruptions = 0
-
-        for district, data in downservice_data.items():
-            # 计算退服率得分
-            downrate_score = calculate_downrate_score(data["退服率(%)"])
-
-            # 获取AAA中断系数
-            aaa_factor = get_aaa_factor(data["AAA中断次数"])
-
-            # 计算总得分
-            total_score = round(downrate_score * aaa_factor, 2)
-
-            results.append({
-                "区县": district,
-                "退服率(%)": data["退服率(%)"],
-                "退服率得分": downrate_score,
-                "AAA中断次数": data["AAA中断次数"],
-                "AAA系数": aaa_factor,
-                "总分": total_score
-            })
-
-            # 累加计算全市平均值
-            total_down_rate += data["退服率(%)"]
-            total_aaa_interruptions += data["AAA中断次数"]
-
-        # 计算全市平均值
-        avg_down_rate = round(total_down_rate / len(districts), 2)
-        avg_aaa_interruptions = round(total_aaa_interruptions / len(districts))
-        city_downrate_score = calculate_downrate_score(avg_down_rate)
-        city_aaa_factor = get_aaa_factor(avg_aaa_interruptions)
-        city_total_score = round(city_downrate_score * city_aaa_factor, 2)
-
-        # 添加全市数据到结果
-        results.append({
-            "区县": "全市",
-            "退服率(%)": avg_down_rate,
-            "退服率得分": city_downrate_score,
-            "AAA中断次数": avg_aaa_interruptions,
-            "AAA系数": city_aaa_factor,
-            "总分": city_total_score
+
+# --------------------------
+# Tab8: 月末预测
+# --------------------------
+def summary_counts(key, column):
+    """会话中有效的导入汇总表里各区县的计数，未导入（或上传的文件已移除）或没有该区县时为0"""
+    summary = active_summary(st.session_state, key)
+    if summary is None:
+        return [0] * len(DISTRICTS)
+    values = summary[column].reindex(DISTRICTS)
+    return [0 if pd.isna(v) else v for v in values]
+
+
+def month_to_date_frames():
+    """月末预测的至今计数初始值：取各标签页导入的汇总结果，投诉次数、重复投诉和AAA中断次数取页面输入"""
+    inputs = current_inputs()
+    faults = summary_counts("complaint_repeat_summary", "重复故障数")
+    resolve_rates = summary_counts("complaint_repeat_summary", "重复故障解决率(%)")
+    return {
+        "complaint": pd.DataFrame({
+            "区县": DISTRICTS,
+            "投诉次数": [inputs["complaint"]["data"][d]["投诉次数"] for d in DISTRICTS],
+            "重复投诉": [inputs["complaint"]["data"][d]["重复投诉"] for d in DISTRICTS],
+            "重复故障数": [int(n) for n in faults],
+            "已解决重复故障数": [int(round(n * r / 100)) for n, r in zip(faults, resolve_rates)],
+        }),
+        "delivery": pd.DataFrame({
+            "区县": DISTRICTS,
+            **{column: [int(n) for n in summary_counts("delivery_summary", column)]
+               for column in ("应完成工单数", "按时完成工单数", "已结束工单数", "成功工单数")},
+        }),
+        "downservice": pd.DataFrame({
+            "区县": DISTRICTS,
+            "退服时长(小时)": [float(n) for n in summary_counts("outage_summary", "退服时长(小时)")],
+            "退服次数": [int(n) for n in summary_counts("outage_summary", "退服次数")],
+            "专线总数": [int(n) for n in summary_counts("outage_summary", "专线总数")],
+            "AAA中断次数": [inputs["downservice"]["data"][d]["AAA中断次数"] for d in DISTRICTS],
+        }),
+    }
+
+
+@st.fragment
+@timed_tab("forecast")
+def forecast_tab(timer):
+    st.write("由月初至今的投诉、工单和退服计数模拟本月剩余天数，预测各区县及全市月末得分的分布，"
+             "以及达到挑战值（得满分）和基准值的概率")
+
+    today = pd.Timestamp.today()
+    with st.form("forecast_form"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            days_elapsed = st.number_input("已过天数（计数覆盖的天数）", min_value=1, max_value=31,
+                                           value=max(today.day - 1, 1), key="forecast_days_elapsed")
+        with col2:
+            days_in_month = st.number_input("本月天数", min_value=28, max_value=31,
+                                            value=today.days_in_month, key="forecast_days_in_month")
+        with col3:
+            draws = st.selectbox("每个区县的模拟次数", [10_000, 100_000, 1_000_000], index=1,
+                                 format_func=lambda n: f"{n:,}", key="forecast_draws")
+        st.caption("考核参数取各标签页当前设置；至今计数默认取各标签页导入的汇总结果，可直接修改")
+        edited = {}
+        for key, frame in month_to_date_frames().items():
+            st.write(f"##### {ASSESSMENTS[key]}")
+            edited[key] = st.data_editor(frame, hide_index=True, disabled=["区县"], key=f"forecast_{key}_counts")
+        submitted = st.form_submit_button("模拟预测", type="primary")
+    timer.lap("widgets")
+
+    # 只保存汇总表和总分分布，不在会话中保留全部模拟结果
+    if submitted:
+        inputs = current_inputs()
+        for key, frame in edited.items():
+            for row in frame.to_dict("records"):
+                inputs[key]["data"][row.pop("区县")].update(row)
+        try:
+            forecasts = forecast_month(inputs, days_elapsed, days_in_month, draws=draws, seed=0)
+        except ValueError as e:
+            st.error(str(e))
+            return
+        st.session_state["forecast_result"] = (days_elapsed, days_in_month, draws, {
+            key: (forecast.summary(), {unit: forecast.distribution(unit) for unit in forecast.names})
+            for key, forecast in forecasts.items()
+        })
+        timer.lap("scoring")
+
+    if "forecast_result" not in st.session_state:
+        return
+    days_elapsed, days_in_month, draws, results = st.session_state["forecast_result"]
+    st.write(f"已过 {days_elapsed} 天、剩余 {days_in_month - days_elapsed} 天，每个区县模拟 {draws:,} 次")
+    probabilities = ["达到挑战值概率", "达到基准值概率"]
+    for key, (summary, _) in results.items():
+        st.write(f"#### {ASSESSMENTS[key]}")
+        summary = summary.copy()
+        summary[probabilities] = summary[probabilities] * 100
+        st.dataframe(summary, hide_index=True, column_config={
+            column: st.column_config.NumberColumn(format="%.1f%%") for column in probabilities
         })
+    timer.lap("table")
 
-        # 显示表格（数据居中显示）
-        result_df = pd.DataFrame(results)
-        st.table(result_df.style.set_table_styles([
-            {"selector": "td", "props": [("text-align", "center")]},
-            {"selector": "th", "props": [("text-align", "center")]}
-        ]).format({
-            "退服率(%)": lambda x: f"{x:.2f}%",
-            "退服率得分": lambda x: f"{x}",
-            "AAA中断次数": lambda x: f"{x}次",
-            "AAA系数": lambda x: f"{x}",
-            "总分": lambda x: f"{x}"
-        }))
+    st.write("#### 月末总分分布")
+    col1, col2 = st.columns(2)
+    with col1:
+        assessment = st.selectbox("考核", list(results), format_func=ASSESSMENTS.get, key="forecast_chart_assessment")
+    with col2:
+        unit = st.selectbox("区县", list(results[assessment][1]), key="forecast_chart_unit")
+    st.bar_chart(results[assessment][1][unit].rename(index=lambda v: f"{v:g}"))
+    timer.lap("chart")
 
-        # 全市数据明细说明
-        st.markdown(f"""
-        #### 全市得分计算说明
-        - 退服率平均值：{avg_down_rate:.2f}%
-        - 退服率得分：{city_downrate_score}/4分（基准值:{downrate_base:.2f}%, 挑战值:{downrate_challenge:.2f}%）
-        - AAA中断次数平均值：{avg_aaa_interruptions}次
-        - AAA系数：{city_aaa_factor}
-        - 全市总分：{city_total_score}/4分
-        """)
+
+# --------------------------
+# Tab9: 历史趋势
+# --------------------------
+def metric_label(metric):
+    """指标名显示为“考核名称 - 列名”"""
+    assessment, column = metric.split(":", 1)
+    return f"{ASSESSMENTS.get(assessment, assessment)} - {column}"
+
+
+@st.fragment
+@timed_tab("history")
+def history_tab(timer):
+    st.write("查询历次评分结果，按考核期查看各区县指标走势及同比、环比变化")
+
+    try:
+        metrics = list_metrics(HISTORY_DB)
+    except sqlite3.Error as e:
+        st.error(f"历史库读取失败：{e}")
+        return
+    if not metrics:
+        st.info("暂无历史评分记录，在前面的标签页计算得分后会自动记录", icon="📋")
+        return
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        metric = st.selectbox("指标", metrics, format_func=metric_label, key="history_metric")
+    with col2:
+        start = st.text_input("起始考核期（YYYY-MM，留空不限）", key="history_start")
+    with col3:
+        end = st.text_input("结束考核期（YYYY-MM，留空不限）", key="history_end")
+    districts = st.multiselect("区县（留空为全部）", DISTRICTS + ["全市"], key="history_districts")
+    timer.lap("widgets")
+
+    try:
+        trend = query_trend(HISTORY_DB, metric, districts=districts, start=start or None, end=end or None)
+    except ValueError as e:
+        st.warning(str(e))
+        return
+    timer.lap("query")
+    if trend.empty:
+        st.info("所选范围内没有记录", icon="📋")
+        return
+
+    st.write(f"#### {metric_label(metric)}")
+    st.line_chart(trend)
+    timer.lap("chart")
+    st.write("#### 同比、环比变化")
+    st.dataframe(trend_changes(trend))
+    timer.lap("table")
+
+
+# --------------------------
+# 监控目录导入（设置环境变量 SCORE_WATCH_DIR 时启用）：后台线程解析共享目录中新增的导出文件并预先汇总，
+# 会话开始时自动载入当前考核期的汇总，之后有更新时在侧边栏手动载入（避免覆盖正在修改的输入）
+# --------------------------
+WATCH_LABELS = {"tickets": "投诉工单", "orders": "交付工单", "events": "退服事件"}
+
+
+@st.cache_resource
+def folder_watcher():
+    """监控目录的后台导入线程，跨会话共享"""
+    return FolderWatcher(DEFAULT_WATCH_DIR).start()
+
+
+def apply_watch_summaries(summaries):
+    """将监控目录的汇总结果写入各标签页的区县输入控件（与上传导出文件的导入方式相同）"""
+    state = st.session_state
+    tickets, orders, events = (summaries.get(kind) for kind in ("tickets", "orders", "events"))
+    for district in DISTRICTS:
+        if tickets is not None:
+            state[widget_key(district, "complaints")] = int(tickets["投诉次数"].get(district, 0))
+            state[widget_key(district, "repeated")] = bool(tickets["重复投诉"].get(district, False))
+            resolve_rate = tickets["重复故障解决率(%)"].get(district)
+            if pd.notna(resolve_rate):
+                state[widget_key(district, "resolve_rate")] = float(resolve_rate)
+        if orders is not None:
+            for key, column in (("ontime_rate", "及时率(%)"), ("success_rate", "成功率(%)")):
+                rate = orders[column].get(district)
+                if pd.notna(rate):
+                    state[widget_key(district, key)] = float(rate)
+        if events is not None:
+            state[widget_key(district, "down_rate")] = min(float(events["退服率(%)"].get(district, 0.0)), 100.0)
+            state[widget_key(district, "aaa_interruptions")] = min(int(events["AAA中断次数"].get(district, 0)), 10)
+    for key, summary in (("complaint_repeat_summary", tickets), ("delivery_summary", orders),
+                         ("outage_summary", events)):
+        if summary is not None:
+            state[key] = summary
+            state[WATCHED_SUMMARIES] = state.get(WATCHED_SUMMARIES, set()) | {key}
+
+
+if DEFAULT_WATCH_DIR:
+    watcher = folder_watcher()
+    snapshot = watcher.snapshot()
+    with st.sidebar.expander("监控目录导入", expanded=False):
+        st.write(f"目录：{DEFAULT_WATCH_DIR}")
+        if snapshot is None:
+            st.write("正在导入，稍后刷新页面")
+        else:
+            st.write(f"考核期 {snapshot['period']}，汇总于 {snapshot['updated']:%Y-%m-%d %H:%M:%S}")
+            st.write("；".join(f"{WATCH_LABELS[kind]} {len(files)} 个文件" for kind, files in snapshot["files"].items()))
+            for path, message in watcher.errors().items():
+                st.warning(f"{os.path.basename(path)}：{message}")
+            if str(snapshot["period"]) != period:
+                st.info(f"汇总的考核期与当前考核期（{period}）不同，未载入", icon="📋")
+            elif "watch_version" not in st.session_state:
+                apply_watch_summaries(snapshot["summaries"])
+                st.session_state["watch_version"] = watcher.version
+            elif st.session_state["watch_version"] != watcher.version:
+                if st.button("载入最新汇总（覆盖各区县输入）", key="watch_apply"):
+                    apply_watch_summaries(snapshot["summaries"])
+                    st.session_state["watch_version"] = watcher.version
+                    st.rerun()
+            else:
+                st.write("已载入最新汇总")
+
+# 创建Tab标签页
+tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9 = st.tabs([
+    "投诉及重复故障管理",
+    "集客业务交付管理",
+    "专线退服管控",
+    "综合计分卡",
+    "排行榜",
+    "参数模拟",
+    "目标反推",
+    "月末预测",
+    "历史趋势"
+])
+
+with tab1:
+    complaint_tab()
+
+with tab2:
+    delivery_tab()
+
+with tab3:
+    downservice_tab()
+
+with tab4:
+    scorecard_tab()
+
+with tab5:
+    leaderboard_tab()
+
+with tab6:
+    sweep_tab()
+
+with tab7:
+    targets_tab()
+
+with tab8:
+    forecast_tab()
+
+with tab9:
+    history_tab()
+
+# 诊断面板：各标签页各阶段耗时分位数（跨会话汇总，本页重跑后刷新）
+TAB_LABELS = {**ASSESSMENTS, "scorecard": "综合计分卡", "leaderboard": "排行榜", "sweep": "参数模拟",
+              "targets": "目标反推", "forecast": "月末预测", "history": "历史趋势"}
+PHASE_LABELS = {
+    "widgets": "控件构建",
+    "import": "文件导入",
+    "scoring": "评分计算",
+    "history": "写入历史",
+    "query": "查询历史",
+    "table": "结果表",
+    "chart": "图表",
+    "total": "整次重跑"
+}
+
+if diagnostics:
+    with st.sidebar.expander("各阶段耗时（毫秒）", expanded=True):
+        summary = timing_store().summary()
+        if summary.empty:
+            st.write("暂无计时记录，操作各标签页后刷新")
+        else:
+            order = {"tab": list(TAB_LABELS), "phase": list(PHASE_LABELS)}
+            summary = summary.sort_values(
+                ["tab", "phase"], key=lambda column: column.map(order[column.name].index), kind="stable"
+            )
+            summary["tab"] = summary["tab"].map(TAB_LABELS).fillna(summary["tab"])
+            summary["phase"] = summary["phase"].map(PHASE_LABELS).fillna(summary["phase"])
+            st.dataframe(
+                summary.rename(columns={"tab": "标签页", "phase": "阶段"}),
+                hide_index=True,
+                column_config={
+                    column: st.column_config.NumberColumn(format="%.1f")
+                    for column in [f"P{p}" for p in PERCENTILES] + ["最大"]
+                }
+            )
+        st.download_button(
+            "导出计时日志（JSON Lines）",
+            data=timing_store().export(),
+            file_name="score_timings.jsonl",
+            mime="application/x-ndjson"
+        )
+        if st.button("清空计时记录", key="diagnostics_clear"):
+            timing_store().clear()
+            st.rerun()
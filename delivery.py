@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+from schema import as_name, as_time, factorize_names, name_isin
+
+# --------------------------
+# 集客交付工单统计：按区县计算交付及时率和成功率（不依赖 streamlit）
+# --------------------------
+
+# 默认视为交付成功/失败的工单状态
+SUCCESS_STATUSES = ("竣工", "完成", "已完成", "成功")
+FAILED_STATUSES = ("退单", "撤单", "失败")
+
+# 默认工作日（周一至周五）
+DEFAULT_WEEKMASK = "1111100"
+
+
+def _to_datetime64(values):
+    """时间列转为 datetime64 数组（各取值的格式可以不同，见 schema.as_time），无法解析的为 NaT"""
+    return as_time(values).to_numpy(dtype="datetime64[ns]")
+
+
+def sla_deadlines(created, sla_days, weekmask=DEFAULT_WEEKMASK, holidays=()):
+    """按工作日日历计算每张工单的考核时限：创建日起第 sla_days 个工作日当天结束
+
+    非工作日创建的工单从下一个工作日起算。
+    """
+    created_days = created.astype("datetime64[D]")
+    deadline_days = np.busday_offset(
+        created_days, sla_days, roll="forward", weekmask=weekmask,
+        holidays=np.asarray(holidays, dtype="datetime64[D]")
+    )
+    return (deadline_days + np.timedelta64(1, "D")).astype("datetime64[ns]")
+
+
+def order_schema(district_col="区县", created_col="创建时间", committed_col="承诺时间", completed_col="完成时间",
+                 status_col="工单状态"):
+    """交付工单的紧凑列类型（见 schema.py），供读取时转换"""
+    return {
+        district_col: as_name,
+        created_col: as_time,
+        committed_col: as_time,
+        completed_col: as_time,
+        status_col: as_name,
+    }
+
+
+def summarize_delivery(orders, as_of=None, sla_days=5, weekmask=DEFAULT_WEEKMASK, holidays=(),
+                       use_committed=True, district_col="区县", created_col="创建时间",
+                       committed_col="承诺时间", completed_col="完成时间", status_col="工单状态",
+                       success_statuses=SUCCESS_STATUSES, failed_statuses=FAILED_STATUSES):
+    """按区县汇总交付及时率(%)和交付成功率(%)
+
+    及时率 = 按时完成工单数 / 应完成工单数，应完成指已完成或截至 as_of 已超时限；
+    时限优先取承诺时间（use_committed 为真且有值时），否则按 SLA 工作日计算。
+    成功率 = 成功状态工单数 / 已结束（成功或失败状态）工单数。
+    """
+    missing = [col for col in (district_col, created_col, committed_col, completed_col, status_col)
+               if col and col not in orders.columns]
+    if missing:
+        raise ValueError(f"交付工单缺少列：{', '.join(missing)}")
+
+    created = _to_datetime64(orders[created_col])
+    completed = _to_datetime64(orders[completed_col])
+    as_of = np.datetime64(pd.Timestamp(as_of) if as_of is not None else pd.Timestamp.now(), "ns")
+
+    deadline = sla_deadlines(created, sla_days, weekmask=weekmask, holidays=holidays)
+    if use_committed and committed_col:
+        committed = _to_datetime64(orders[committed_col])
+        deadline = np.where(np.isnat(committed), deadline, committed)
+
+    is_completed = ~np.isnat(completed)
+    is_due = is_completed | (deadline <= as_of)
+    is_ontime = is_completed & (completed <= deadline)
+
+    status = as_name(orders[status_col])
+    is_success = name_isin(status, success_statuses)
+    is_closed = is_success | name_isin(status, failed_statuses)
+
+    valid = ~np.isnat(created) & orders[district_col].notna().to_numpy()
+    district_codes, district_names = factorize_names(orders[district_col][valid])
+    n = len(district_names)
+
+    def count(mask):
+        return np.bincount(district_codes, weights=mask[valid], minlength=n)
+
+    due, ontime, closed, success = count(is_due), count(is_ontime), count(is_closed), count(is_success)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ontime_rate = np.round(ontime / due * 100, 2)
+        success_rate = np.round(success / closed * 100, 2)
+
+    summary = pd.DataFrame({
+        "工单数": np.bincount(district_codes, minlength=n),
+        "应完成工单数": due.astype(np.int64),
+        "按时完成工单数": ontime.astype(np.int64),
+        "及时率(%)": ontime_rate,
+        "已结束工单数": closed.astype(np.int64),
+        "成功工单数": success.astype(np.int64),
+        "成功率(%)": success_rate,
+    }, index=pd.Index(district_names, name="区县"))
+    return summary.sort_index()
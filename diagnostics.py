@@ -0,0 +1,101 @@
+import json
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# --------------------------
+# 诊断模式：页面重跑分阶段计时（不依赖 streamlit）
+# 每个标签页每次重跑记录一条：各阶段耗时及总耗时（秒），
+# 跨会话汇总为各阶段耗时分位数，并可按 JSON Lines 格式写入日志供监控采集
+# --------------------------
+
+# 保留的最近重跑记录条数（超出后丢弃最早的记录）
+MAX_RECORDS = 5000
+
+PERCENTILES = [50, 90, 99]
+
+
+class RerunTimer:
+    """一次重跑的分阶段计时
+
+    lap(phase) 将自上一次 lap（或开始计时）以来的耗时计入该阶段，
+    同一阶段多次 lap 时累加；未启用时不计时。
+    """
+
+    def __init__(self, tab, session=None, enabled=True):
+        self.tab = tab
+        self.session = session
+        self.enabled = enabled
+        self.phases = {}
+        self.start = self.last = time.perf_counter()
+
+    def lap(self, phase):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self.last
+        self.last = now
+
+    def record(self):
+        """本次重跑的计时记录，total 为开始计时至今的总耗时"""
+        return {
+            "time": datetime.now().isoformat(timespec="milliseconds"),
+            "tab": self.tab,
+            "session": self.session,
+            "phases": dict(self.phases),
+            "total": time.perf_counter() - self.start,
+        }
+
+
+class TimingStore:
+    """跨会话共享的重跑计时记录（线程安全）
+
+    log_path 不为空时，每条记录同时以一行 JSON 追加写入该文件。
+    """
+
+    def __init__(self, max_records=MAX_RECORDS, log_path=None):
+        self.records = deque(maxlen=max_records)
+        self.log_path = log_path
+        self.lock = threading.Lock()
+
+    def add(self, record):
+        line = json.dumps(record, ensure_ascii=False)
+        with self.lock:
+            self.records.append(record)
+            if self.log_path:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+
+    def clear(self):
+        with self.lock:
+            self.records.clear()
+
+    def export(self):
+        """全部记录，JSON Lines 格式（每行一条记录）"""
+        with self.lock:
+            records = list(self.records)
+        return "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+
+    def summary(self):
+        """各标签页各阶段的耗时分位数（毫秒），列为 tab、phase、次数、P50、P90、P99、最大；
+        phase 为 total 的行是整次重跑的耗时"""
+        with self.lock:
+            records = list(self.records)
+        samples = {}
+        for record in records:
+            for phase, seconds in list(record["phases"].items()) + [("total", record["total"])]:
+                samples.setdefault((record["tab"], phase), []).append(seconds)
+
+        rows = []
+        for (tab, phase), seconds in samples.items():
+            ms = np.asarray(seconds) * 1e3
+            row = {"tab": tab, "phase": phase, "次数": len(ms)}
+            for p, value in zip(PERCENTILES, np.percentile(ms, PERCENTILES)):
+                row[f"P{p}"] = value
+            row["最大"] = ms.max()
+            rows.append(row)
+        return pd.DataFrame(rows, columns=["tab", "phase", "次数"] + [f"P{p}" for p in PERCENTILES] + ["最大"])
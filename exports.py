@@ -0,0 +1,248 @@
+import datetime
+import hashlib
+import os
+import tempfile
+import threading
+
+import pandas as pd
+
+from schema import compact_frame, merge_unparsed
+
+# --------------------------
+# CSV/XLSX 导出文件的分块读取（投诉工单、退服日志、交付工单共用，不依赖 streamlit）
+# --------------------------
+
+# 默认每块读取的行数
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def _is_excel(name):
+    return os.path.splitext(str(name))[1].lower() in (".xlsx", ".xlsm")
+
+
+def _iter_excel_chunks(source, columns, chunksize):
+    """以只读模式逐行读取Excel，每 chunksize 行组成一个DataFrame
+
+    列保持单元格原值（对象列），不由 pandas 推断类型：时间列中的空单元格仍为 None，可与无法解析的取值区分。
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else "" for cell in next(rows, ())]
+        wanted = columns or header
+        missing = [col for col in wanted if col not in header]
+        if missing:
+            raise ValueError(f"导出文件缺少列：{', '.join(missing)}")
+        positions = [header.index(col) for col in wanted]
+
+        buffer = []
+        for row in rows:
+            buffer.append([row[i] if i < len(row) else None for i in positions])
+            if len(buffer) >= chunksize:
+                yield pd.DataFrame(buffer, columns=wanted, dtype=object)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=wanted, dtype=object)
+    finally:
+        workbook.close()
+
+
+def export_columns(source, name=None):
+    """导出文件的列名（Excel 为去除首尾空白后的首行），不读取数据行"""
+    name = name or getattr(source, "name", source)
+    if hasattr(source, "seek"):
+        source.seek(0)
+    if _is_excel(name):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(source, read_only=True, data_only=True)
+        try:
+            header = next(workbook.active.iter_rows(values_only=True), ())
+        finally:
+            workbook.close()
+        return [str(cell).strip() if cell is not None else "" for cell in header]
+    return list(pd.read_csv(source, nrows=0, encoding="utf-8-sig").columns)
+
+
+def iter_export_chunks(source, name=None, columns=None, chunksize=DEFAULT_CHUNKSIZE):
+    """按块读取CSV/XLSX导出文件，只保留需要的列
+
+    source 可以是文件路径或文件对象（如 st.file_uploader 返回的对象），
+    name 用于判断文件类型，缺省时取 source 本身或其 name 属性。
+    """
+    name = name or getattr(source, "name", source)
+    if hasattr(source, "seek"):
+        source.seek(0)  # 同一上传文件可能被多次读取
+    if _is_excel(name):
+        yield from _iter_excel_chunks(source, columns, chunksize)
+        return
+
+    reader = pd.read_csv(
+        source,
+        usecols=columns,
+        chunksize=chunksize,
+        dtype="string",
+        encoding="utf-8-sig"
+    )
+    with reader:
+        for chunk in reader:
+            yield chunk
+
+
+def load_export(source, name=None, columns=None, chunksize=DEFAULT_CHUNKSIZE):
+    """按块读取导出文件中需要的列并拼接为一个DataFrame"""
+    chunks = list(iter_export_chunks(source, name=name, columns=columns, chunksize=chunksize))
+    if not chunks:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(chunks, ignore_index=True)
+
+
+# --------------------------
+# 导出文件的列式磁盘缓存：按文件内容哈希只解析一次，转换为 Arrow IPC（Feather v2）文件，
+# 之后以内存映射方式只读取需要的列；缓存总大小超过上限时淘汰最久未使用的文件
+# --------------------------
+
+# 缓存目录及大小上限，可通过环境变量 SCORE_UPLOAD_CACHE、SCORE_UPLOAD_CACHE_MB 指定
+DEFAULT_CACHE_DIR = os.environ.get(
+    "SCORE_UPLOAD_CACHE", os.path.join(tempfile.gettempdir(), "score_upload_cache")
+)
+DEFAULT_CACHE_MAX_BYTES = int(os.environ.get("SCORE_UPLOAD_CACHE_MB", "2048")) * 1024 * 1024
+
+# 缓存文件格式版本，转换规则变化时递增，使旧缓存失效
+CACHE_FORMAT_VERSION = 2
+
+# 计算哈希时每次读取的字节数
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+
+
+def content_hash(source, name=None, columns=None):
+    """导出文件内容的哈希值（含文件类型、读取的列和缓存格式版本）"""
+    name = name or getattr(source, "name", source)
+    digest = hashlib.sha256(f"{CACHE_FORMAT_VERSION}:{_is_excel(name)}:{columns!r}:".encode())
+    if hasattr(source, "read"):
+        source.seek(0)
+        for block in iter(lambda: source.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+        source.seek(0)
+    else:
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def _cell_text(value):
+    """Excel 单元格转为与 CSV 相同的文本：时间为 ISO 格式，整数值的小数去掉小数部分"""
+    if value is None:
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _string_table(frame, schema):
+    """导出文件的一块转为全部列为字符串的 Arrow 表（CSV 与 Excel 共用同一 schema）"""
+    import pyarrow as pa
+
+    arrays = []
+    for column in schema.names:
+        values = frame[column]
+        if not isinstance(values.dtype, pd.StringDtype):
+            values = values.map(_cell_text, na_action="ignore").astype("string")
+        arrays.append(pa.array(values, type=pa.string(), from_pandas=True))
+    return pa.table(arrays, schema=schema)
+
+
+class ExportCache:
+    """导出文件的列式磁盘缓存
+
+    同一内容的文件（不论文件名、由哪个会话上传）按读取的列只解析一次：逐块读取需要的列，
+    CSV 与 Excel 均按字符串写入未压缩的 Arrow IPC 文件（可直接内存映射），转换过程中内存只保留一块。
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.arrow")
+
+    def load(self, source, name=None, columns=None, schema=None):
+        """读取导出文件中需要的列，返回DataFrame（与 load_export 相同，首次读取时写入缓存）
+
+        schema 为 {列名: 转换函数}（见 schema.py），给出时按列转换为紧凑类型，
+        无法解析为时间的取值个数记录在 attrs["unparsed"]（见 compact_frame）。
+        """
+        import pyarrow as pa
+        import pyarrow.feather as feather
+
+        path = self.path(content_hash(source, name, columns))
+        if os.path.exists(path):
+            os.utime(path)  # 更新最近使用时间，供淘汰时排序
+        else:
+            self._convert(source, name, path, columns)
+            self.evict(keep=path)
+
+        table = feather.read_table(path, columns=columns, memory_map=True)
+        strings = {pa.string(): pd.StringDtype(), pa.large_string(): pd.StringDtype()}
+        if not schema:
+            return table.to_pandas(types_mapper=strings.get)
+
+        # 逐列转换为 pandas 后立即转为紧凑类型，同一时刻只有一列是字符串
+        series, converted = {}, []
+        for name in table.column_names:
+            column = compact_frame(table.select([name]).to_pandas(types_mapper=strings.get), schema)
+            series[name] = column[name]
+            converted.append(column)
+        frame = pd.DataFrame(series, index=pd.RangeIndex(table.num_rows))
+        frame.attrs["unparsed"] = merge_unparsed(converted)
+        return frame
+
+    def _convert(self, source, name, path, columns=None):
+        """逐块读取导出文件中 columns 列出的列（缺省为全部列）并写入缓存文件
+
+        先写临时文件再改名，并发写入同一文件时互不影响；缺少列时抛出 ValueError。
+        """
+        import pyarrow as pa
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        name = name or getattr(source, "name", source)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with pa.OSFile(temp_path, "wb") as sink:
+                writer = schema = None
+                for chunk in iter_export_chunks(source, name=name, columns=columns):
+                    if writer is None:
+                        schema = pa.schema([(str(column), pa.string()) for column in (columns or chunk.columns)])
+                        writer = pa.ipc.new_file(sink, schema)
+                    writer.write_table(_string_table(chunk, schema))
+                if writer is None:
+                    writer = pa.ipc.new_file(sink, pa.schema([(str(column), pa.string()) for column in columns or []]))
+                writer.close()
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def evict(self, keep=None):
+        """总大小超过上限时，从最久未使用的缓存文件开始删除（keep 除外）"""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".arrow"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue  # 已被其他会话删除，或正在使用中（Windows）
+            total -= size
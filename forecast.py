@@ -0,0 +1,261 @@
+import numpy as np
+import pandas as pd
+
+from assessments import round_half_up2
+from scoring import RULES, batch_complaint_score, round2
+
+# --------------------------
+# 月末得分预测（不依赖 streamlit）
+# 由月初至今的计数按日均发生率模拟本月剩余天数，所有区县、所有模拟次数一次性批量抽样，
+# 模拟结果按现有评分规则计算得分分布及达到挑战值/基准值的概率
+# --------------------------
+
+# 默认模拟次数
+DEFAULT_DRAWS = 100_000
+
+# 预测结果中的分位数
+FORECAST_PERCENTILES = (10, 50, 90)
+
+
+def remaining_counts(rng, counts, elapsed, remaining, draws):
+    """按至今的日均次数对剩余天数做泊松抽样，返回形状为 (单位数, draws) 的新增次数（全部单位一次抽样）"""
+    means = np.asarray(counts, dtype=np.float64) / elapsed * remaining
+    return rng.poisson(means[:, None], (len(means), draws))
+
+
+def simulate_ratio(rng, hits, total, elapsed, remaining, draws, fallback):
+    """比率类指标的月末值（%，两位小数）及月末分母
+
+    剩余天数的新增条数为泊松分布、其中达标与否按至今的达标比例划分，等价于达标条数和未达标条数
+    分别做独立的泊松抽样（泊松稀释），不需要二项抽样；至今没有记录的单位以 fallback（当前值，%）
+    为达标比例，月末仍没有记录的保持 fallback。
+    """
+    hits = np.asarray(hits, dtype=np.float64)
+    total = np.asarray(total, dtype=np.float64)
+    fallback = np.asarray(fallback, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = np.clip(np.where(total > 0, hits / total, fallback / 100), 0.0, 1.0)
+    new_hits = remaining_counts(rng, total * p, elapsed, remaining, draws)
+    final_total = total[:, None] + new_hits + remaining_counts(rng, total * (1 - p), elapsed, remaining, draws)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rates = np.round((hits[:, None] + new_hits) / final_total * 100, 2)
+    return np.where(final_total > 0, rates, fallback[:, None]), final_total
+
+
+def grid_percentiles(values, percentiles):
+    """按行计算分位数（取不超过该分位的模拟值，即 np.percentile 的 lower 方法）
+
+    模拟值均在 0.01 的网格上（次数、两位小数的比率及得分），逐行按网格计数后累加定位，不需要排序；
+    计数数组只覆盖该行的取值范围，范围超过模拟次数时改为 np.percentile。
+    返回形状为 (len(percentiles), 行数) 的数组。
+    """
+    ranks = np.floor(np.asarray(percentiles) / 100 * (values.shape[1] - 1)).astype(np.int64)
+    result = np.empty((len(ranks), len(values)))
+    for i, row in enumerate(values):
+        codes = np.rint(row * 100).astype(np.int64)
+        low = codes.min()
+        if codes.max() - low >= len(codes):
+            result[:, i] = np.percentile(row, percentiles, method="lower")
+            continue
+        cumulative = np.bincount(codes - low).cumsum()
+        result[:, i] = (np.searchsorted(cumulative, ranks, side="right") + low) / 100
+    return result
+
+
+def weighted_city_rate(rates, weights):
+    """全市比率：按权重加权平均各区县比率（权重合计为0时取算术平均），四舍五入保留两位小数
+
+    rates 为两位小数、weights 为整数，按以 0.01 为单位的整数合计精确取整（与全市行相同）。
+    """
+    codes = np.rint(rates * 100).astype(np.int64)
+    weights = np.rint(weights).astype(np.int64)
+    totals = weights.sum(axis=0)
+    weighted = round_half_up2((codes * weights).sum(axis=0), np.where(totals > 0, totals, 1))
+    plain = round_half_up2(codes.sum(axis=0), len(codes))
+    return np.where(totals > 0, weighted, plain)
+
+
+class MonthForecast:
+    """一项考核的月末预测：各单位（区县及全市）每次模拟的指标值和得分
+
+    values/scores 为 {指标名: 形状 (单位数, 模拟次数) 的数组}，scores 中含“总分”；
+    limits 为 {指标名: (满分, 基准分)}，用于计算达到挑战值（得满分）和基准值的概率。
+    """
+
+    def __init__(self, names, current, values, scores, limits):
+        self.names = list(names)
+        self.current = current
+        self.values = values
+        self.scores = scores
+        self.limits = limits
+
+    @property
+    def draws(self):
+        return next(iter(self.scores.values())).shape[1]
+
+    def summary(self):
+        """各单位、各指标的预测值及得分分位数、得分均值和达到挑战值/基准值的概率"""
+        rows = []
+        for metric, scores in self.scores.items():
+            full, base = self.limits[metric]
+            score_q = grid_percentiles(scores, FORECAST_PERCENTILES)
+            frame = pd.DataFrame({"区县": self.names, "指标": metric})
+            if metric in self.values:
+                frame["当前值"] = self.current[metric]
+                value_q = grid_percentiles(self.values[metric], FORECAST_PERCENTILES)
+                for p, q in zip(FORECAST_PERCENTILES, value_q):
+                    frame[f"预测值P{p}"] = np.round(q, 2)
+            frame["得分均值"] = np.round(scores.mean(axis=1), 2)
+            for p, q in zip(FORECAST_PERCENTILES, score_q):
+                frame[f"得分P{p}"] = np.round(q, 2)
+            frame["达到挑战值概率"] = (scores >= full - 1e-9).mean(axis=1)
+            frame["达到基准值概率"] = (scores >= base - 1e-9).mean(axis=1)
+            rows.append(frame)
+        return pd.concat(rows, ignore_index=True)
+
+    def distribution(self, unit, metric="总分"):
+        """某单位某项得分的分布：得分 -> 概率"""
+        scores = self.scores[metric][self.names.index(unit)]
+        values, counts = np.unique(scores, return_counts=True)
+        return pd.Series(counts / scores.size, index=pd.Index(values, name="得分"), name="概率")
+
+
+def _limits(*keys):
+    rules = [RULES[key] for key in keys]
+    return sum(rule.max_score for rule in rules), sum(rule.base_score for rule in rules)
+
+
+def forecast_complaints(section, elapsed, remaining, draws, rng):
+    """投诉及重复故障管理的月末预测
+
+    data 中各区县除页面输入（投诉次数、重复投诉、解决率）外，可含至今的“重复故障数”和
+    “已解决重复故障数”，缺省时解决率按当前值保持不变。已有重复投诉的区县投诉得分保持为0，
+    剩余天数内新出现的重复投诉不做模拟。
+    """
+    data, params = section["data"], section["params"]
+    names = list(data)
+    complaints = np.array([data[d]["投诉次数"] for d in names], dtype=np.int64)
+    repeated = np.array([bool(data[d]["重复投诉"]) for d in names])[:, None]
+    faults = np.array([data[d].get("重复故障数", 0) for d in names], dtype=np.int64)
+    resolved = np.array([data[d].get("已解决重复故障数", 0) for d in names], dtype=np.int64)
+    current_rates = np.array([data[d]["解决率"] for d in names], dtype=np.float64)
+
+    final_complaints = complaints[:, None] + remaining_counts(rng, complaints, elapsed, remaining, draws)
+    rates, weights = simulate_ratio(rng, resolved, faults, elapsed, remaining, draws, current_rates)
+
+    units = names + ["全市"]
+    values = {
+        "投诉次数": np.vstack([final_complaints, final_complaints.sum(axis=0)]),
+        "解决率(%)": np.vstack([rates, weighted_city_rate(rates, weights)]),
+    }
+    is_city = np.array([d == "全市" for d in units])[:, None]
+    complaint_scores = batch_complaint_score(
+        values["投诉次数"],
+        np.array([params[d]["挑战值"] for d in units])[:, None],
+        np.array([params[d]["基准值"] for d in units])[:, None],
+        has_repeated=np.vstack([repeated, [[False]]]), is_city=is_city
+    )
+    resolve_scores = RULES["resolve"](
+        values["解决率(%)"], section["resolve_rate_base"], section["resolve_rate_challenge"]
+    )
+    scores = {
+        "投诉次数": complaint_scores,
+        "解决率(%)": resolve_scores,
+        "总分": round2(complaint_scores + resolve_scores),
+    }
+    current = {
+        "投诉次数": np.append(complaints, complaints.sum()),
+        "解决率(%)": np.append(current_rates, np.nan),
+    }
+    limits = {"投诉次数": _limits("complaint"), "解决率(%)": _limits("resolve"),
+              "总分": _limits("complaint", "resolve")}
+    return MonthForecast(units, current, values, scores, limits)
+
+
+def forecast_delivery(section, elapsed, remaining, draws, rng):
+    """集客业务交付管理的月末预测
+
+    data 中各区县需含至今的“应完成工单数”“按时完成工单数”“已结束工单数”“成功工单数”
+    （见 delivery.summarize_delivery），及时率(%)、成功率(%) 为没有工单时使用的当前值。
+    """
+    data = section["data"]
+    names = list(data)
+
+    def column(key, dtype=np.int64):
+        return np.array([data[d].get(key, 0) for d in names], dtype=dtype)
+
+    values, scores, current = {}, {}, {}
+    for metric, rule_key, hits_key, total_key in (
+        ("及时率(%)", "ontime", "按时完成工单数", "应完成工单数"),
+        ("成功率(%)", "success", "成功工单数", "已结束工单数"),
+    ):
+        rates, weights = simulate_ratio(
+            rng, column(hits_key), column(total_key), elapsed, remaining, draws, column(metric, np.float64)
+        )
+        values[metric] = np.vstack([rates, weighted_city_rate(rates, weights)])
+        scores[metric] = RULES[rule_key](
+            values[metric], section[f"{rule_key}_base"], section[f"{rule_key}_challenge"]
+        )
+        current[metric] = np.append(column(metric, np.float64), np.nan)
+    scores["总分"] = round2(scores["及时率(%)"] + scores["成功率(%)"])
+    limits = {"及时率(%)": _limits("ontime"), "成功率(%)": _limits("success"), "总分": _limits("ontime", "success")}
+    return MonthForecast(names + ["全市"], current, values, scores, limits)
+
+
+def forecast_downservice(section, elapsed, remaining, draws, rng, days_in_month):
+    """专线退服管控的月末预测
+
+    data 中各区县需含至今的“退服时长(小时)”“退服次数”“专线总数”“AAA中断次数”
+    （见 outages.summarize_outages）。剩余天数的退服次数做泊松抽样，每次时长按至今的平均时长
+    做指数分布抽样（合计为伽马分布）；AAA中断次数单独做泊松抽样。专线总数为0的区县退服率保持当前值。
+    """
+    data = section["data"]
+    names = list(data)
+    hours = np.array([data[d].get("退服时长(小时)", 0) for d in names], dtype=np.float64)
+    events = np.array([data[d].get("退服次数", 0) for d in names], dtype=np.int64)
+    lines = np.array([data[d].get("专线总数", 0) for d in names], dtype=np.float64)
+    aaa = np.array([data[d]["AAA中断次数"] for d in names], dtype=np.int64)
+    current_rates = np.array([data[d]["退服率(%)"] for d in names], dtype=np.float64)
+
+    new_events = remaining_counts(rng, events, elapsed, remaining, draws)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_hours = np.where(events > 0, hours / events, 0.0)[:, None]
+    new_hours = rng.gamma(np.maximum(new_events, 1), np.broadcast_to(mean_hours, new_events.shape))
+    final_hours = hours[:, None] + np.where(new_events > 0, new_hours, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rates = np.round(final_hours / (lines[:, None] * days_in_month * 24) * 100, 2)
+    rates = np.where(lines[:, None] > 0, rates, current_rates[:, None])
+    counts = aaa[:, None] + remaining_counts(rng, aaa, elapsed, remaining, draws)
+
+    values = {
+        "退服率(%)": np.vstack([rates, weighted_city_rate(rates, np.broadcast_to(lines[:, None], rates.shape))]),
+        "AAA中断次数": np.vstack([counts, np.round(counts.mean(axis=0))]),
+    }
+    downrate_scores = RULES["downrate"](values["退服率(%)"], section["downrate_base"], section["downrate_challenge"])
+    factors = RULES["aaa"](values["AAA中断次数"], section["aaa_factors"])
+    scores = {"退服率(%)": downrate_scores, "总分": round2(downrate_scores * factors)}
+    current = {"退服率(%)": np.append(current_rates, np.nan)}
+    limits = {"退服率(%)": _limits("downrate"), "总分": _limits("downrate")}
+    return MonthForecast(names + ["全市"], current, values, scores, limits)
+
+
+def forecast_month(inputs, days_elapsed, days_in_month, draws=DEFAULT_DRAWS, seed=None):
+    """按月初至今的数据预测各项考核的月末得分，返回 {考核键: MonthForecast}
+
+    inputs 的格式与命令行输入文件相同（见 cli.py），data 中另需至今的计数（见各考核的预测函数）；
+    days_elapsed 为已过天数（计数所覆盖的天数），days_in_month 为本月天数。
+    """
+    if not 0 < days_elapsed <= days_in_month:
+        raise ValueError("已过天数应大于0且不超过本月天数")
+    rng = np.random.default_rng(seed)
+    remaining = days_in_month - days_elapsed
+    forecasts = {}
+    if "complaint" in inputs:
+        forecasts["complaint"] = forecast_complaints(inputs["complaint"], days_elapsed, remaining, draws, rng)
+    if "delivery" in inputs:
+        forecasts["delivery"] = forecast_delivery(inputs["delivery"], days_elapsed, remaining, draws, rng)
+    if "downservice" in inputs:
+        forecasts["downservice"] = forecast_downservice(
+            inputs["downservice"], days_elapsed, remaining, draws, rng, days_in_month
+        )
+    return forecasts
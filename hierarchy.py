@@ -0,0 +1,214 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from assessments import (
+    COMPLAINT_ROLLUP,
+    DELIVERY_ROLLUP,
+    DOWNSERVICE_ROLLUP,
+    add_totals,
+    complaint_city_row,
+    complaint_rows,
+    delivery_city_row,
+    delivery_rows,
+    downservice_city_row,
+    downservice_rows,
+    unit_totals,
+)
+
+# --------------------------
+# 多级组织汇总（网格 → 区县 → 全市 → 全省，不依赖 streamlit）
+# 组织树由配置文件给出，各级上级单位由最底层单位的精确合计按全市行的规则计算（见 assessments.py），
+# 根单位的结果与只有一级时的全市行一致
+# --------------------------
+
+# 默认组织树配置（与本文件同目录），可通过环境变量 ORG_TREE 指定其他文件
+DEFAULT_ORG_TREE = os.environ.get(
+    "ORG_TREE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "org_tree.json")
+)
+
+
+class OrgTree:
+    """组织树：各单位名称、层级和上级
+
+    配置格式：{"levels": ["全市", "区县", ...], "tree": {"name": "全市", "children": [...]}}，
+    levels 依次为各深度的层级名称，单位名称在整棵树中不能重复。
+    """
+
+    def __init__(self, levels, tree):
+        names, depths, parents = [], [], []
+        stack = [(tree, 0, -1)]
+        while stack:
+            node, depth, parent = stack.pop()
+            if depth >= len(levels):
+                raise ValueError(f"组织树层级数超过 levels 配置：{node['name']}")
+            position = len(names)
+            names.append(str(node["name"]))
+            depths.append(depth)
+            parents.append(parent)
+            stack.extend((child, depth + 1, position) for child in reversed(node.get("children", [])))
+
+        duplicated = sorted(set(pd.Index(names)[pd.Index(names).duplicated()]))
+        if duplicated:
+            raise ValueError(f"组织树中单位名称重复：{'、'.join(duplicated)}")
+
+        self.levels = list(levels)
+        self.names = names
+        self.depths = np.array(depths, dtype=np.int64)
+        self.parents = np.array(parents, dtype=np.int64)
+        self.index = {name: i for i, name in enumerate(names)}
+        self.name_index = pd.Index(names, dtype=object, name="单位")
+        self.is_leaf = np.ones(len(names), dtype=bool)
+        self.is_leaf[self.parents[self.parents >= 0]] = False
+
+        # 每个单位自身及其全部上级（按深度排列，不足处填 -1），供分组汇总使用
+        ancestors = np.full((len(names), len(levels)), -1, dtype=np.int64)
+        for i, (depth, parent) in enumerate(zip(depths, parents)):
+            if parent >= 0:
+                ancestors[i] = ancestors[parent]
+            ancestors[i, depth] = i
+        self.ancestors = ancestors
+
+        # 后序：下级单位排在上级之前，与结果表“各区县在前、全市在后”的顺序一致
+        children = [[] for _ in names]
+        for i, parent in enumerate(parents):
+            if parent >= 0:
+                children[parent].append(i)
+        postorder, stack = [], [(0, False)]
+        while stack:
+            i, done = stack.pop()
+            if done:
+                postorder.append(i)
+                continue
+            stack.append((i, True))
+            stack.extend((child, False) for child in reversed(children[i]))
+        self.postorder = np.array(postorder, dtype=np.int64)
+
+    @property
+    def root(self):
+        return self.names[0]
+
+    def level_of(self, name):
+        """单位所在层级名称"""
+        return self.levels[self.depths[self.index[name]]]
+
+    def units_at(self, level):
+        """某一层级的全部单位（按配置顺序）"""
+        depth = self.levels.index(level)
+        return [name for name, d in zip(self.names, self.depths) if d == depth]
+
+    def leaves(self):
+        """最底层考核单位（没有下级的单位）"""
+        return [name for name, leaf in zip(self.names, self.is_leaf) if leaf]
+
+
+def load_org_tree(path=None):
+    """读取组织树配置文件"""
+    with open(path or DEFAULT_ORG_TREE, encoding="utf-8") as f:
+        config = json.load(f)
+    return OrgTree(config["levels"], config["tree"])
+
+
+def leaf_positions(tree, names):
+    """最底层单位在组织树中的位置，有不在组织树中或不是最底层的单位时抛出 ValueError"""
+    names = pd.Index(names)
+    positions = tree.name_index.get_indexer(names)
+    if (positions < 0).any():
+        unknown = names[positions < 0]
+        raise ValueError(f"组织树中没有以下单位：{'、'.join(map(str, unknown))}")
+    if not tree.is_leaf[positions].all():
+        not_leaf = names[~tree.is_leaf[positions]]
+        raise ValueError(f"以下单位有下级单位，应提供其下级单位的数据：{'、'.join(not_leaf)}")
+    return positions
+
+
+def rollup_totals(tree, leaf_data, rules):
+    """按汇总规则逐级累加最底层单位的精确合计，返回 {上级单位位置: 合计}
+
+    每个最底层单位的贡献只计算一次，再累加到它的每个上级；合计与全市行相同（见 assessments.sum_totals）。
+    """
+    totals = {}
+    for position, unit in zip(leaf_positions(tree, list(leaf_data)), leaf_data.values()):
+        delta = unit_totals(unit, rules)
+        for group in tree.ancestors[position]:
+            if group >= 0 and group != position:
+                add_totals(totals.setdefault(int(group), {}), delta)
+    return totals
+
+
+# 各项考核：考核键 -> (最底层单位得分行计算, 上级单位得分行计算, 汇总规则)
+TREE_SPECS = {
+    "complaint": (complaint_rows, complaint_city_row, COMPLAINT_ROLLUP),
+    "delivery": (delivery_rows, delivery_city_row, DELIVERY_ROLLUP),
+    "downservice": (downservice_rows, downservice_city_row, DOWNSERVICE_ROLLUP),
+}
+
+
+def score_tree(tree, assessment, leaf_data, *shared, params=None):
+    """计算组织树中每个单位（含各级上级单位）的得分
+
+    leaf_data 为 {最底层单位: 输入}，格式与区县数据相同，可附带权重（如“专线总数”）；
+    shared 为该项考核的共用阈值参数（与 score_* 相同，不含区县数据）；
+    投诉考核另需 params={单位: {"挑战值", "基准值"}}，覆盖全部有数据的单位。
+    上级单位按全市行的规则计算（*_city_row）：投诉不因重复投诉扣分，平均值四舍五入保留两位小数，
+    AAA中断次数取平均后取整。结果按下级单位在前、上级在后排列，仅含有数据的单位。
+    """
+    score_rows, city_row, rules = TREE_SPECS[assessment]
+    totals = rollup_totals(tree, leaf_data, rules)
+    names = tree.name_index.to_numpy()
+    units = {name: dict(unit) for name, unit in leaf_data.items()}
+    if assessment == "complaint":
+        required = list(units) + [names[group] for group in totals]
+        missing = [name for name in required if name not in params]
+        if missing:
+            raise ValueError(f"缺少以下单位的挑战值/基准值：{'、'.join(missing)}")
+        for name, unit in units.items():
+            unit.update(params[name])
+
+    rows = score_rows(units, *shared)
+    parents = []
+    for group, group_totals in totals.items():
+        city_args = (params[names[group]],) if assessment == "complaint" else ()
+        parents.append({**city_row(group_totals, *shared, *city_args), "区县": names[group]})
+    if parents:
+        rows = pd.concat([rows, pd.DataFrame(parents)], ignore_index=True)
+
+    present = set(leaf_positions(tree, list(units))) | set(totals)
+    order = [int(i) for i in tree.postorder if int(i) in present]
+    result_df = rows.set_index("区县").loc[names[order]].reset_index().rename(columns={"区县": "单位"})
+    parent_positions = tree.parents[order]
+    result_df.insert(0, "上级", np.where(parent_positions >= 0, names[parent_positions], ""))
+    result_df.insert(0, "层级", np.asarray(tree.levels, dtype=object)[tree.depths[order]])
+    return result_df
+
+
+def score_tree_inputs(tree, inputs):
+    """按输入字典（格式同 cli.py，区县数据换为最底层单位数据）计算组织树各级得分
+
+    返回 {考核键: 结果表}；投诉考核的 params 需包含各级单位的挑战值/基准值。
+    """
+    results = {}
+    if "complaint" in inputs:
+        section = inputs["complaint"]
+        results["complaint"] = score_tree(
+            tree, "complaint", section["data"],
+            section["resolve_rate_base"], section["resolve_rate_challenge"],
+            params=section["params"]
+        )
+    if "delivery" in inputs:
+        section = inputs["delivery"]
+        results["delivery"] = score_tree(
+            tree, "delivery", section["data"],
+            section["ontime_base"], section["ontime_challenge"],
+            section["success_base"], section["success_challenge"]
+        )
+    if "downservice" in inputs:
+        section = inputs["downservice"]
+        results["downservice"] = score_tree(
+            tree, "downservice", section["data"],
+            section["downrate_base"], section["downrate_challenge"],
+            dict(enumerate(section["aaa_factors"]))
+        )
+    return results
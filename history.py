@@ -0,0 +1,146 @@
+import json
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+# --------------------------
+# 历史评分结果存储（SQLite，只追加；不依赖 streamlit）
+# 每次评分写入一条 runs 记录及逐区县逐指标的 scores 记录，
+# 同一区县、考核期、指标多次评分时，查询取最近一次
+# --------------------------
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    period TEXT NOT NULL,
+    assessment TEXT NOT NULL,
+    params TEXT
+);
+CREATE TABLE IF NOT EXISTS scores (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    district TEXT NOT NULL,
+    period TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL
+);
+CREATE INDEX IF NOT EXISTS idx_scores_district_period_metric ON scores(district, period, metric, run_id);
+CREATE INDEX IF NOT EXISTS idx_scores_metric_period ON scores(metric, period, district, run_id);
+"""
+
+
+def connect(db_path):
+    """打开历史库，首次使用时建表"""
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")  # 多个会话同时写入时读不阻塞
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def normalize_period(period):
+    """考核期统一为 YYYY-MM（如 "2024-5" 转为 "2024-05"），写入和查询前调用，保证按字符串比较、排序与按月份一致
+
+    无法识别为月份时抛出 ValueError。
+    """
+    try:
+        month = pd.Period(period, freq="M")
+    except (TypeError, ValueError):
+        month = pd.NaT
+    if pd.isna(month):
+        raise ValueError(f"考核期格式应为 YYYY-MM：{period}")
+    return month.strftime("%Y-%m")
+
+
+def metric_name(assessment, column):
+    """指标名：考核键:结果表列名，如 complaint:总分"""
+    return f"{assessment}:{column}"
+
+
+def record_run(db_path, period, assessment, result_df, params=None):
+    """将一张结果表的全部数值列追加写入历史库，返回 run_id（考核期统一为 YYYY-MM）"""
+    period = normalize_period(period)
+    numeric = result_df.set_index("区县").select_dtypes("number")
+    long_df = numeric.stack().reset_index()
+    long_df.columns = ["district", "column", "value"]
+
+    conn = connect(db_path)
+    try:
+        with conn:
+            cursor = conn.execute(
+                "INSERT INTO runs (created_at, period, assessment, params) VALUES (?, ?, ?, ?)",
+                (datetime.now().isoformat(timespec="seconds"), period, assessment,
+                 json.dumps(params, ensure_ascii=False, default=str) if params is not None else None)
+            )
+            run_id = cursor.lastrowid
+            conn.executemany(
+                "INSERT INTO scores (run_id, district, period, metric, value) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, d, period, metric_name(assessment, c), float(v))
+                 for d, c, v in long_df.itertuples(index=False)]
+            )
+    finally:
+        conn.close()
+    return run_id
+
+
+def list_metrics(db_path):
+    """历史库中已有的指标名"""
+    conn = connect(db_path)
+    try:
+        return [row[0] for row in conn.execute("SELECT DISTINCT metric FROM scores ORDER BY metric")]
+    finally:
+        conn.close()
+
+
+def query_trend(db_path, metric, districts=None, start=None, end=None):
+    """查询某指标的历史趋势，返回以考核期为行、区县为列的表
+
+    只读取指标、考核期范围内的索引区间；同一区县同一考核期取最近一次评分。
+    start、end 可为任意可识别的月份写法，统一为 YYYY-MM 后比较。
+    """
+    sql = """
+        SELECT s.period, s.district, s.value
+        FROM scores AS s
+        JOIN (
+            SELECT district, period, MAX(run_id) AS run_id
+            FROM scores
+            WHERE metric = :metric AND period >= :start AND period <= :end {district_filter}
+            GROUP BY district, period
+        ) AS latest
+          ON s.district = latest.district AND s.period = latest.period AND s.run_id = latest.run_id
+        WHERE s.metric = :metric
+    """
+    query = {"metric": metric, "start": normalize_period(start) if start else "",
+             "end": normalize_period(end) if end else "9999-99"}
+    district_filter = ""
+    if districts:
+        placeholders = ", ".join(f":d{i}" for i in range(len(districts)))
+        district_filter = f"AND district IN ({placeholders})"
+        query.update({f"d{i}": d for i, d in enumerate(districts)})
+    sql = sql.format(district_filter=district_filter)
+
+    conn = connect(db_path)
+    try:
+        long_df = pd.read_sql_query(sql, conn, params=query)
+    finally:
+        conn.close()
+    trend = long_df.pivot(index="period", columns="district", values="value").sort_index()
+    return trend.rename_axis(index="考核期", columns="区县")
+
+
+def trend_changes(trend_df):
+    """在趋势表基础上计算环比（较上月）和同比（较去年同月）变化量
+
+    返回以 YYYY-MM 考核期为行、(区县, 取值/环比/同比) 两级表头为列的表。
+    """
+    periods = [normalize_period(period) for period in trend_df.index]
+    monthly = trend_df.copy()
+    monthly.index = pd.PeriodIndex(periods, freq="M")
+    monthly = monthly.reindex(pd.period_range(monthly.index.min(), monthly.index.max(), freq="M"))
+    changes = pd.concat({
+        "取值": monthly,
+        "环比": monthly - monthly.shift(1),
+        "同比": monthly - monthly.shift(12),
+    }, axis=1).swaplevel(axis=1).sort_index(axis=1, level=0, sort_remaining=False)
+    changes.index = changes.index.strftime("%Y-%m")
+    return changes.loc[periods].rename_axis(trend_df.index.name).round(2)
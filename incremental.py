@@ -0,0 +1,151 @@
+import json
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from assessments import (
+    COMPLAINT_ROLLUP,
+    DELIVERY_ROLLUP,
+    DOWNSERVICE_ROLLUP,
+    add_totals,
+    complaint_city_row,
+    complaint_rows,
+    delivery_city_row,
+    delivery_rows,
+    downservice_city_row,
+    downservice_rows,
+    unit_totals,
+    with_city_row,
+)
+
+# --------------------------
+# 结果表增量计算（不依赖 streamlit）
+# 只重算输入有变化的区县行，全市汇总按差值增减，
+# 修改一个区县的开销与区县总数无关；共用阈值变化时整表重算
+# --------------------------
+
+
+class IncrementalTable:
+    """一项考核结果表的增量维护
+
+    score_rows(units, *shared) 计算给定区县的得分行，
+    city_row(totals, *shared, *city_args) 由精确合计计算全市行，
+    rules 为全市汇总规则（见 assessments.py）。
+    """
+
+    def __init__(self, score_rows, city_row, rules):
+        self.score_rows = score_rows
+        self.city_row = city_row
+        self.rules = rules
+        self.reset()
+
+    def reset(self):
+        """清空已有结果，下次更新时整表重算"""
+        self.shared = None
+        self.units = {}
+        self.rows = None
+        self.names = []
+        self.totals = {}
+
+    def _accumulate(self, unit, sign):
+        add_totals(self.totals, unit_totals(unit, self.rules), sign)
+
+    def _apply_inputs(self, units, shared):
+        """按最新的区县输入调整合计，返回 (删除的区县, 有变化的区县)"""
+        if self.rows is None or shared != self.shared:
+            self.reset()
+            self.shared = shared
+
+        removed = [d for d in self.units if d not in units]
+        changed = [d for d, unit in units.items() if self.units.get(d) != unit]
+        for d in removed:
+            self._accumulate(self.units.pop(d), -1)
+        for d in changed:
+            if d in self.units:
+                self._accumulate(self.units[d], -1)
+            self.units[d] = dict(units[d])
+            self._accumulate(self.units[d], 1)
+        return removed, changed
+
+    def update(self, units, shared, *city_args):
+        """按最新的区县输入更新，返回含全市行的结果表
+
+        units 为 {区县: 输入}，shared 为各区县共用的阈值参数元组。
+        """
+        had_rows = self.rows is not None and shared == self.shared
+        previous = set(self.units) if had_rows else set()
+        removed, changed = self._apply_inputs(units, shared)
+        existing = [d for d in changed if d in previous]
+        added = [d for d in changed if d not in previous]
+
+        rows = self.rows
+        if removed:
+            rows = rows.drop(index=removed)
+        if changed or rows is None:
+            fresh = self.score_rows({d: units[d] for d in changed}, *shared).set_index("区县")
+            if rows is None:
+                rows = fresh
+            else:
+                if existing:
+                    rows.loc[existing] = fresh.loc[existing]
+                if added:
+                    rows = pd.concat([rows, fresh.loc[added]])
+        names = list(units)
+        if removed or added or names != self.names:
+            rows = rows.reindex(names)  # 保持与输入一致的区县顺序
+        self.rows = rows
+        self.names = names
+
+        city = self.city_row(self.totals, *shared, *city_args)
+        return with_city_row(rows.reset_index(), city)
+
+    def adopt(self, units, shared, result_df):
+        """采用同一输入已算出的结果表（如其他会话的缓存结果）：只按差值调整合计，不重新计分"""
+        self._apply_inputs(units, shared)
+        self.rows = result_df.iloc[:-1].set_index("区县")
+        self.names = list(units)
+
+
+class ResultCache:
+    """按输入缓存的结果表（跨会话共享，线程安全），超出容量后淘汰最近最少使用的结果
+
+    只保存结果，不做计算；调用方未命中时自行计算后 put()。
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(*parts):
+        """由输入生成缓存键（区县顺序影响结果表的行顺序，按原顺序序列化）"""
+        return json.dumps(parts, ensure_ascii=False, default=str)
+
+    def get(self, key):
+        with self._lock:
+            result_df = self._entries.get(key)
+            if result_df is not None:
+                self._entries.move_to_end(key)
+            return result_df
+
+    def put(self, key, result_df):
+        with self._lock:
+            self._entries[key] = result_df
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+# 各项考核的增量计算方式：考核键 -> (区县行计算, 全市行计算, 汇总规则)
+TABLE_SPECS = {
+    "complaint": (complaint_rows, complaint_city_row, COMPLAINT_ROLLUP),
+    "delivery": (delivery_rows, delivery_city_row, DELIVERY_ROLLUP),
+    "downservice": (downservice_rows, downservice_city_row, DOWNSERVICE_ROLLUP),
+}
+
+
+def new_table(assessment):
+    """新建一项考核的增量结果表"""
+    return IncrementalTable(*TABLE_SPECS[assessment])
@@ -0,0 +1,149 @@
+import numpy as np
+import pandas as pd
+
+# --------------------------
+# 排行榜（不依赖 streamlit）
+# 对结果表的各得分列维护升序副本：输入变化时只删除、插入有变化单位的得分，不整列重新排序；
+# 名次和百分位由二分查找得出，前/后 N 名由部分选择取出，只对选中的 N 个单位排序
+# --------------------------
+
+# 变化单位超过该比例时整列重新排序（逐个删除、插入已不比排序快）
+RESORT_FRACTION = 0.1
+
+
+def select_top(values, n, largest=True):
+    """得分最高（largest=False 时最低）的 n 个位置，按得分排列，同分按原顺序；NaN 不参与"""
+    values = np.asarray(values, dtype=np.float64)
+    valid = np.flatnonzero(~np.isnan(values))
+    n = min(int(n), len(valid))
+    if n <= 0:
+        return np.empty(0, dtype=np.int64)
+    keys = -values[valid] if largest else values[valid]
+    if n < len(valid):
+        # 部分选择出第 n 名的得分，同分的单位按原顺序补足 n 个
+        kth = np.partition(keys, n - 1)[n - 1]
+        better = valid[keys < kth]
+        tied = valid[keys == kth][:n - len(better)]
+        chosen = np.concatenate([better, tied])
+    else:
+        chosen = valid
+    chosen_keys = -values[chosen] if largest else values[chosen]
+    return chosen[np.lexsort((chosen, chosen_keys))]
+
+
+class RankIndex:
+    """一列得分的升序副本
+
+    update() 按单位顺序传入最新得分，只有少数单位变化时在有序副本中删除旧得分、插入新得分；
+    ranks()、percentiles() 由二分查找计算，NaN 不参与排名。
+    """
+
+    def __init__(self):
+        self.values = np.empty(0, dtype=np.float64)
+        self.sorted = np.empty(0, dtype=np.float64)
+
+    def _rebuild(self, values):
+        self.values = values.copy()
+        self.sorted = np.sort(values[~np.isnan(values)])
+
+    def update(self, values):
+        """按单位顺序更新得分（单位数变化时整列重建），返回变化的单位数"""
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) != len(self.values):
+            self._rebuild(values)
+            return len(values)
+        old_values = self.values
+        changed = ~((values == old_values) | (np.isnan(values) & np.isnan(old_values)))
+        count = int(changed.sum())
+        if count == 0:
+            return 0
+        if count > RESORT_FRACTION * len(values):
+            self._rebuild(values)
+            return count
+
+        # 删除旧得分：同分的多个旧值依次对应有序副本中相邻的位置
+        old = np.sort(old_values[changed])
+        old = old[~np.isnan(old)]
+        repeat = np.arange(len(old)) - np.searchsorted(old, old, side="left")
+        remaining = np.delete(self.sorted, np.searchsorted(self.sorted, old, side="left") + repeat)
+        new = np.sort(values[changed])
+        new = new[~np.isnan(new)]
+        self.sorted = np.insert(remaining, np.searchsorted(remaining, new), new)
+        self.values = values.copy()
+        return count
+
+    def ranks(self, values=None):
+        """名次（得分更高的单位数加一，并列取相同名次），NaN 的名次为 NaN"""
+        values = self.values if values is None else np.asarray(values, dtype=np.float64)
+        ranks = len(self.sorted) - np.searchsorted(self.sorted, values, side="right") + 1.0
+        return np.where(np.isnan(values), np.nan, ranks)
+
+    def percentiles(self, values=None):
+        """百分位（%）：得分不高于该单位的单位占比，最高分为 100"""
+        values = self.values if values is None else np.asarray(values, dtype=np.float64)
+        if len(self.sorted) == 0:
+            return np.full(len(values), np.nan)
+        shares = np.searchsorted(self.sorted, values, side="right") / len(self.sorted) * 100
+        return np.where(np.isnan(values), np.nan, shares)
+
+    def score_bounds(self, low, high):
+        """百分位在 [low, high] 内的得分范围（含两端），由有序副本直接查出，无需逐个计算百分位"""
+        count = len(self.sorted)
+        if count == 0:
+            return np.inf, -np.inf
+        # 百分位不低于 low：不高于该得分的单位数至少为 low% ；不高于 high：该得分以下（含）的单位数至多为 high%
+        need = int(np.ceil(np.round(low * count / 100, 9)))
+        allow = int(np.floor(np.round(high * count / 100, 9)))
+        lower = self.sorted[need - 1] if need > 0 else -np.inf
+        if allow >= count:
+            return lower, np.inf
+        # 不高于 high% 的得分须严格小于第 allow+1 小的得分，取该值在有序副本中的前一个不同得分
+        cut = np.searchsorted(self.sorted, self.sorted[allow], side="left")
+        return lower, self.sorted[cut - 1] if cut > 0 else -np.inf
+
+
+class Leaderboard:
+    """结果表各得分列的排行榜
+
+    update(frame) 传入最新结果表（不含全市行），按单位名称对齐后增量更新各列的有序副本；
+    单位名单或顺序变化时各列重建。standings() 返回一列的排行。
+    """
+
+    def __init__(self, columns, name_col="区县"):
+        self.columns = list(columns)
+        self.name_col = name_col
+        self.names = None
+        self.indexes = {column: RankIndex() for column in self.columns}
+
+    def update(self, frame):
+        """按最新结果表更新，返回 {得分列: 变化的单位数}"""
+        names = frame[self.name_col].reset_index(drop=True)
+        if self.names is None or not names.equals(self.names):
+            self.indexes = {column: RankIndex() for column in self.columns}
+            self.names = names
+        return {column: self.indexes[column].update(frame[column].to_numpy(dtype=np.float64))
+                for column in self.columns}
+
+    def standings(self, column, n=None, largest=True, contains=None, percentile_range=None):
+        """一列的排行：名次、单位、得分、百分位（%）
+
+        名次和百分位为在全部单位中的位置；先按名称包含 contains、百分位在 percentile_range（含两端）内筛选，
+        再取得分最高（largest=False 时最低）的 n 个单位，n 为 None 时取全部。
+        """
+        index = self.indexes[column]
+        values = index.values
+        keep = np.ones(len(values), dtype=bool)
+        if contains:
+            keep &= self.names.str.contains(contains, regex=False).to_numpy(dtype=bool)
+        if percentile_range is not None:
+            low, high = index.score_bounds(*percentile_range)
+            with np.errstate(invalid="ignore"):
+                keep &= (values >= low) & (values <= high)
+        candidates = np.flatnonzero(keep)
+        order = candidates[select_top(values[candidates], len(candidates) if n is None else n, largest)]
+        return pd.DataFrame({
+            "名次": pd.array(index.ranks(values[order]), dtype="Int64"),
+            self.name_col: self.names.take(order).to_numpy(),
+            column: values[order],
+            "百分位(%)": np.round(index.percentiles(values[order]), 2),
+        })
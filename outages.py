@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+
+from schema import as_code, as_end_time, as_flag, as_name, as_time, factorize_names, name_isin
+
+# --------------------------
+# 专线退服事件日志处理（不依赖 streamlit）
+# 合并同一电路的重叠退服区间，计算各区县退服率及AAA中断次数
+# --------------------------
+
+# 视为AAA专线的取值
+AAA_VALUES = {"是", "AAA", "1", "true", "True", "TRUE", "y", "Y"}
+
+
+def _to_flag(values):
+    """将AAA标识列转换为布尔数组"""
+    if values.dtype == bool:
+        return values.to_numpy()
+    return name_isin(values, AAA_VALUES)
+
+
+def event_schema(district_col="区县", circuit_col="电路编号", start_col="开始时间", end_col="结束时间",
+                 aaa_col="是否AAA"):
+    """退服事件的紧凑列类型（见 schema.py），供读取时转换"""
+    return {
+        district_col: as_name,
+        circuit_col: as_code,
+        start_col: as_time,
+        end_col: as_end_time,
+        aaa_col: as_flag(AAA_VALUES),
+    }
+
+
+def merge_intervals(circuit_codes, starts, ends):
+    """合并同一电路内重叠或首尾相接的区间
+
+    输入为等长的整数数组（时间以整数表示），返回合并后区间所属电路、
+    起点、终点以及每个原始区间所属的合并区间编号（与输入顺序对应）。
+    """
+    order = np.lexsort((starts, circuit_codes))
+    codes = circuit_codes[order]
+    sorted_starts = starts[order]
+    sorted_ends = ends[order]
+
+    # 同一电路内截至当前区间的最大终点
+    running_end = pd.Series(sorted_ends).groupby(codes).cummax().to_numpy()
+    new_block = np.ones(len(order), dtype=bool)
+    new_block[1:] = (codes[1:] != codes[:-1]) | (sorted_starts[1:] > running_end[:-1])
+    block_ids = np.cumsum(new_block) - 1
+
+    block_starts = sorted_starts[new_block]
+    block_ends = np.maximum.reduceat(sorted_ends, np.flatnonzero(new_block)) if len(order) else sorted_ends
+    block_circuits = codes[new_block]
+
+    event_blocks = np.empty(len(order), dtype=np.int64)
+    event_blocks[order] = block_ids
+    return block_circuits, block_starts, block_ends, event_blocks
+
+
+def summarize_outages(events, period_start, period_end, line_counts=None, district_col="区县",
+                      circuit_col="电路编号", start_col="开始时间", end_col="结束时间", aaa_col="是否AAA"):
+    """按区县汇总考核期内的退服时长、退服次数、退服率(%)和AAA中断次数
+
+    退服区间先截取到 [period_start, period_end) 内再按电路合并；未结束（结束时间为空）的事件
+    按考核期末计算，结束时间无法解析的事件不计入。line_counts 为 {区县: 专线总数}，缺省或为 0 时以日志中
+    出现的电路数作为分母。合并后的一段退服计一次退服，只要包含AAA事件即计一次AAA中断。
+    """
+    missing = [col for col in (district_col, circuit_col, start_col, end_col, aaa_col)
+               if col and col not in events.columns]
+    if missing:
+        raise ValueError(f"退服日志缺少列：{', '.join(missing)}")
+
+    period_start = pd.Timestamp(period_start).as_unit("ns").value
+    period_end = pd.Timestamp(period_end).as_unit("ns").value
+    if period_end <= period_start:
+        raise ValueError("考核期结束时间必须晚于开始时间")
+
+    # 结束时间为空的事件尚未结束（OPEN_END，截取到考核期末）；结束时间无法解析的事件不计入
+    start_times = as_time(events[start_col])
+    end_times = as_end_time(events[end_col])
+    starts = np.clip(start_times.to_numpy(dtype="datetime64[ns]").view("i8"), period_start, period_end)
+    ends = np.clip(end_times.to_numpy(dtype="datetime64[ns]").view("i8"), period_start, period_end)
+
+    valid = (
+        start_times.notna().to_numpy()
+        & end_times.notna().to_numpy()
+        & events[circuit_col].notna().to_numpy()
+        & events[district_col].notna().to_numpy()
+        & (ends > starts)
+    )
+
+    district_codes, district_names = factorize_names(events[district_col][valid])
+    circuit_codes, circuit_names = factorize_names(events[circuit_col][valid], strip=False)
+    aaa = _to_flag(events[aaa_col][valid]) if aaa_col else np.zeros(int(valid.sum()), dtype=bool)
+
+    block_circuits, block_starts, block_ends, event_blocks = merge_intervals(
+        circuit_codes, starts[valid], ends[valid]
+    )
+
+    # 每个电路所属区县（取该电路第一条事件的区县）
+    circuit_district = pd.Series(district_codes).groupby(circuit_codes).first().to_numpy()
+    block_districts = circuit_district[block_circuits]
+
+    block_aaa = np.zeros(len(block_circuits), dtype=bool)
+    block_aaa[event_blocks[aaa]] = True
+
+    n = len(district_names)
+    downtime = np.bincount(block_districts, weights=block_ends - block_starts, minlength=n)
+    aaa_counts = np.bincount(block_districts[block_aaa], minlength=n)
+    logged_lines = np.bincount(circuit_district, minlength=n)
+
+    summary = pd.DataFrame({
+        "退服时长(小时)": np.round(downtime / 3.6e12, 2),
+        "退服次数": np.bincount(block_districts, minlength=n),
+        "日志电路数": logged_lines,
+        "AAA中断次数": aaa_counts,
+    }, index=pd.Index(district_names, name="区县"))
+
+    line_counts = line_counts or {}
+    lines = np.array([line_counts.get(d) or 0 for d in district_names], dtype=np.float64)
+    summary["专线总数"] = np.where(lines > 0, lines, logged_lines).astype(np.int64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = downtime / (summary["专线总数"].to_numpy() * (period_end - period_start)) * 100
+    summary["退服率(%)"] = np.round(np.nan_to_num(rate), 2)
+    return summary.sort_index()
@@ -0,0 +1,172 @@
+import numpy as np
+import pandas as pd
+
+# --------------------------
+# 原始记录的紧凑列类型（投诉工单、交付工单、退服事件共用，不依赖 streamlit）
+# 区县、电路、状态等重复出现的名称存为分类（整数编码 + 类别表），时间存为 datetime64，
+# 标识列存为布尔；名称的去空白、取值判断只在类别表上进行，不逐行生成字符串
+# --------------------------
+
+
+def as_name(values, strip=True):
+    """名称列转为分类（strip 为真时去除首尾空白后归并），缺失值保持缺失
+
+    已是分类的列只处理类别表；其他列先编码再处理各不同取值。
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+    else:
+        codes, uniques = pd.factorize(values)
+    if strip:
+        uniques = pd.Index(uniques.astype(str)).str.strip()
+        remap, uniques = pd.factorize(uniques)
+        codes = np.where(codes >= 0, remap[codes], -1)
+    categories = pd.Categorical.from_codes(codes, pd.Index(uniques))
+    return pd.Series(categories, index=values.index, name=values.name)
+
+
+def as_code(values):
+    """编码列（电路编号等）转为分类，取值原样保留"""
+    return as_name(values, strip=False)
+
+
+def as_time(values):
+    """时间列转为 datetime64，无法解析的取值为缺失（个数由 compact_frame 记录）
+
+    Arrow 字符串列先整列按 ISO 格式直接转换（不逐行生成 Python 字符串），
+    有无法按 ISO 格式转换的取值时再逐个解析（各取值的格式可以不同）。
+    """
+    if isinstance(values.dtype, pd.StringDtype) and values.dtype.storage == "pyarrow":
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        try:
+            stamps = pc.cast(pa.array(values), pa.timestamp("ns"))
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            pass
+        else:
+            return pd.Series(stamps.to_numpy(zero_copy_only=False), index=values.index, name=values.name)
+    return pd.to_datetime(values, format="mixed", errors="coerce").astype("datetime64[ns]")
+
+
+# 未结束事件的结束时间：原值为空的结束时间记为该时间（截取到考核期末），与无法解析（NaT）区分
+OPEN_END = pd.Timestamp.max.floor("s")
+
+
+def is_blank(values):
+    """取值为空（缺失或只含空白）的布尔数组"""
+    if isinstance(values.dtype, pd.StringDtype) or values.dtype == object:
+        text = values.astype("string").str.strip()
+        return (text.isna() | text.eq("")).to_numpy(dtype=bool)
+    return values.isna().to_numpy(dtype=bool)
+
+
+def as_end_time(values):
+    """结束时间列转为 datetime64：原值为空（事件未结束）的记为 OPEN_END，无法解析的为缺失
+
+    已是时间类型的列（已转换的紧凑列）原样返回，其中的缺失即无法解析。
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    converted = as_time(values)
+    return converted.mask(pd.Series(is_blank(values), index=values.index), OPEN_END)
+
+
+def unparsed_count(raw, converted):
+    """转换为时间后变为缺失、原值却不为空（非空白）的个数，只检查转换后缺失的行"""
+    if not pd.api.types.is_datetime64_any_dtype(converted) or pd.api.types.is_datetime64_any_dtype(raw):
+        return 0
+    missing = converted.isna().to_numpy()
+    if not missing.any():
+        return 0
+    return int((~is_blank(raw[missing])).sum())
+
+
+def name_isin(values, options):
+    """名称列去除首尾空白后是否属于 options，返回布尔数组（缺失值为否）"""
+    values = as_name(values)
+    hits = np.append(values.cat.categories.isin(options), False)
+    return hits[values.cat.codes.to_numpy()]  # 编码 -1（缺失）取末尾的 False
+
+
+def as_flag(true_values):
+    """返回标识列的转换函数：去除首尾空白后属于 true_values 的为真"""
+    def convert(values):
+        if values.dtype == bool:
+            return values
+        return pd.Series(name_isin(values, true_values), index=values.index, name=values.name)
+    return convert
+
+
+def factorize_names(values, strip=True):
+    """名称列编码为 (按首次出现顺序的整数编码, 名称 Index)，缺失值编码为 -1"""
+    codes, uniques = pd.factorize(as_name(values, strip=strip))
+    return codes, pd.Index(uniques.to_numpy())
+
+
+def compact_frame(frame, schema):
+    """按 schema（{列名: 转换函数}）逐列转换，未列出的列保持不变
+
+    逐列替换，转换前的列在下一列转换前即可释放，峰值内存只比结果多一列。
+    无法解析为时间的取值个数记录在结果的 attrs["unparsed"]（{列名: 个数}，只含有无法解析取值的列）。
+    """
+    frame = frame.copy(deep=False)
+    unparsed = {}
+    for column, convert in schema.items():
+        if column and column in frame.columns:
+            converted = convert(frame[column])
+            count = unparsed_count(frame[column], converted)
+            if count:
+                unparsed[column] = count
+            frame[column] = converted
+    frame.attrs["unparsed"] = unparsed
+    return frame
+
+
+def merge_unparsed(frames):
+    """合并各块记录的无法解析个数"""
+    merged = {}
+    for frame in frames:
+        for column, count in frame.attrs.get("unparsed", {}).items():
+            merged[column] = merged.get(column, 0) + count
+    return merged
+
+
+def unparsed_message(frame):
+    """无法解析的时间取值的提示文字，没有时返回 None"""
+    unparsed = frame.attrs.get("unparsed")
+    if not unparsed:
+        return None
+    return "；".join(f"“{column}”列有 {count} 个取值无法解析为时间，已按缺失处理" for column, count in unparsed.items())
+
+
+def concat_compact(frames):
+    """拼接按同一 schema 转换过的多个DataFrame（列相同），分类列合并类别表后仍为分类
+
+    直接 pd.concat 时类别表不同的分类列会变为对象列；类别表的类型不一致时（如 CSV 与 Excel）
+    先将类别转为字符串再合并。
+    """
+    from pandas.api.types import union_categoricals
+
+    frames = list(frames)
+    columns = {}
+    for column in frames[0].columns:
+        parts = [frame[column] for frame in frames]
+        if not all(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+            columns[column] = pd.concat(parts, ignore_index=True)
+            continue
+        try:
+            merged = union_categoricals(parts)
+        except TypeError:
+            merged = union_categoricals(
+                [part.cat.rename_categories(part.cat.categories.astype(str)) for part in parts]
+            )
+        columns[column] = pd.Series(merged, name=column)
+    result = pd.DataFrame(columns, index=pd.RangeIndex(sum(len(frame) for frame in frames)))
+    result.attrs["unparsed"] = merge_unparsed(frames)
+    return result
+
+
+def memory_usage(frame):
+    """DataFrame 占用的字节数（含字符串内容）"""
+    return int(frame.memory_usage(index=True, deep=True).sum())
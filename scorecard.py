@@ -0,0 +1,177 @@
+import numpy as np
+import pandas as pd
+
+from assessments import (
+    ASSESSMENTS,
+    COMPLAINT_ROLLUP,
+    DELIVERY_ROLLUP,
+    DOWNSERVICE_ROLLUP,
+    complaint_city_row,
+    delivery_city_row,
+    downservice_city_row,
+    sum_totals,
+)
+from scoring import (
+    RULES,
+    batch_aaa_factor,
+    batch_complaint_score,
+    batch_downrate_score,
+    batch_ontime_score,
+    batch_resolve_rate_score,
+    batch_success_score,
+    round2,
+)
+
+# --------------------------
+# 综合计分卡（不依赖 streamlit）
+# 三项考核的区县输入合并为一个共享表（每个区县一行），一次计算全部单项得分、各项总分及合计；
+# 全市行由一次精确累加的合计（三项汇总规则合并）得出，结果与各标签页逐项计算一致
+# --------------------------
+
+SCORECARD_ROLLUP = {**COMPLAINT_ROLLUP, **DELIVERY_ROLLUP, **DOWNSERVICE_ROLLUP}
+
+# 各项考核的满分（单项满分之和）
+SECTION_FULL = {
+    "complaint": RULES["complaint"].max_score + RULES["resolve"].max_score,
+    "delivery": RULES["ontime"].max_score + RULES["success"].max_score,
+    "downservice": RULES["downrate"].max_score,
+}
+TOTAL_FULL = sum(SECTION_FULL.values())
+
+# 各标签页导入的汇总表：会话键 -> (考核键, 上传控件键, 作为全市汇总权重的列)
+IMPORT_SUMMARIES = {
+    "complaint_repeat_summary": ("complaint", "complaint_ticket_file", ["重复故障数"]),
+    "delivery_summary": ("delivery", "delivery_order_file", ["应完成工单数", "已结束工单数"]),
+    "outage_summary": ("downservice", "outage_event_file", ["专线总数"]),
+}
+# 会话中由监控目录载入的汇总表的会话键集合（不对应上传控件）
+WATCHED_SUMMARIES = "watched_summaries"
+
+
+def add_weights(data, summary, column):
+    """将导入汇总表中的数量作为全市汇总权重加入各区县数据（汇总表中没有的区县记为0）"""
+    for district in data:
+        data[district][column] = int(summary[column].get(district, 0))
+
+
+def active_summary(state, key):
+    """会话中当前有效的导入汇总表，无效时为 None
+
+    汇总表来自仍在上传控件中的导出文件，或由监控目录载入时有效；上传的文件移除后汇总表虽留在会话中，
+    但不再作为区县输入的来源，也不再用于全市加权。各标签页与计分卡/导出共用此判断，全市行保持一致
+    """
+    summary = state.get(key)
+    if summary is None:
+        return None
+    upload_key = IMPORT_SUMMARIES[key][1]
+    if state.get(upload_key) is not None or key in state.get(WATCHED_SUMMARIES, ()):
+        return summary
+    return None
+
+
+def add_import_weights(state, assessment, data):
+    """按会话中有效的导入汇总表为该项考核的区县数据加入全市汇总权重（就地修改）"""
+    for key, (name, _, columns) in IMPORT_SUMMARIES.items():
+        summary = active_summary(state, key) if name == assessment else None
+        if summary is not None:
+            for column in columns:
+                add_weights(data, summary, column)
+
+
+def shared_units(inputs):
+    """合并三项考核的区县输入（含投诉挑战值/基准值），返回 {区县: 输入}，各项考核的区县须一致"""
+    missing = [ASSESSMENTS[key] for key in ASSESSMENTS if key not in inputs]
+    if missing:
+        raise ValueError(f"输入缺少考核：{'、'.join(missing)}")
+    complaint, delivery, downservice = (inputs[key] for key in ASSESSMENTS)
+    names = list(complaint["data"])
+    for key in ("delivery", "downservice"):
+        if set(inputs[key]["data"]) != set(names):
+            raise ValueError(f"{ASSESSMENTS[key]}的区县与{ASSESSMENTS['complaint']}不一致")
+    return {
+        d: {**complaint["data"][d], **complaint["params"][d], **delivery["data"][d], **downservice["data"][d]}
+        for d in names
+    }
+
+
+def rank_descending(values):
+    """按得分从高到低排名，并列取最小名次（名次为得分更高的单位数加一）"""
+    values = np.asarray(values, dtype=np.float64)
+    return len(values) - np.searchsorted(np.sort(values), values, side="right") + 1
+
+
+def shared_frame(units):
+    """各区县合并输入的共享表（每个区县一行，列为三项考核的全部输入键）"""
+    keys = dict.fromkeys(key for unit in units.values() for key in unit)
+    return pd.DataFrame({key: [unit.get(key) for unit in units.values()] for key in keys},
+                        index=pd.Index(list(units), name="区县"))
+
+
+def score_card(inputs):
+    """按输入字典（格式同 cli.py，须包含三项考核）计算综合计分卡
+
+    返回各区县及全市一行：单项得分、各项总分（列名为考核名称）、合计，以及各项总分和合计在区县中的排名
+    （全市不参与排名）。各项总分与 score_inputs 的结果表一致。
+    """
+    units = shared_units(inputs)
+    frame = shared_frame(units)
+    complaint, delivery, downservice = (inputs[key] for key in ASSESSMENTS)
+    aaa_factors = dict(enumerate(downservice["aaa_factors"]))
+
+    # 一次累加三项考核的全市合计，各项全市行共用
+    totals = sum_totals(units.values(), SCORECARD_ROLLUP)
+    complaint_city = complaint_city_row(
+        totals, complaint["resolve_rate_base"], complaint["resolve_rate_challenge"], complaint["params"]["全市"]
+    )
+    delivery_city = delivery_city_row(
+        totals, delivery["ontime_base"], delivery["ontime_challenge"],
+        delivery["success_base"], delivery["success_challenge"]
+    )
+    downservice_city = downservice_city_row(
+        totals, downservice["downrate_base"], downservice["downrate_challenge"], aaa_factors
+    )
+
+    complaint_scores = batch_complaint_score(
+        frame["投诉次数"].to_numpy(dtype=np.int64),
+        frame["挑战值"].to_numpy(dtype=np.int64),
+        frame["基准值"].to_numpy(dtype=np.int64),
+        has_repeated=frame["重复投诉"].to_numpy(dtype=bool)
+    )
+    resolve_scores = batch_resolve_rate_score(
+        frame["解决率"].to_numpy(dtype=np.float64),
+        complaint["resolve_rate_base"], complaint["resolve_rate_challenge"]
+    )
+    ontime_scores = batch_ontime_score(
+        frame["及时率(%)"].to_numpy(dtype=np.float64), delivery["ontime_base"], delivery["ontime_challenge"]
+    )
+    success_scores = batch_success_score(
+        frame["成功率(%)"].to_numpy(dtype=np.float64), delivery["success_base"], delivery["success_challenge"]
+    )
+    downrate_scores = batch_downrate_score(
+        frame["退服率(%)"].to_numpy(dtype=np.float64),
+        downservice["downrate_base"], downservice["downrate_challenge"]
+    )
+    factors = batch_aaa_factor(frame["AAA中断次数"].to_numpy(dtype=np.int64), aaa_factors)
+
+    # 各列为区县得分后接全市得分
+    columns = {
+        "投诉得分": np.append(complaint_scores, complaint_city["投诉得分"]),
+        "解决率得分": np.append(resolve_scores, complaint_city["解决率得分"]),
+        ASSESSMENTS["complaint"]: np.append(round2(complaint_scores + resolve_scores), complaint_city["总分"]),
+        "及时率得分": np.append(ontime_scores, delivery_city["及时率得分"]),
+        "成功率得分": np.append(success_scores, delivery_city["成功率得分"]),
+        ASSESSMENTS["delivery"]: np.append(round2(ontime_scores + success_scores), delivery_city["总分"]),
+        "退服率得分": np.append(downrate_scores, downservice_city["退服率得分"]),
+        "AAA系数": np.append(factors, downservice_city["AAA系数"]),
+        ASSESSMENTS["downservice"]: np.append(round2(downrate_scores * factors), downservice_city["总分"]),
+    }
+    sections = [columns[name] for name in ASSESSMENTS.values()]
+    columns["总分"] = round2(sections[0] + sections[1] + sections[2])
+
+    # 排名只在区县中进行，全市行为空
+    city_mask = np.zeros(len(units) + 1, dtype=bool)
+    city_mask[-1] = True
+    for name in list(ASSESSMENTS.values()) + ["总分"]:
+        ranks = np.append(rank_descending(columns[name][:-1]), 0)
+        columns[f"{name}排名"] = pd.arrays.IntegerArray(ranks.astype(np.int64), city_mask)
+    return pd.DataFrame({"区县": list(units) + ["全市"], **columns})
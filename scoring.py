@@ -0,0 +1,209 @@
+import functools
+import json
+import os
+
+import numpy as np
+
+# --------------------------
+# 批量评分引擎（纯 NumPy，不依赖 streamlit）
+# 评分规则由配置文件（scoring_rules.json）定义，启动时编译为向量化评分函数；
+# 与 computeScore1.py 中逐区县调用的评分函数结果逐位一致
+# --------------------------
+
+# 默认评分规则配置（与本文件同目录），可通过环境变量 SCORING_RULES 指定其他文件
+DEFAULT_RULES = os.environ.get(
+    "SCORING_RULES", os.path.join(os.path.dirname(os.path.abspath(__file__)), "scoring_rules.json")
+)
+
+
+def round2(values):
+    """按 Python 内置 round(x, 2) 的规则保留两位小数
+
+    np.round 先乘 100 再取整，在 x.xx5 这类边界值上可能与内置 round 相差 0.01，
+    因此仅对接近边界的元素退回内置 round，其余元素走向量化路径。
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.round(values, 2)
+    scaled = values * 100
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        rounded = np.array(rounded, copy=True)
+        rounded[near_tie] = [round(float(v), 2) for v in values[near_tie]]
+    return rounded
+
+
+def _piecewise(reach_full, in_range, partial, full_score):
+    """挑战值得满分、基准值与挑战值之间线性得分、其余不得分"""
+    return np.select(
+        [reach_full, in_range],
+        [np.float64(full_score), partial],
+        default=np.float64(0.0)
+    )
+
+
+class ScoringRule:
+    """由配置编译的分段线性评分规则（挑战值得满分，基准值得 base_ratio 比例的分数，劣于基准值不得分）
+
+    direction 为 higher（越高越好）或 lower（越低越好）；anchor 为线性段的计算起点：
+    base 时得分 = 基准分 + 每单位分值 × 优于基准值的量，
+    challenge 时得分 = 满分 - 每单位分值 × 差于挑战值的量。
+    调用方式：rule(values, base, challenge)，参数均可为标量或可广播的数组。
+    """
+
+    def __init__(self, key, name, max_score, direction="higher", anchor="base", base_ratio=0.6):
+        if direction not in ("higher", "lower"):
+            raise ValueError(f"评分规则 {key} 的 direction 应为 higher 或 lower：{direction}")
+        if anchor not in ("base", "challenge"):
+            raise ValueError(f"评分规则 {key} 的 anchor 应为 base 或 challenge：{anchor}")
+        self.key = key
+        self.name = name
+        self.max_score = float(max_score)
+        self.higher_is_better = direction == "higher"
+        self.anchor = anchor
+        # 基准分取整到小数点后6位，避免 1.5 × 0.6 之类的浮点误差
+        self.base_score = round(self.max_score * base_ratio, 6)
+        self.score_range = self.max_score * (1 - base_ratio)
+
+    def __call__(self, values, base, challenge):
+        values = np.asarray(values, dtype=np.float64)
+        base = np.asarray(base, dtype=np.float64)
+        challenge = np.asarray(challenge, dtype=np.float64)
+        if self.higher_is_better:
+            value_range = challenge - base
+            reach_full, in_range = values >= challenge, values >= base
+        else:
+            value_range = base - challenge
+            reach_full, in_range = values <= challenge, values <= base
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            score_per_unit = self.score_range / np.where(value_range == 0, 1, value_range)
+            if self.anchor == "base":
+                gain = values - base if self.higher_is_better else base - values
+                linear = round2(self.base_score + score_per_unit * gain)
+            else:
+                shortfall = challenge - values if self.higher_is_better else values - challenge
+                linear = round2(self.max_score - score_per_unit * shortfall)
+        partial = np.where(value_range == 0, self.max_score, linear)
+
+        return _piecewise(reach_full, in_range, partial, self.max_score)
+
+    def inverse(self, targets, base, challenge, step=0.01):
+        """反解：得分不低于 targets 所需的指标值（越高越好时为最低值，越低越好时为最高值）
+
+        线性段闭式求解后对齐到指标取值步长 step（比率 0.01、次数 1），再用正向规则校验，
+        相差一个步长时修正，因此结果在该步长上与正向评分逐位一致。
+        targets 高于满分时为 NaN（达不到），不高于 0 时为 ±inf（取值不限）；参数均可为可广播的数组。
+        """
+        targets = np.asarray(targets, dtype=np.float64)
+        base = np.asarray(base, dtype=np.float64)
+        challenge = np.asarray(challenge, dtype=np.float64)
+        sign = 1.0 if self.higher_is_better else -1.0
+        value_range = (challenge - base) * sign
+
+        # 得分按两位小数取整，线性部分不低于 targets - 0.005 即可
+        needed = targets - 0.005
+        with np.errstate(divide="ignore", invalid="ignore"):
+            units_per_score = np.where(value_range == 0, 0.0, value_range) / self.score_range
+            if self.anchor == "base":
+                linear = base + sign * (needed - self.base_score) * units_per_score
+            else:
+                linear = challenge - sign * (self.max_score - needed) * units_per_score
+        # 限制在基准值与挑战值之间：达到基准值即得基准分，达到挑战值即得满分
+        linear = np.where(sign * (linear - base) < 0, base, linear)
+        linear = np.where(sign * (linear - challenge) > 0, challenge, linear)
+
+        decimals = max(0, -int(np.floor(np.log10(step))))
+        if self.higher_is_better:
+            values = np.ceil(np.round(linear / step, 6)) * step
+        else:
+            values = np.floor(np.round(linear / step, 6)) * step
+        values = np.round(values, decimals)
+        better = np.round(values + sign * step, decimals)
+        values = np.where(self(values, base, challenge) >= targets, values, better)
+        worse = np.round(values - sign * step, decimals)
+        values = np.where(self(worse, base, challenge) >= targets, worse, values)
+
+        values = np.where(targets <= 0, -sign * np.inf, values)
+        return np.where(targets > self.max_score, np.nan, values)
+
+
+class LookupRule:
+    """按次数查表的系数规则，cap 次及以上使用同一系数；调用方式：rule(counts, table=None)"""
+
+    def __init__(self, key, name, cap, default):
+        if len(default) != cap + 1:
+            raise ValueError(f"系数规则 {key} 的 default 应有 {cap + 1} 项")
+        self.key = key
+        self.name = name
+        self.cap = int(cap)
+        self.default = [float(v) for v in default]
+
+    def __call__(self, counts, table=None):
+        table = self.default if table is None else table
+        table = np.array([table[i] for i in range(self.cap + 1)], dtype=np.float64)
+        index = np.minimum(np.asarray(counts, dtype=np.int64), self.cap)
+        return table[index]
+
+
+@functools.lru_cache(maxsize=None)
+def load_rules(path=None):
+    """读取并编译评分规则配置，同一文件在进程内只编译一次，返回 {规则键: 规则}"""
+    with open(path or DEFAULT_RULES, encoding="utf-8") as f:
+        config = json.load(f)
+    base_ratio = config.get("base_ratio", 0.6)
+    rules = {
+        key: ScoringRule(key, base_ratio=spec.pop("base_ratio", base_ratio), **spec)
+        for key, spec in config.get("metrics", {}).items()
+    }
+    rules.update({key: LookupRule(key, **spec) for key, spec in config.get("lookups", {}).items()})
+    return rules
+
+
+RULES = load_rules()
+
+# 各指标满分
+COMPLAINT_FULL = RULES["complaint"].max_score
+RESOLVE_FULL = RULES["resolve"].max_score
+ONTIME_FULL = RULES["ontime"].max_score
+SUCCESS_FULL = RULES["success"].max_score
+DOWNRATE_FULL = RULES["downrate"].max_score
+
+
+def score_metric(key, values, base, challenge):
+    """按规则键批量计算任一指标得分（新增指标只需在配置文件中增加规则）"""
+    return RULES[key](values, base, challenge)
+
+
+def batch_complaint_score(complaints, challenge, base, has_repeated=False, is_city=False):
+    """批量计算投诉压降得分（投诉次数越少越好）
+
+    参数均可为标量或可广播的数组；is_city 为真的行忽略重复投诉。
+    """
+    scores = RULES["complaint"](complaints, base, challenge)
+    zeroed = np.logical_and(np.asarray(has_repeated, dtype=bool), ~np.asarray(is_city, dtype=bool))
+    return np.where(zeroed, 0.0, scores)
+
+
+def batch_resolve_rate_score(rates, base, challenge):
+    """批量计算重复故障解决率得分"""
+    return RULES["resolve"](rates, base, challenge)
+
+
+def batch_ontime_score(rates, base, challenge):
+    """批量计算交付及时率得分"""
+    return RULES["ontime"](rates, base, challenge)
+
+
+def batch_success_score(rates, base, challenge):
+    """批量计算交付成功率得分"""
+    return RULES["success"](rates, base, challenge)
+
+
+def batch_downrate_score(rates, base, challenge):
+    """批量计算专线退服率得分（退服率越低越好）"""
+    return RULES["downrate"](rates, base, challenge)
+
+
+def batch_aaa_factor(interruptions, aaa_factors):
+    """批量查询AAA中断系数，3次及以上使用同一系数"""
+    return RULES["aaa"](interruptions, aaa_factors)
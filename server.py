@@ -0,0 +1,263 @@
+"""区县集客业务考核本地 HTTP 评分服务（JSON，不依赖 streamlit，供其他系统程序化调用）
+
+用法：
+    python server.py [--host 127.0.0.1] [--port 8765] [--org-tree 组织树.json] [-v]
+
+接口（请求体和响应均为 UTF-8 编码的 JSON）：
+
+    GET  /health    {"status": "ok"}
+    GET  /rules     评分规则（各指标满分、方向，AAA系数表）
+    POST /score     请求体格式同 cli.py 的输入文件，返回 {考核键: [各区县及全市结果行, ...]}
+    POST /batch     {"items": [{"id": "攀枝花", "period": "2024-05", "inputs": {...}}, ...]}
+                    逐项计算（inputs 格式同 /score），返回 {"results": [{"id", "period", "results"}, ...]}，
+                    出错的项返回 "error" 而不是 "results"，不影响其他项
+    POST /metrics   {"metric": "ontime", "values": [...], "base": 94, "challenge": 96}
+                    按评分规则批量计算单个指标的得分，base/challenge 可为与 values 等长的数组；
+                    complaint 可附带 "repeated"（是否重复投诉），aaa 为 {"metric": "aaa", "values": [中断次数],
+                    "table": [系数, ...]}（table 省略时用默认系数），返回 {"scores": [...]}
+
+评分规则在启动时编译一次（见 scoring.py），各请求共用；每个请求在独立线程中处理。
+指定 --org-tree 时 /score 与 /batch 按组织树逐级计算（输入格式见 cli.py）。
+请求格式错误返回 400，请求体超过大小上限返回 413，路径不存在返回 404，服务端异常返回 500，
+均带 {"error": 说明}。
+"""
+import argparse
+import json
+import math
+import sys
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from assessments import score_inputs
+from hierarchy import load_org_tree, score_tree_inputs
+from scoring import RULES, LookupRule, batch_complaint_score
+
+# 请求体大小上限（字节）
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+
+class RequestError(Exception):
+    """请求格式错误，返回给调用方的说明"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+# 输入数据格式不符时评分过程中可能出现的异常（缺少字段、取值类型不符或超出范围），均按请求格式错误处理；
+# 输入结构由 check_inputs 预先检查，其他异常视为服务端错误
+INPUT_ERRORS = (RequestError, KeyError, ValueError, TypeError, OverflowError)
+
+# 输入字典中的各项考核
+SECTION_KEYS = ("complaint", "delivery", "downservice")
+
+
+def finite_float(text):
+    """JSON 中的小数，超出浮点数范围（如 1e400）或为 NaN/Infinity 时拒绝"""
+    value = float(text)
+    if not math.isfinite(value):
+        raise RequestError(f"数值超出范围：{text}")
+    return value
+
+
+def check_inputs(inputs):
+    """检查输入字典的结构：各项考核为 JSON 对象，其中 data、params 为 {单位: JSON 对象}，aaa_factors 为数组"""
+    if not isinstance(inputs, dict):
+        raise RequestError("inputs 应为 JSON 对象")
+    for key in SECTION_KEYS:
+        if key not in inputs:
+            continue
+        section = inputs[key]
+        if not isinstance(section, dict):
+            raise RequestError(f"{key} 应为 JSON 对象")
+        for field in ("data", "params"):
+            rows = section.get(field, {})
+            if not isinstance(rows, dict) or not all(isinstance(row, dict) for row in rows.values()):
+                raise RequestError(f"{key}.{field} 应为 {{单位: JSON 对象}}")
+        if not isinstance(section.get("aaa_factors", []), list):
+            raise RequestError(f"{key}.aaa_factors 应为数组")
+
+
+def frame_records(result_df):
+    """结果表转为 JSON 可序列化的行列表（缺失值为 null）"""
+    columns = list(result_df.columns)
+    return [
+        {column: None if pd.isna(value) else value for column, value in zip(columns, row)}
+        for row in result_df.to_numpy(dtype=object).tolist()
+    ]
+
+
+def score_section(inputs, tree=None):
+    """按输入字典计算各项考核，返回 {考核键: 结果行列表}"""
+    check_inputs(inputs)
+    results = score_tree_inputs(tree, inputs) if tree is not None else score_inputs(inputs)
+    return {key: frame_records(result_df) for key, result_df in results.items()}
+
+
+def score_batch(body, tree=None):
+    """逐项计算批量请求，单项出错时记录错误信息"""
+    items = body.get("items")
+    if not isinstance(items, list):
+        raise RequestError("请求体应包含 items 列表")
+    results = []
+    for item in items:
+        if not isinstance(item, dict):
+            raise RequestError("items 中的每一项应为 JSON 对象")
+        entry = {"id": item.get("id"), "period": item.get("period")}
+        try:
+            entry["results"] = score_section(item.get("inputs"), tree)
+        except INPUT_ERRORS as e:
+            entry["error"] = describe_error(e)
+        results.append(entry)
+    return {"results": results}
+
+
+def metric_values(body, key, size=None, default=None):
+    """请求中的数值或一维数值数组；size 不为 None 时数组须与 values 等长"""
+    value = body.get(key, default)
+    if value is None:
+        raise RequestError(f"缺少字段：{key}")
+    array = np.asarray(value, dtype=np.float64)
+    if array.ndim > 1 or (array.ndim == 1 and size is not None and len(array) != size):
+        raise RequestError(f"{key} 应为数值或与 values 等长的数组")
+    return value
+
+
+def score_metrics(body):
+    """按评分规则批量计算单个指标得分"""
+    rule = RULES.get(body.get("metric"))
+    if rule is None:
+        raise RequestError(f"未知指标：{body.get('metric')}，可选：{'、'.join(RULES)}")
+    values = metric_values(body, "values")
+    size = len(values) if np.ndim(values) else None
+    if isinstance(rule, LookupRule):
+        counts = np.asarray(values, dtype=np.float64)
+        if ((counts < 0) | (counts != np.floor(counts))).any():
+            raise RequestError(f"{rule.key} 的 values 应为非负整数")
+        table = body.get("table")
+        if table is not None and (np.ndim(table) != 1 or len(table) < rule.cap + 1):
+            raise RequestError(f"table 应为至少 {rule.cap + 1} 项的数组")
+        scores = rule(values, table)
+    elif rule.key == "complaint":
+        scores = batch_complaint_score(
+            values, metric_values(body, "challenge", size), metric_values(body, "base", size),
+            has_repeated=metric_values(body, "repeated", size, default=False)
+        )
+    else:
+        scores = rule(values, metric_values(body, "base", size), metric_values(body, "challenge", size))
+    return {"scores": np.atleast_1d(scores).tolist()}
+
+
+def describe_error(error):
+    if isinstance(error, KeyError):
+        return f"缺少字段：{error.args[0]}"
+    return str(error)
+
+
+class ScoreHandler(BaseHTTPRequestHandler):
+    """评分请求处理（HTTP/1.1，支持长连接）"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # 响应头和响应体分两次写出，避免与客户端延迟确认叠加产生约 40ms 延迟
+    server_version = "ScoreServer/1.0"
+    verbose = False
+
+    def do_GET(self):
+        if self.path == "/health":
+            self.send_json({"status": "ok"})
+        elif self.path == "/rules":
+            self.send_json({key: vars(rule) for key, rule in RULES.items()})
+        else:
+            self.send_json({"error": f"路径不存在：{self.path}"}, status=404)
+
+    def do_POST(self):
+        routes = {
+            "/score": lambda body: score_section(body, self.server.tree),
+            "/batch": lambda body: score_batch(body, self.server.tree),
+            "/metrics": score_metrics,
+        }
+        route = routes.get(self.path)
+        try:
+            body = self.read_json()
+            if route is None:
+                raise RequestError(f"路径不存在：{self.path}", status=404)
+            self.send_json(route(body))
+        except INPUT_ERRORS as e:
+            self.send_json({"error": describe_error(e)}, status=getattr(e, "status", 400))
+        except Exception:
+            self.log_error("%s 处理出错", self.path)
+            traceback.print_exc()
+            self.send_json({"error": "服务端内部错误"}, status=500)
+
+    def read_json(self):
+        header = self.headers.get("Content-Length") or "0"
+        try:
+            length = int(header)
+        except ValueError:
+            length = -1
+        if length < 0 or length > MAX_BODY_BYTES:
+            self.close_connection = True  # 请求体长度无效或过大，未读取的请求体不能留在长连接中
+            if length < 0:
+                raise RequestError(f"Content-Length 无效：{header}")
+            raise RequestError(f"请求体超过 {MAX_BODY_BYTES // (1024 * 1024)}MB", status=413)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}", parse_float=finite_float, parse_constant=finite_float)
+        except ValueError as e:
+            raise RequestError(f"请求体不是有效的 JSON：{e}")
+        if not isinstance(body, dict):
+            raise RequestError("请求体应为 JSON 对象")
+        return body
+
+    def send_json(self, payload, status=200):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.verbose:
+            super().log_message(format, *args)
+
+    def log_error(self, format, *args):
+        super().log_message(format, *args)  # 错误不受 verbose 限制，总是输出
+
+
+class ScoreServer(ThreadingHTTPServer):
+    """评分服务，tree 为组织树（None 时按区县计算）"""
+
+    daemon_threads = True
+
+    def __init__(self, address, tree=None, verbose=False):
+        handler = type("Handler", (ScoreHandler,), {"verbose": verbose})
+        super().__init__(address, handler)
+        self.tree = tree
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="区县集客业务考核本地 HTTP 评分服务")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址，默认 127.0.0.1（仅本机）")
+    parser.add_argument("--port", type=int, default=8765, help="监听端口，默认 8765")
+    parser.add_argument("--org-tree", help="组织树配置文件（JSON），指定后按组织树逐级汇总计算")
+    parser.add_argument("-v", "--verbose", action="store_true", help="逐条输出请求日志")
+    args = parser.parse_args(argv)
+
+    tree = load_org_tree(args.org_tree) if args.org_tree else None
+    server = ScoreServer((args.host, args.port), tree=tree, verbose=args.verbose)
+    host, port = server.server_address[:2]
+    print(f"评分服务已启动：http://{host}:{port}（Ctrl+C 停止）", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+from assessments import (
+    COMPLAINT_ROLLUP,
+    DELIVERY_ROLLUP,
+    DOWNSERVICE_ROLLUP,
+    rollup_mean,
+    round_half_up2,
+    sum_totals,
+)
+from scoring import RULES, batch_complaint_score
+
+# --------------------------
+# 基准值/挑战值参数模拟（不依赖 streamlit）
+# 对一组候选阈值组合一次性广播计算各区县及全市得分
+# --------------------------
+
+# 比率类指标：指标键 -> (名称, 批量评分函数, 是否越高越好)，均取自评分规则配置
+RATE_METRICS = {
+    key: (RULES[key].name, RULES[key], RULES[key].higher_is_better)
+    for key in ("resolve", "ontime", "success", "downrate")
+}
+
+# 比率类指标的区县输入键及全市汇总规则（与结果表的全市行相同）
+RATE_ROLLUPS = {
+    "resolve": ("解决率", COMPLAINT_ROLLUP["解决率"]),
+    "ontime": ("及时率(%)", DELIVERY_ROLLUP["及时率(%)"]),
+    "success": ("成功率(%)", DELIVERY_ROLLUP["成功率(%)"]),
+    "downrate": ("退服率(%)", DOWNSERVICE_ROLLUP["退服率(%)"]),
+}
+
+
+def threshold_grid(start, stop, step):
+    """生成包含端点的候选阈值序列（按两位小数取整，避免浮点累积误差）"""
+    count = int(np.floor((stop - start) / step + 1e-9)) + 1
+    return np.round(start + step * np.arange(max(count, 0)), 2)
+
+
+def sweep_rate_metric(metric, units, bases, challenges):
+    """比率类指标的参数模拟
+
+    units 为各区县输入（格式同 cli.py 的区县数据，可含汇总权重），返回形状为
+    (len(bases), len(challenges), 区县数 + 1) 的得分数组，最后一列为全市（按汇总规则加权平均，
+    取整方式与结果表一致）。挑战值劣于基准值的组合无意义，得分记为 NaN。
+    """
+    _, score_fn, higher_is_better = RATE_METRICS[metric]
+    key, rule = RATE_ROLLUPS[metric]
+    units = list(units)
+    rates = np.array([unit[key] for unit in units], dtype=np.float64)
+    city_rate = round_half_up2(rollup_mean(sum_totals(units, {key: rule}), key))
+    values = np.append(rates, city_rate)
+    bases = np.asarray(bases, dtype=np.float64)[:, None, None]
+    challenges = np.asarray(challenges, dtype=np.float64)[None, :, None]
+
+    scores = score_fn(values[None, None, :], bases, challenges)
+    invalid = challenges < bases if higher_is_better else challenges > bases
+    return np.where(invalid, np.nan, scores)
+
+
+def sweep_complaint(complaints, repeated, challenges, bases, challenge_offsets, base_offsets):
+    """投诉压降得分的参数模拟：在各单位现有挑战值/基准值上叠加统一调整量
+
+    complaints/repeated/challenges/bases 均含全市（最后一项，为各区县之和且不受重复投诉影响），
+    返回形状为 (len(base_offsets), len(challenge_offsets), 单位数) 的得分数组，
+    调整后挑战值大于基准值或小于0的组合记为 NaN。
+    """
+    complaints = np.asarray(complaints)[None, None, :]
+    is_city = np.zeros(complaints.shape[-1], dtype=bool)
+    is_city[-1] = True
+    challenge = np.asarray(challenges)[None, None, :] + np.asarray(challenge_offsets)[None, :, None]
+    base = np.asarray(bases)[None, None, :] + np.asarray(base_offsets)[:, None, None]
+
+    scores = batch_complaint_score(complaints, challenge, base, has_repeated=repeated, is_city=is_city)
+    invalid = (challenge > base) | (challenge < 0)
+    return np.where(invalid, np.nan, scores)
+
+
+def sweep_frame(scores, names, base_values, challenge_values, base_label="基准值", challenge_label="挑战值"):
+    """将 (基准值, 挑战值, 单位) 三维得分数组展开为每个阈值组合一行的表"""
+    base_grid, challenge_grid = np.meshgrid(base_values, challenge_values, indexing="ij")
+    thresholds = pd.DataFrame({base_label: base_grid.ravel(), challenge_label: challenge_grid.ravel()})
+    flat = pd.DataFrame(scores.reshape(-1, scores.shape[-1]), columns=list(names))
+    return pd.concat([thresholds, flat], axis=1)
+
+
+def score_distribution(scores, names):
+    """各单位在全部有效阈值组合下的得分分布"""
+    flat = scores.reshape(-1, scores.shape[-1])
+    # 只统计有有效组合的单位（全部组合无效的单位为 NaN），不依赖进程全局的警告设置
+    valid = ~np.isnan(flat).all(axis=0)
+    quantiles = np.full((5, flat.shape[-1]), np.nan)
+    means = np.full(flat.shape[-1], np.nan)
+    if valid.any():
+        quantiles[:, valid] = np.nanpercentile(flat[:, valid], [0, 25, 50, 75, 100], axis=0)
+        means[valid] = np.nanmean(flat[:, valid], axis=0)
+    return pd.DataFrame({
+        "最低分": quantiles[0],
+        "25%分位": quantiles[1],
+        "中位数": quantiles[2],
+        "75%分位": quantiles[3],
+        "最高分": quantiles[4],
+        "平均分": means,
+    }, index=pd.Index(names, name="区县")).round(2)
@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+
+from assessments import score_inputs
+from scoring import RULES, round2
+
+# --------------------------
+# 目标反推（不依赖 streamlit）
+# 由目标得分反解各区县及全市需要达到的指标值，对所有单位、所有目标得分一次性广播计算
+# --------------------------
+
+# 可反推的指标：指标键 -> (名称, 考核键, 结果表中的指标列, 得分列, 基准值参数, 挑战值参数)
+# downservice 为专线退服管控总分（退服率得分乘以AAA系数），其余为单项得分
+TARGET_METRICS = {
+    "complaint": ("投诉压降", "complaint", "投诉次数", "投诉得分", None, None),
+    "resolve": ("重复故障解决率", "complaint", "解决率(%)", "解决率得分",
+                "resolve_rate_base", "resolve_rate_challenge"),
+    "ontime": ("交付及时率", "delivery", "及时率(%)", "及时率得分", "ontime_base", "ontime_challenge"),
+    "success": ("交付成功率", "delivery", "成功率(%)", "成功率得分", "success_base", "success_challenge"),
+    "downrate": ("专线退服率", "downservice", "退服率(%)", "退服率得分", "downrate_base", "downrate_challenge"),
+    "downservice": ("专线退服管控总分（含AAA系数）", "downservice", "退服率(%)", "总分",
+                    "downrate_base", "downrate_challenge"),
+}
+
+# 比率类指标的取值范围（%）
+RATE_LIMITS = (0.0, 100.0)
+
+
+def target_max_score(metric):
+    """指标目标得分的上限（专线退服管控总分的上限为退服率满分）"""
+    key = "downrate" if metric == "downservice" else metric
+    return RULES[key].max_score
+
+
+def required_rates(metric, targets, base, challenge):
+    """比率类指标得分不低于 targets 所需的值（越高越好为最低值，越低越好为最高值，步长 0.01）
+
+    超出 0~100% 才能达到的为 NaN，targets 不高于 0 时为取值范围的端点（任意取值均可）。
+    """
+    values = RULES[metric].inverse(targets, base, challenge, step=0.01)
+    low, high = RATE_LIMITS
+    outside = np.isfinite(values) & ((values < low) | (values > high))
+    return np.where(outside, np.nan, np.clip(values, low, high))
+
+
+def required_complaints(targets, challenge, base, has_repeated=False, is_city=False):
+    """投诉得分不低于 targets 时最多允许的投诉次数
+
+    有重复投诉的区县（全市除外）投诉得分为0，targets 高于0时为 NaN；
+    需要投诉次数小于0才能达到的同样为 NaN，targets 不高于 0 时为 inf（不限）。
+    """
+    targets = np.asarray(targets, dtype=np.float64)
+    values = RULES["complaint"].inverse(targets, base, challenge, step=1)
+    zeroed = np.logical_and(np.asarray(has_repeated, dtype=bool), ~np.asarray(is_city, dtype=bool))
+    unreachable = (values < 0) | (zeroed & (targets > 0))
+    return np.where(unreachable, np.nan, values)
+
+
+def required_component(targets, factors):
+    """乘以系数并取两位小数后不低于 targets 所需的最低单项得分（步长 0.01），系数为0时为 NaN"""
+    targets = np.asarray(targets, dtype=np.float64)
+    factors = np.asarray(factors, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = np.ceil(np.round((targets - 0.005) / factors * 100, 6)) / 100
+        scores = np.where(round2(scores * factors) >= targets, scores, np.round(scores + 0.01, 2))
+        lower = np.round(scores - 0.01, 2)
+        scores = np.where(round2(lower * factors) >= targets, lower, scores)
+    scores = np.where(factors > 0, scores, np.nan)
+    return np.where(targets <= 0, 0.0, scores)
+
+
+def required_downrate(targets, base, challenge, factors):
+    """专线退服管控总分不低于 targets 时退服率的上限（已计入AAA系数 factors）"""
+    return required_rates("downrate", required_component(targets, factors), base, challenge)
+
+
+def max_aaa_interruptions(targets, downrate_scores, table=None):
+    """退服率得分为 downrate_scores 时，总分不低于 targets 最多允许的AAA中断次数
+
+    逐个次数查系数表计算总分，允许的次数为从0次起连续达标的最大次数；
+    系数表最后一档（cap 次及以上）仍达标时为 inf（不限），0次也达不到时为 NaN。
+    """
+    rule = RULES["aaa"]
+    factors = rule(np.arange(rule.cap + 1), table)
+    targets = np.asarray(targets, dtype=np.float64)[..., None]
+    totals = round2(np.asarray(downrate_scores, dtype=np.float64)[..., None] * factors)
+    allowed = np.cumprod(totals >= targets, axis=-1).sum(axis=-1) - 1.0
+    allowed = np.where(allowed >= rule.cap, np.inf, allowed)
+    return np.where(allowed < 0, np.nan, allowed)
+
+
+def solve_targets(inputs, metric, targets):
+    """按输入字典（格式同 cli.py）反推各区县及全市达到各目标得分所需的指标值
+
+    返回长表，每个单位、每个目标得分一行：当前值、当前得分、所需值（投诉为最多投诉次数，
+    越低越好的比率为上限，越高越好的为下限）、差距（所需值减当前值）及说明；
+    downservice 另有按当前退服率计算的最多AAA中断次数。达不到的所需值为 NaN，不限的为 inf。
+    """
+    _, assessment, value_col, score_col, base_key, challenge_key = TARGET_METRICS[metric]
+    section = inputs[assessment]
+    result_df = score_inputs({assessment: section})[assessment]
+    names = result_df["区县"].tolist()
+    targets = np.asarray(targets, dtype=np.float64)
+
+    current = result_df[value_col].to_numpy(dtype=np.float64)[:, None]
+    grid = np.broadcast_to(targets[None, :], (len(names), len(targets)))
+    is_city = np.array([d == "全市" for d in names])[:, None]
+    extra = {}
+    if metric == "complaint":
+        params = section["params"]
+        repeated = np.array([section["data"].get(d, {}).get("重复投诉", False) for d in names[:-1]] + [False],
+                            dtype=bool)[:, None]
+        required = required_complaints(
+            grid,
+            np.array([params[d]["挑战值"] for d in names])[:, None],
+            np.array([params[d]["基准值"] for d in names])[:, None],
+            has_repeated=repeated, is_city=is_city
+        )
+        blocked = repeated & ~is_city & (grid > 0)
+    elif metric == "downservice":
+        factors = result_df["AAA系数"].to_numpy(dtype=np.float64)[:, None]
+        required = required_downrate(grid, section[base_key], section[challenge_key], factors)
+        extra["最多AAA中断次数"] = max_aaa_interruptions(
+            grid, result_df["退服率得分"].to_numpy(dtype=np.float64)[:, None], section["aaa_factors"]
+        )
+        blocked = (factors <= 0) & (grid > 0)
+    else:
+        required = required_rates(metric, grid, section[base_key], section[challenge_key])
+        blocked = np.zeros_like(grid, dtype=bool)
+
+    reasons = np.select(
+        [grid > target_max_score(metric), blocked & (metric == "complaint"), blocked, np.isnan(required),
+         np.isinf(required)],
+        ["目标超过满分", "有重复投诉，投诉得分为0", "AAA系数为0，总分为0", "取值范围内无法达到", "不限"],
+        default=""
+    )
+    with np.errstate(invalid="ignore"):
+        gap = np.round(required - current, 2)
+    return pd.DataFrame({
+        "区县": np.repeat(names, len(targets)),
+        "目标得分": grid.ravel(),
+        "当前值": np.broadcast_to(current, grid.shape).ravel(),
+        "当前得分": np.repeat(result_df[score_col].to_numpy(dtype=np.float64), len(targets)),
+        "所需值": required.ravel(),
+        "差距": gap.ravel(),
+        **{column: values.ravel() for column, values in extra.items()},
+        "说明": reasons.ravel(),
+    })
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# 测试直接导入仓库根目录下的模块（与 benchmarks 相同，仓库不是安装包）；
+# benchmarks 目录中的逐条评分函数（scalar_reference.py）和随机输入（bench_server.py）作为对照
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+sys.path.insert(0, ROOT)
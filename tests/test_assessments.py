@@ -0,0 +1,30 @@
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+from assessments import round_half_up2, score_inputs
+
+
+@pytest.mark.parametrize("rates, baseline, expected", [
+    ([90.00, 90.01], 90.00, 90.01),
+    ([1.00, 1.01], 1.00, 1.01),
+    ([95.12, 95.13], 95.12, 95.13),
+])
+def test_city_rate_rounds_ties_up(rates, baseline, expected):
+    # 平均值恰为 .xx5：早期版本的浮点 round 取到下方，精确四舍五入进位
+    assert round(np.mean(rates), 2) == baseline
+    assert round_half_up2(sum(Fraction(str(r)) for r in rates) / len(rates)) == expected
+    inputs = {"delivery": {
+        "ontime_base": 94, "ontime_challenge": 96, "success_base": 90, "success_challenge": 95,
+        "data": {f"区县{i}": {"及时率(%)": rate, "成功率(%)": rate} for i, rate in enumerate(rates)},
+    }}
+    city = score_inputs(inputs)["delivery"].iloc[-1]
+    assert city["及时率(%)"] == city["成功率(%)"] == expected
+
+
+def test_integer_rounding_matches_fraction():
+    values = np.array([9000 + 9001, 199, 2 * 9512 + 2 * 9513])
+    weights = np.array([2, 2, 4])
+    expected = [round_half_up2(Fraction(int(v), int(w)) / 100) for v, w in zip(values, weights)]
+    assert list(round_half_up2(values, weights)) == expected
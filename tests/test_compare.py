@@ -0,0 +1,20 @@
+from compare import compare
+
+
+def results(**measurements):
+    return {"suite": "server", "results": [{"path": "/score", **measurements}]}
+
+
+def test_lower_is_better_regression():
+    (_, _, _, ratio, regressed), = compare(results(seconds=1.0), results(seconds=1.5), 1.2)
+    assert ratio == 1.5 and regressed
+    (_, _, _, ratio, regressed), = compare(results(seconds=1.5), results(seconds=1.0), 1.2)
+    assert ratio < 1 and not regressed
+
+
+def test_throughput_regression_is_inverted():
+    old, new = results(requests_per_second=1000.0), results(requests_per_second=500.0)
+    (_, before, after, ratio, regressed), = compare(old, new, 1.2, "requests_per_second")
+    assert (before, after, ratio, regressed) == (1000.0, 500.0, 2.0, True)
+    (_, _, _, ratio, regressed), = compare(new, old, 1.2, "requests_per_second")
+    assert ratio == 0.5 and not regressed
@@ -0,0 +1,29 @@
+import pandas as pd
+
+from complaints import detect_repeats, ticket_schema
+from schema import compact_frame
+
+
+def mixed_format_tickets():
+    return pd.DataFrame({
+        "区县": ["东区", "东区", "东区", "西区", "西区"],
+        "电路编号": ["C1", "C1", "C1", "C2", "C2"],
+        "受理时间": ["2024-05-01 08:00:00", "2024/05/10 10:00", "5/20/2024 9:30", "2024-05-02", "2024/06/30 08:00"],
+        "是否解决": ["是", "否", "是", "是", "是"],
+    }, dtype="string")
+
+
+def test_mixed_time_formats_are_parsed():
+    """格式与第一个取值不同的受理时间同样参与重复故障判定"""
+    summary, detail = detect_repeats(mixed_format_tickets(), resolved_col="是否解决")
+    assert summary["重复故障数"].to_dict() == {"东区": 2, "西区": 0}
+    assert summary.at["东区", "重复故障解决率(%)"] == 50.0
+    assert detail.to_dict("records") == [{"区县": "东区", "电路": "C1", "重复次数": 2}]
+
+
+def test_string_and_compact_columns_agree():
+    tickets = mixed_format_tickets()
+    compact = compact_frame(tickets, ticket_schema(resolved_col="是否解决"))
+    for left, right in zip(detect_repeats(tickets, resolved_col="是否解决"),
+                           detect_repeats(compact, resolved_col="是否解决")):
+        pd.testing.assert_frame_equal(left, right, check_index_type=False, check_dtype=False)
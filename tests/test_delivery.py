@@ -0,0 +1,34 @@
+import pandas as pd
+
+from delivery import order_schema, summarize_delivery
+from schema import compact_frame
+
+
+def test_mixed_time_formats_are_parsed():
+    """同一列中格式不同的时间都能解析，不会因与第一个取值格式不同而变为缺失、漏计工单"""
+    orders = pd.DataFrame({
+        "区县": ["东区", "东区", "西区", "西区"],
+        "创建时间": ["2024-05-01 08:00:00", "2024/05/03 10:00", "2024-05-06", "2024/5/7 9:00"],
+        "承诺时间": ["", "", "", ""],
+        "完成时间": ["2024-05-02 08:00:00", "2024/05/04 09:30", "2024/05/20 10:00", ""],
+        "工单状态": ["竣工", "竣工", "退单", "处理中"],
+    })
+    summary = summarize_delivery(orders, as_of="2024-06-01")
+    assert summary["工单数"].to_dict() == {"东区": 2, "西区": 2}
+    assert summary["应完成工单数"].to_dict() == {"东区": 2, "西区": 2}
+    assert summary["按时完成工单数"].to_dict() == {"东区": 2, "西区": 0}
+    assert summary["及时率(%)"].to_dict() == {"东区": 100.0, "西区": 0.0}
+    assert summary["成功率(%)"].to_dict() == {"东区": 100.0, "西区": 0.0}
+
+
+def test_string_and_compact_columns_agree():
+    """字符串列与已转换的紧凑列（上传缓存、监控目录）汇总结果相同"""
+    orders = pd.DataFrame({
+        "区县": ["东区", "西区", "东区"],
+        "创建时间": ["2024-05-01 08:00:00", "2024/05/03 10:00", "5/6/2024"],
+        "承诺时间": ["", "2024-05-05", ""],
+        "完成时间": ["2024/05/02 18:00", "", "2024-05-20 10:00:00"],
+        "工单状态": ["竣工", "处理中", "竣工"],
+    }, dtype="string")
+    pd.testing.assert_frame_equal(summarize_delivery(orders, as_of="2024-06-01"),
+                                  summarize_delivery(compact_frame(orders, order_schema()), as_of="2024-06-01"))
@@ -0,0 +1,86 @@
+import copy
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from assessments import (
+    COMPLAINT_ROLLUP,
+    DELIVERY_ROLLUP,
+    DOWNSERVICE_ROLLUP,
+    complaint_city_row,
+    complaint_units,
+    delivery_city_row,
+    downservice_city_row,
+    score_inputs,
+    sum_totals,
+)
+from bench_server import sample_inputs
+from hierarchy import OrgTree, load_org_tree, score_tree_inputs
+
+# 三级组织树：全市 -> 片区 -> 区县
+THREE_LEVELS = OrgTree(["全市", "片区", "区县"], {
+    "name": "全市",
+    "children": [
+        {"name": "城区片区", "children": [{"name": "东区"}, {"name": "西区"}, {"name": "高新"}]},
+        {"name": "郊县片区", "children": [{"name": "仁和"}, {"name": "米易"}, {"name": "盐边"}]},
+    ],
+})
+
+
+def weighted_inputs(seed):
+    """随机输入，部分区县附带汇总权重（平均值按权重加权）"""
+    rng = np.random.default_rng(seed)
+    inputs = sample_inputs(seed)
+    for key, weight in (("complaint", "重复故障数"), ("delivery", "应完成工单数"), ("downservice", "专线总数")):
+        if rng.random() < 0.5:
+            for unit in inputs[key]["data"].values():
+                unit[weight] = int(rng.integers(0, 40))
+    inputs["complaint"]["params"].update({
+        "城区片区": {"挑战值": 1, "基准值": 6}, "郊县片区": {"挑战值": 0, "基准值": 5},
+    })
+    return inputs
+
+
+def city_row(key, section, units):
+    """按 *_city_row 由 units 的合计计算汇总行"""
+    if key == "complaint":
+        return complaint_city_row(sum_totals(units, COMPLAINT_ROLLUP), section["resolve_rate_base"],
+                                  section["resolve_rate_challenge"], section["params"]["全市"])
+    if key == "delivery":
+        return delivery_city_row(sum_totals(units, DELIVERY_ROLLUP), section["ontime_base"],
+                                 section["ontime_challenge"], section["success_base"], section["success_challenge"])
+    return downservice_city_row(sum_totals(units, DOWNSERVICE_ROLLUP), section["downrate_base"],
+                                section["downrate_challenge"], dict(enumerate(section["aaa_factors"])))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_two_level_tree_equals_city_row(seed):
+    """区县—全市两级组织树的全市行与页面（score_inputs）的全市行相同"""
+    inputs = weighted_inputs(seed)
+    expected = score_inputs(inputs)
+    results = score_tree_inputs(load_org_tree(), inputs)
+    for key, result_df in results.items():
+        city = result_df[result_df["单位"] == "全市"].drop(columns=["层级", "上级", "单位"]).reset_index(drop=True)
+        pd.testing.assert_frame_equal(city, expected[key].iloc[[-1]].drop(columns="区县").reset_index(drop=True),
+                                      check_dtype=False)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_parent_rows_equal_city_row_of_leaves(seed):
+    """三级组织树中每个上级单位的得分行等于由其全部下级区县按 *_city_row 计算的汇总行"""
+    inputs = weighted_inputs(seed)
+    results = score_tree_inputs(THREE_LEVELS, inputs)
+    leaves = {"城区片区": ["东区", "西区", "高新"], "郊县片区": ["仁和", "米易", "盐边"]}
+    leaves["全市"] = leaves["城区片区"] + leaves["郊县片区"]
+    for key, result_df in results.items():
+        section = copy.deepcopy(inputs[key])
+        data = complaint_units(section["params"], section["data"]) if key == "complaint" else section["data"]
+        for parent, names in leaves.items():
+            if key == "complaint":
+                section["params"]["全市"] = inputs[key]["params"][parent]
+            expected = city_row(key, section, [data[name] for name in names])
+            row = result_df.set_index("单位").loc[parent]
+            for column, value in expected.items():
+                if column != "区县":
+                    assert row[column] == value, (key, parent, column)
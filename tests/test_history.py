@@ -0,0 +1,36 @@
+import pandas as pd
+import pytest
+
+from history import normalize_period, query_trend, record_run, trend_changes
+
+
+def result_table(score):
+    return pd.DataFrame({"区县": ["东区", "全市"], "总分": [score, score + 1]})
+
+
+@pytest.mark.parametrize("period, expected", [("2024-5", "2024-05"), ("2024-05", "2024-05"), ("2024/5", "2024-05")])
+def test_normalize_period(period, expected):
+    assert normalize_period(period) == expected
+
+
+@pytest.mark.parametrize("period", ["", "2024-13", "abc", None])
+def test_normalize_period_rejects_invalid(period):
+    with pytest.raises(ValueError):
+        normalize_period(period)
+
+
+def test_unpadded_period_round_trip(tmp_path):
+    """以 "2024-5" 写入的结果按 YYYY-MM 存储，与 "2024-10" 按月份排序，环比、同比可正常计算"""
+    db = str(tmp_path / "history.sqlite3")
+    record_run(db, "2024-5", "complaint", result_table(2.0))
+    record_run(db, "2024-10", "complaint", result_table(3.0))
+    record_run(db, "2023-5", "complaint", result_table(1.5))
+
+    trend = query_trend(db, "complaint:总分")
+    assert list(trend.index) == ["2023-05", "2024-05", "2024-10"]
+    assert query_trend(db, "complaint:总分", start="2024-5", end="2024-9").index.tolist() == ["2024-05"]
+
+    changes = trend_changes(trend)
+    assert list(changes.index) == ["2023-05", "2024-05", "2024-10"]
+    assert changes.loc["2024-05", ("东区", "同比")] == 0.5
+    assert pd.isna(changes.loc["2024-10", ("东区", "环比")])  # 2024-09 没有记录
@@ -0,0 +1,69 @@
+import copy
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from assessments import complaint_units, score_inputs
+from bench_server import DISTRICTS, sample_inputs
+from incremental import new_table
+
+# 汇总权重键（提供时全市平均值按权重加权）
+WEIGHTS = {"complaint": "重复故障数", "delivery": "应完成工单数", "downservice": "专线总数"}
+
+
+def table_args(key, section):
+    """与页面相同的增量计算参数：(区县输入, 共用阈值, 全市参数...)"""
+    if key == "complaint":
+        shared = (section["resolve_rate_base"], section["resolve_rate_challenge"])
+        return complaint_units(section["params"], section["data"]), shared, section["params"]["全市"]
+    if key == "delivery":
+        shared = tuple(section[k] for k in ("ontime_base", "ontime_challenge", "success_base", "success_challenge"))
+        return section["data"], shared
+    shared = (section["downrate_base"], section["downrate_challenge"], dict(enumerate(section["aaa_factors"])))
+    return section["data"], shared
+
+
+def edit(key, section, rng, other):
+    """随机修改一项输入：改一个区县、删除或恢复区县、调整区县顺序、修改共用阈值"""
+    action = rng.choice(["change", "change", "change", "remove", "restore", "reorder", "shared"])
+    data = section["data"]
+    if action == "change":
+        district = str(rng.choice(list(data)))
+        data[district] = copy.deepcopy(other["data"][district])
+        if rng.random() < 0.5:
+            data[district][WEIGHTS[key]] = int(rng.integers(0, 50))
+    elif action == "remove" and len(data) > 1:
+        del data[str(rng.choice(list(data)))]
+    elif action == "restore":
+        missing = [d for d in DISTRICTS if d not in data]
+        if missing:
+            data[missing[0]] = copy.deepcopy(other["data"][missing[0]])
+    elif action == "reorder":
+        names = list(data)
+        section["data"] = {d: data[d] for d in rng.permutation(names)}
+    elif action == "shared":
+        for k in section:
+            if k not in ("data", "params", "aaa_factors"):
+                section[k] = other[k]
+
+
+@pytest.mark.parametrize("key", ["complaint", "delivery", "downservice"])
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_equals_full_recompute(key, seed):
+    rng = np.random.default_rng(seed)
+    section = copy.deepcopy(sample_inputs(seed)[key])
+    table, adopted = new_table(key), new_table(key)
+    for step in range(40):
+        other = sample_inputs(int(rng.integers(0, 1000)))[key]
+        edit(key, section, rng, other)
+        expected = score_inputs({key: section})[key]
+        result_df = table.update(*table_args(key, copy.deepcopy(section)))
+        pd.testing.assert_frame_equal(result_df, expected, check_dtype=False)
+
+        # 采用其他会话已算出的结果（adopt）后继续增量更新，同样与整表重算一致
+        if step % 5 == 0:
+            adopted.adopt(*table_args(key, copy.deepcopy(section))[:2], expected)
+        else:
+            pd.testing.assert_frame_equal(adopted.update(*table_args(key, copy.deepcopy(section))), expected,
+                                          check_dtype=False)
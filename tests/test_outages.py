@@ -0,0 +1,55 @@
+import datetime
+
+import pandas as pd
+
+from exports import load_export
+from outages import event_schema, summarize_outages
+from schema import compact_frame
+
+PERIOD = ("2024-05-01", "2024-06-01")
+
+
+def events(end_times):
+    return pd.DataFrame({
+        "区县": ["东区", "东区", "西区"],
+        "电路编号": ["C1", "C2", "C3"],
+        "开始时间": ["2024-05-01 08:00:00", "2024/05/03 10:00", "5/10/2024 00:00"],
+        "结束时间": end_times,
+        "是否AAA": ["是", "否", "否"],
+    }, dtype="string")
+
+
+def test_mixed_time_formats_are_parsed():
+    summary = summarize_outages(events(["2024-05-01 10:00:00", "2024/05/03 13:00", "5/10/2024 06:00"]), *PERIOD)
+    assert summary["退服时长(小时)"].to_dict() == {"东区": 5.0, "西区": 6.0}
+    assert summary["退服次数"].to_dict() == {"东区": 2, "西区": 1}
+
+
+def test_only_blank_end_times_run_to_period_end():
+    """结束时间为空的事件按考核期末计算；无法解析的结束时间不能当作未结束，该事件不计入"""
+    summary = summarize_outages(events(["2024-05-01 10:00:00", "", "不是时间"]), *PERIOD)
+    # C2 自 5月3日10:00 起未结束，截至考核期末 6月1日 0:00 共 686 小时；C3 不计入
+    assert summary["退服时长(小时)"].to_dict() == {"东区": 688.0}
+    assert summary["退服次数"].to_dict() == {"东区": 2}
+
+
+def test_string_and_compact_columns_agree():
+    raw = events(["2024-05-01 10:00:00", " ", "不是时间"])
+    compact = compact_frame(raw, event_schema())
+    assert compact.attrs["unparsed"] == {"结束时间": 1}
+    pd.testing.assert_frame_equal(summarize_outages(raw, *PERIOD), summarize_outages(compact, *PERIOD))
+
+
+def test_blank_excel_end_cell_is_open(tmp_path):
+    """Excel 时间列中的空单元格同样按未结束处理（不因整列为时间而变为无法区分的缺失）"""
+    path = tmp_path / "退服事件.xlsx"
+    pd.DataFrame({
+        "区县": ["东区", "西区"], "电路编号": ["C1", "C2"],
+        "开始时间": [datetime.datetime(2024, 5, 31, 12), datetime.datetime(2024, 5, 2)],
+        "结束时间": [None, datetime.datetime(2024, 5, 2, 3)],
+        "是否AAA": ["否", "否"],
+    }).to_excel(path, index=False)
+    frame = load_export(str(path))
+    for records in (frame, compact_frame(frame, event_schema())):
+        summary = summarize_outages(records, *PERIOD)
+        assert summary["退服时长(小时)"].to_dict() == {"东区": 12.0, "西区": 3.0}
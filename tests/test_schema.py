@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+
+from complaints import detect_repeats, ticket_schema
+from delivery import order_schema, summarize_delivery
+from exports import ExportCache, load_export
+from outages import event_schema, summarize_outages
+from schema import as_time, compact_frame, unparsed_message
+
+MIXED = ["2024-05-01 08:00:00", "2024/05/03 10:00", "5/6/2024", "", "不是时间"]
+
+
+@pytest.mark.parametrize("dtype", ["string[pyarrow]", "string[python]", object])
+def test_as_time_parses_each_value(dtype):
+    converted = as_time(pd.Series(MIXED, dtype=dtype))
+    expected = [pd.Timestamp("2024-05-01 08:00"), pd.Timestamp("2024-05-03 10:00"), pd.Timestamp("2024-05-06")]
+    assert list(converted[:3]) == expected and converted[3:].isna().all()
+    frame = compact_frame(pd.DataFrame({"受理时间": pd.Series(MIXED, dtype=dtype)}), {"受理时间": as_time})
+    assert frame.attrs["unparsed"] == {"受理时间": 1}
+    assert "1 个取值无法解析" in unparsed_message(frame)
+
+
+# 各类记录：(导出文件内容, 紧凑列类型, 汇总函数)
+KINDS = {
+    "tickets": (
+        {"区县": ["东区", "东区", "西区", "西区"], "电路编号": ["C1", "C1", "C2", "C2"],
+         "受理时间": ["2024-05-01 08:00:00", "2024/05/10 10:00", "5/2/2024", "坏值"], "是否解决": ["是", "否", "是", "是"]},
+        ticket_schema(resolved_col="是否解决"),
+        lambda frame: detect_repeats(frame, resolved_col="是否解决")[0],
+    ),
+    "orders": (
+        {"区县": ["东区", "东区", "西区", "西区"],
+         "创建时间": ["2024-05-01 08:00:00", "2024/05/03 10:00", "5/6/2024", "2024-05-07"],
+         "承诺时间": ["", "", "2024/05/08", ""], "完成时间": ["2024/05/02 08:00", "", "2024-05-20 10:00:00", "坏值"],
+         "工单状态": ["竣工", "处理中", "竣工", "退单"]},
+        order_schema(),
+        lambda frame: summarize_delivery(frame, as_of="2024-06-01"),
+    ),
+    "events": (
+        {"区县": ["东区", "东区", "西区"], "电路编号": ["C1", "C2", "C3"],
+         "开始时间": ["2024-05-01 08:00:00", "2024/05/03 10:00", "5/10/2024 00:00"],
+         "结束时间": ["2024/05/01 10:00", "", "坏值"], "是否AAA": ["是", "否", "否"]},
+        event_schema(),
+        lambda frame: summarize_outages(frame, "2024-05-01", "2024-06-01"),
+    ),
+}
+
+
+@pytest.mark.parametrize("kind", sorted(KINDS))
+def test_cached_and_uncached_paths_agree(kind, tmp_path):
+    """同一导出文件直接读取（字符串列）与经上传缓存转为紧凑列后汇总的结果相同"""
+    content, schema, summarize = KINDS[kind]
+    path = tmp_path / f"{kind}.csv"
+    pd.DataFrame(content).to_csv(path, index=False)
+    columns = [column for column in schema if column]
+
+    uncached = summarize(load_export(str(path), columns=columns))
+    cached = summarize(ExportCache(str(tmp_path / "cache")).load(str(path), columns=columns, schema=schema))
+    pd.testing.assert_frame_equal(uncached, cached, check_index_type=False, check_dtype=False)
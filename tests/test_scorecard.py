@@ -0,0 +1,62 @@
+import copy
+
+import pandas as pd
+import pytest
+
+from assessments import ASSESSMENTS, score_inputs
+from bench_server import DISTRICTS, sample_inputs
+from scorecard import WATCHED_SUMMARIES, active_summary, add_import_weights, score_card
+
+SUMMARIES = {
+    "complaint_repeat_summary": pd.DataFrame({"重复故障数": range(1, len(DISTRICTS) + 1)}, index=DISTRICTS),
+    "delivery_summary": pd.DataFrame({"应完成工单数": [40] + [1] * (len(DISTRICTS) - 1),
+                                      "已结束工单数": [1] * (len(DISTRICTS) - 1) + [40]}, index=DISTRICTS),
+    "outage_summary": pd.DataFrame({"专线总数": [500] + [10] * (len(DISTRICTS) - 1)}, index=DISTRICTS),
+}
+UPLOADS = {"complaint_repeat_summary": "complaint_ticket_file", "delivery_summary": "delivery_order_file",
+           "outage_summary": "outage_event_file"}
+
+
+def session(source):
+    """会话状态：汇总表来自上传控件中的文件、监控目录，或上传的文件已移除"""
+    state = dict(SUMMARIES)
+    if source == "upload":
+        state.update({upload_key: object() for upload_key in UPLOADS.values()})
+    elif source == "watch":
+        state[WATCHED_SUMMARIES] = set(SUMMARIES)
+    return state
+
+
+@pytest.mark.parametrize("source", ["upload", "watch", "removed"])
+def test_active_summary(source):
+    for key in SUMMARIES:
+        assert (active_summary(session(source), key) is None) == (source == "removed")
+
+
+@pytest.mark.parametrize("source", ["upload", "watch", "removed"])
+def test_scorecard_city_row_matches_tabs(source):
+    state = session(source)
+    # 各标签页：每项考核按本页的导入汇总表加权后单独计算
+    tab_city = {}
+    for assessment in ASSESSMENTS:
+        inputs = copy.deepcopy(sample_inputs(3))
+        add_import_weights(state, assessment, inputs[assessment]["data"])
+        tab_city[assessment] = score_inputs({assessment: inputs[assessment]})[assessment].iloc[-1]
+    # 计分卡/导出：三项考核一起加权
+    inputs = sample_inputs(3)
+    for assessment in ASSESSMENTS:
+        add_import_weights(state, assessment, inputs[assessment]["data"])
+    card_city = score_card(inputs).iloc[-1]
+
+    assert card_city["区县"] == "全市"
+    for assessment, name in ASSESSMENTS.items():
+        assert card_city[name] == tab_city[assessment]["总分"]
+    for column, assessment in (("解决率得分", "complaint"), ("及时率得分", "delivery"),
+                               ("成功率得分", "delivery"), ("退服率得分", "downservice")):
+        assert card_city[column] == tab_city[assessment][column]
+
+    unweighted = score_inputs(sample_inputs(3))
+    rates = [("complaint", "解决率(%)"), ("delivery", "及时率(%)"), ("delivery", "成功率(%)"),
+             ("downservice", "退服率(%)")]
+    weighted = any(tab_city[a][column] != unweighted[a].iloc[-1][column] for a, column in rates)
+    assert weighted == (source != "removed")
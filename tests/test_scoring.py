@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+import scalar_reference as ref
+from scoring import batch_aaa_factor, batch_complaint_score, score_metric
+
+# 阈值组合：含基准值等于挑战值、挑战值不优于基准值的情况
+RATE_THRESHOLDS = [(85, 100), (90, 95), (94, 96), (95, 95), (90.5, 97.25)]
+DOWNRATE_THRESHOLDS = [(4, 3.5), (5, 2), (3, 3), (4.25, 1.75)]
+RATES = np.round(np.arange(7000, 10001) / 100, 2)          # 70.00 ~ 100.00，步长 0.01
+DOWNRATES = np.round(np.arange(0, 801) / 100, 2)            # 0.00 ~ 8.00
+
+SCALAR_RATE_RULES = {
+    "resolve": ref.resolve_rate_score,
+    "ontime": ref.ontime_score,
+    "success": ref.success_score,
+}
+
+
+@pytest.mark.parametrize("key", sorted(SCALAR_RATE_RULES))
+@pytest.mark.parametrize("base, challenge", RATE_THRESHOLDS)
+def test_rate_scores_match_scalar(key, base, challenge):
+    expected = [SCALAR_RATE_RULES[key](float(rate), base, challenge) for rate in RATES]
+    np.testing.assert_array_equal(score_metric(key, RATES, base, challenge), expected)
+
+
+@pytest.mark.parametrize("base, challenge", DOWNRATE_THRESHOLDS)
+def test_downrate_scores_match_scalar(base, challenge):
+    expected = [ref.downrate_score(float(rate), base, challenge) for rate in DOWNRATES]
+    np.testing.assert_array_equal(score_metric("downrate", DOWNRATES, base, challenge), expected)
+
+
+def test_complaint_scores_match_scalar():
+    complaints, challenge, base = np.meshgrid(np.arange(0, 16), np.arange(0, 6), np.arange(0, 13), indexing="ij")
+    complaints, challenge, base = complaints.ravel(), challenge.ravel(), base.ravel()
+    for repeated in (False, True):
+        for is_city in (False, True):
+            expected = [ref.complaint_score(int(c), int(ch), int(b), has_repeated=repeated, is_city=is_city)
+                        for c, ch, b in zip(complaints, challenge, base)]
+            scores = batch_complaint_score(complaints, challenge, base, has_repeated=repeated, is_city=is_city)
+            np.testing.assert_array_equal(scores, expected)
+
+
+def test_aaa_factor_matches_scalar():
+    table = [1.0, 0.8, 0.6, 0.0]
+    counts = np.arange(0, 10)
+    expected = [ref.aaa_factor(int(count), table) for count in counts]
+    np.testing.assert_array_equal(batch_aaa_factor(counts, table), expected)
@@ -0,0 +1,108 @@
+import http.client
+import json
+import socket
+import threading
+
+import pytest
+
+import server
+from bench_server import sample_inputs
+
+
+@pytest.fixture(scope="module")
+def address():
+    httpd = server.ScoreServer(("127.0.0.1", 0))
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd.server_address[:2]
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def post(address, path, body):
+    """发送 POST 请求，返回 (状态码, 响应 JSON)；body 为字节串时原样发送"""
+    if not isinstance(body, bytes):
+        body = json.dumps(body, ensure_ascii=False).encode("utf-8")
+    connection = http.client.HTTPConnection(*address, timeout=10)
+    try:
+        connection.request("POST", path, body, {"Content-Type": "application/json"})
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+def raw_request(address, head):
+    """发送原始请求头（不带请求体），返回状态行；服务端须回应并关闭连接，不能等待请求体"""
+    with socket.create_connection(address, timeout=10) as sock:
+        sock.sendall(head)
+        data = b""
+        while chunk := sock.recv(65536):
+            data += chunk
+    return data.split(b"\r\n", 1)[0].decode()
+
+
+def test_score_and_metrics(address):
+    status, body = post(address, "/score", sample_inputs(0))
+    assert status == 200 and set(body) == {"complaint", "delivery", "downservice"}
+    status, body = post(address, "/metrics", {"metric": "aaa", "values": [0, 1, 5]})
+    assert (status, body) == (200, {"scores": [1.0, 0.8, 0.0]})
+
+
+@pytest.mark.parametrize("path, body", [
+    ("/score", b"{not json"),
+    ("/score", b"[1, 2]"),
+    ("/score", b'{"delivery": {"ontime_base": 1e400}}'),
+    ("/score", b'{"delivery": {"ontime_base": NaN}}'),
+    ("/score", {"complaint": "x"}),
+    ("/score", {"delivery": {**sample_inputs(0)["delivery"], "data": [1]}}),
+    ("/score", {"downservice": {**sample_inputs(0)["downservice"], "data": []}}),
+    ("/score", {"downservice": {**sample_inputs(0)["downservice"], "aaa_factors": 1}}),
+    ("/score", {"delivery": {"data": {}}}),
+    ("/score", {"complaint": {**sample_inputs(0)["complaint"], "params": {"东区": {"挑战值": 10 ** 30}}}}),
+    ("/batch", {"items": 1}),
+    ("/metrics", {"metric": "unknown", "values": [1]}),
+    ("/metrics", {"metric": "ontime", "values": [95]}),
+    ("/metrics", {"metric": "ontime", "values": [95, 96], "base": [94, 94, 94], "challenge": 96}),
+    ("/metrics", {"metric": "ontime", "values": "x", "base": 94, "challenge": 96}),
+    ("/metrics", {"metric": "aaa", "values": [-1]}),
+    ("/metrics", {"metric": "aaa", "values": [1.5]}),
+    ("/metrics", {"metric": "aaa", "values": [1], "table": [1.0]}),
+])
+def test_bad_input_returns_400(address, path, body):
+    status, payload = post(address, path, body)
+    assert status == 400
+    assert payload["error"]
+
+
+def test_batch_reports_item_errors(address):
+    status, body = post(address, "/batch", {"items": [
+        {"id": "好", "inputs": sample_inputs(0)},
+        {"id": "坏", "inputs": {"delivery": {"data": []}}},
+    ]})
+    assert status == 200
+    assert "results" in body["results"][0] and "error" in body["results"][1]
+
+
+@pytest.mark.parametrize("length", ["-1", "abc", "1.5"])
+def test_invalid_content_length_returns_400(address, length):
+    head = f"POST /score HTTP/1.1\r\nHost: x\r\nContent-Length: {length}\r\n\r\n".encode()
+    assert raw_request(address, head).endswith("400 Bad Request")
+
+
+def test_oversized_body_returns_413(address):
+    head = f"POST /score HTTP/1.1\r\nHost: x\r\nContent-Length: {server.MAX_BODY_BYTES + 1}\r\n\r\n".encode()
+    assert " 413 " in raw_request(address, head)
+
+
+def test_unknown_path_returns_404(address):
+    assert post(address, "/nothing", {})[0] == 404
+
+
+def test_internal_error_returns_500(address, monkeypatch):
+    def broken(body):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(server, "score_metrics", broken)
+    status, body = post(address, "/metrics", {"metric": "aaa", "values": [1]})
+    assert status == 500 and body["error"]
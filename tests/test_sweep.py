@@ -0,0 +1,46 @@
+import warnings
+
+import numpy as np
+
+from assessments import score_inputs
+from bench_server import DISTRICTS, sample_inputs
+from sweep import RATE_ROLLUPS, score_distribution, sweep_rate_metric
+
+# 指标键 -> (所属考核, 基准值键, 挑战值键, 结果表中的比率列, 得分列)
+METRICS = {
+    "resolve": ("complaint", "resolve_rate_base", "resolve_rate_challenge", "解决率(%)", "解决率得分"),
+    "ontime": ("delivery", "ontime_base", "ontime_challenge", "及时率(%)", "及时率得分"),
+    "success": ("delivery", "success_base", "success_challenge", "成功率(%)", "成功率得分"),
+    "downrate": ("downservice", "downrate_base", "downrate_challenge", "退服率(%)", "退服率得分"),
+}
+
+
+def weighted_sample():
+    inputs = sample_inputs(5)
+    for i, district in enumerate(DISTRICTS):
+        inputs["complaint"]["data"][district]["重复故障数"] = i * 3
+        inputs["delivery"]["data"][district].update({"应完成工单数": 50 if i == 0 else 2, "已结束工单数": i + 1})
+        inputs["downservice"]["data"][district]["专线总数"] = 400 if i == 1 else 20
+    return inputs
+
+
+def test_city_column_matches_scored_table():
+    inputs = weighted_sample()
+    results = score_inputs(inputs)
+    for metric, (assessment, base_key, challenge_key, rate_column, score_column) in METRICS.items():
+        section = inputs[assessment]
+        scores = sweep_rate_metric(metric, section["data"].values(), [section[base_key]], [section[challenge_key]])
+        city = results[assessment].iloc[-1]
+        assert scores[0, 0, -1] == city[score_column]
+        # 全市值按权重加权，不是各区县的简单平均
+        key = RATE_ROLLUPS[metric][0]
+        assert city[rate_column] != round(np.mean([unit[key] for unit in section["data"].values()]), 2)
+
+
+def test_score_distribution_without_warnings():
+    scores = np.array([[[1.0, np.nan], [3.0, np.nan]]])
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        distribution = score_distribution(scores, ["城区", "全市"])
+    assert distribution.loc["城区", "中位数"] == 2.0
+    assert distribution.loc["全市"].isna().all()
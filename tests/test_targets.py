@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from scoring import RULES
+
+RATE_THRESHOLDS = [(85, 100), (90, 95), (94, 96), (95, 95), (90.5, 97.25)]
+DOWNRATE_THRESHOLDS = [(4, 3.5), (5, 2), (3, 3), (4.25, 1.75)]
+
+
+@pytest.mark.parametrize("key", ["resolve", "ontime", "success", "downrate", "complaint"])
+def test_inverse_round_trip(key):
+    """反解的指标值达到目标得分，再差一个步长即达不到（反解值是最宽松的取值）"""
+    rule = RULES[key]
+    step = 1 if key == "complaint" else 0.01
+    thresholds = [(12, 3), (4, 0), (5, 5)] if key == "complaint" else (
+        DOWNRATE_THRESHOLDS if key == "downrate" else RATE_THRESHOLDS)
+    targets = np.round(np.arange(1, int(rule.max_score * 100) + 1) / 100, 2)
+    sign = 1.0 if rule.higher_is_better else -1.0
+    for base, challenge in thresholds:
+        values = rule.inverse(targets, base, challenge, step=step)
+        assert np.isfinite(values).all()
+        assert (rule(values, base, challenge) >= targets).all()
+        worse = np.round(values - sign * step, 2)
+        assert (rule(worse, base, challenge) < targets).all()
+
+    # 高于满分的目标达不到，不高于 0 的目标取值不限
+    assert np.isnan(rule.inverse(rule.max_score + 0.01, 90, 95, step=step))
+    assert rule.inverse(0, 90, 95, step=step) == -sign * np.inf
@@ -0,0 +1,178 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from watcher import WATCH_KINDS, FolderWatcher, concat_rows, parse_export, summarize_period
+
+DISTRICTS = ["城区", "东区", "西区", "南区"]
+NOW = pd.Timestamp("2026-03-20 12:00")
+
+
+def random_times(rng, size, start="2026-02-01", days=58):
+    offsets = rng.integers(0, days * 86_400, size)
+    return pd.Timestamp(start) + pd.to_timedelta(offsets, unit="s")
+
+
+def tickets_frame(rng, size):
+    return pd.DataFrame({
+        "区县": rng.choice(DISTRICTS, size),
+        "电路编号": [f"C{i:03d}" for i in rng.integers(0, 40, size)],
+        "受理时间": random_times(rng, size).strftime("%Y-%m-%d %H:%M:%S"),
+        "是否解决": rng.choice(["是", "否"], size),
+    })
+
+
+def orders_frame(rng, size):
+    created = random_times(rng, size)
+    completed = created + pd.to_timedelta(rng.integers(1, 10 * 86_400, size), unit="s")
+    completed = pd.Series(completed.strftime("%Y-%m-%d %H:%M:%S")).where(rng.random(size) < 0.7, "")
+    return pd.DataFrame({
+        "区县": rng.choice(DISTRICTS, size),
+        "创建时间": created.strftime("%Y-%m-%d %H:%M:%S"),
+        "承诺时间": "",
+        "完成时间": completed,
+        "工单状态": rng.choice(["成功", "失败", "处理中"], size),
+    })
+
+
+def events_frame(rng, size):
+    start = random_times(rng, size)
+    end = start + pd.to_timedelta(rng.integers(60, 3 * 86_400, size), unit="s")
+    return pd.DataFrame({
+        "区县": rng.choice(DISTRICTS, size),
+        "电路编号": [f"C{i:03d}" for i in rng.integers(0, 40, size)],
+        "开始时间": start.strftime("%Y-%m-%d %H:%M:%S"),
+        "结束时间": pd.Series(end.strftime("%Y-%m-%d %H:%M:%S")).where(rng.random(size) < 0.9, ""),
+        "是否AAA": rng.choice(["是", "否"], size),
+    })
+
+
+def full_summaries(folder, clock=NOW):
+    """对照：读取目录中全部文件后一次汇总"""
+    grouped = {}
+    for path in sorted(folder.iterdir()):
+        for kind, (pattern, schema) in WATCH_KINDS.items():
+            if path.match(pattern):
+                grouped.setdefault(kind, []).append(parse_export(str(path), schema))
+    records = {kind: concat_rows(frames) for kind, frames in grouped.items()}
+    return summarize_period(records, pd.Period(clock, freq="M"), now=clock)
+
+
+def assert_same(snapshot, expected):
+    assert set(snapshot["summaries"]) == set(expected)
+    for kind, summary in expected.items():
+        pd.testing.assert_frame_equal(snapshot["summaries"][kind].sort_index(), summary.sort_index(),
+                                      check_index_type=False, check_dtype=False)
+
+
+@pytest.fixture
+def folder(tmp_path):
+    rng = np.random.default_rng(0)
+    for day in (1, 2):
+        tickets_frame(rng, 300).to_csv(tmp_path / f"投诉工单_{day}.csv", index=False)
+        orders_frame(rng, 300).to_csv(tmp_path / f"交付工单_{day}.csv", index=False)
+        events_frame(rng, 200).to_csv(tmp_path / f"退服事件_{day}.csv", index=False)
+    (tmp_path / "说明.txt").write_text("不是导出文件", encoding="utf-8")
+    return tmp_path
+
+
+def test_poll_matches_full_summary(folder):
+    watcher = FolderWatcher(str(folder), settle=0, clock=lambda: NOW)
+    assert watcher.poll() == 6
+    snapshot = watcher.snapshot()
+    assert snapshot["period"] == pd.Period("2026-03", freq="M")
+    assert snapshot["files"]["tickets"] == ["投诉工单_1.csv", "投诉工单_2.csv"]
+    assert_same(snapshot, full_summaries(folder))
+
+    # 没有变化时不重新解析
+    version = watcher.version
+    assert watcher.poll() == 0
+    assert watcher.version == version
+
+
+def test_modified_and_removed_files(folder):
+    watcher = FolderWatcher(str(folder), settle=0, clock=lambda: NOW)
+    watcher.poll()
+
+    rng = np.random.default_rng(1)
+    tickets_frame(rng, 500).to_csv(folder / "投诉工单_1.csv", index=False)
+    orders_frame(rng, 100).to_csv(folder / "交付工单_3.csv", index=False)
+    assert watcher.poll() == 2
+    assert_same(watcher.snapshot(), full_summaries(folder))
+
+    for name in ("投诉工单_2.csv", "交付工单_1.csv", "退服事件_1.csv", "退服事件_2.csv"):
+        (folder / name).unlink()
+    assert watcher.poll() == 0
+    snapshot = watcher.snapshot()
+    assert "events" not in snapshot["summaries"]
+    assert snapshot["files"]["orders"] == ["交付工单_2.csv", "交付工单_3.csv"]
+    assert_same(snapshot, full_summaries(folder))
+
+
+def test_only_current_period_is_kept(folder):
+    clock = {"now": NOW}
+    watcher = FolderWatcher(str(folder), settle=0, clock=lambda: clock["now"])
+    watcher.poll()
+    for kind, counts, rows in watcher._parts.values():
+        if kind == "tickets":
+            assert (rows["受理时间"] >= pd.Timestamp("2026-03-01")).all()
+        if kind == "orders":
+            assert rows["完成时间"].isna().all()  # 已完成的工单只保留计数
+
+    # 进入下一考核期：上一考核期的记录全部丢弃，各文件按新考核期重新读取
+    clock["now"] = pd.Timestamp("2026-04-02")
+    assert watcher.poll() == 6
+    snapshot = watcher.snapshot()
+    assert snapshot["period"] == pd.Period("2026-04", freq="M")
+    assert all(len(rows) == 0 for kind, _, rows in watcher._parts.values() if kind != "events")
+    assert snapshot["summaries"]["tickets"]["投诉次数"].sum() == 0
+    assert_same(snapshot, full_summaries(folder, clock["now"]))
+
+
+def test_errors_reported_per_file(folder):
+    (folder / "投诉工单_坏.csv").write_text("区县,受理时间\n城区,2026-03-02\n", encoding="utf-8")
+    pd.DataFrame({
+        "区县": ["城区", "东区"], "电路编号": ["C1", "C2"],
+        "受理时间": ["2026-03-02 08:00", "不是时间"], "是否解决": ["是", "否"],
+    }).to_csv(folder / "投诉工单_3.csv", index=False)
+    watcher = FolderWatcher(str(folder), settle=0, clock=lambda: NOW)
+    watcher.poll()
+    errors = watcher.errors()
+    assert set(errors) == {str(folder / "投诉工单_坏.csv"), str(folder / "投诉工单_3.csv")}
+    assert "1 个取值无法解析" in errors[str(folder / "投诉工单_3.csv")]
+    assert "投诉工单_坏.csv" not in watcher.snapshot()["files"]["tickets"]
+
+    (folder / "投诉工单_坏.csv").unlink()
+    watcher.poll()
+    assert set(watcher.errors()) == {str(folder / "投诉工单_3.csv")}
+
+
+def test_errors_cleared_on_period_rollover(folder):
+    clock = {"now": NOW}
+    (folder / "投诉工单_坏.csv").write_text("区县,受理时间\n城区,2026-03-02\n", encoding="utf-8")
+    watcher = FolderWatcher(str(folder), settle=0, clock=lambda: clock["now"])
+    watcher.poll()
+    assert set(watcher.errors()) == {str(folder / "投诉工单_坏.csv")}
+
+    # 进入下一考核期的同一次扫描中文件被删除，旧错误不再保留
+    clock["now"] = pd.Timestamp("2026-04-02")
+    (folder / "投诉工单_坏.csv").unlink()
+    watcher.poll()
+    assert watcher.errors() == {}
+
+
+def test_tickets_without_resolved_column(folder):
+    rng = np.random.default_rng(2)
+    tickets_frame(rng, 300).drop(columns="是否解决").to_csv(folder / "投诉工单_3.csv", index=False)
+    watcher = FolderWatcher(str(folder), settle=0, clock=lambda: NOW)
+    watcher.poll()
+    assert watcher.errors() == {}
+    summary = watcher.snapshot()["summaries"]["tickets"]
+    assert summary["投诉次数"].sum() == full_summaries(folder)["tickets"]["投诉次数"].sum()
+    # 部分文件没有解决标识列时不统计解决率
+    assert summary["重复故障解决率(%)"].isna().all()
+
+    for day in (1, 2):
+        (folder / f"投诉工单_{day}.csv").unlink()
+    watcher.poll()
+    assert_same(watcher.snapshot(), full_summaries(folder))
@@ -0,0 +1,323 @@
+import fnmatch
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from complaints import count_complaints, detect_repeats, ticket_schema
+from delivery import order_schema, summarize_delivery
+from exports import export_columns, iter_export_chunks
+from outages import event_schema, summarize_outages
+from schema import compact_frame, concat_compact, unparsed_message
+
+# --------------------------
+# 监控目录后台导入（不依赖 streamlit）
+# 后台线程定时扫描共享目录，只解析新增或变化的导出文件；每个文件只保留对当前考核期的贡献：
+# 可按区县累加的计数（投诉次数、已完成交付工单的各项计数）计入累计值，只有跨文件汇总必需的
+# 考核期内记录（重复故障查找、未完成工单的超时判断、退服区间合并）才按文件保留。
+# 文件变化时从累计值中减去旧计数、加上新计数，只重新汇总有变化的记录类型；页面直接读取汇总结果
+# --------------------------
+
+# 监控目录及扫描间隔（秒），可通过环境变量 SCORE_WATCH_DIR、SCORE_WATCH_INTERVAL 指定
+DEFAULT_WATCH_DIR = os.environ.get("SCORE_WATCH_DIR")
+DEFAULT_POLL_SECONDS = float(os.environ.get("SCORE_WATCH_INTERVAL", "30"))
+
+# 文件最后修改后至少经过的秒数，避免读取正在写入的文件
+SETTLE_SECONDS = 5
+
+# 导出文件扩展名
+EXPORT_EXTENSIONS = (".csv", ".xlsx", ".xlsm")
+
+# 记录类型 -> (文件名匹配模式, 紧凑列类型)，列名为各导入功能的默认列名
+WATCH_KINDS = {
+    "tickets": ("*投诉*", ticket_schema(resolved_col="是否解决")),
+    "orders": ("*交付*", order_schema()),
+    "events": ("*退服*", event_schema()),
+}
+
+# 可选列：导出文件没有该列时不读取。投诉工单没有解决标识列时不统计重复故障解决率（与上传导入时不填解决标识列相同）
+OPTIONAL_COLUMNS = {"是否解决"}
+
+# 交付汇总中可按文件累加的计数列，及时率、成功率由累计的计数计算
+DELIVERY_COUNTS = ["工单数", "应完成工单数", "按时完成工单数", "已结束工单数", "成功工单数"]
+
+
+def file_kind(name, kinds=WATCH_KINDS):
+    """按文件名判断记录类型，不是导出文件或不匹配任何类型时返回 None"""
+    if os.path.splitext(name)[1].lower() not in EXPORT_EXTENSIONS:
+        return None
+    for kind, (pattern, _) in kinds.items():
+        if fnmatch.fnmatch(name, pattern):
+            return kind
+    return None
+
+
+def parse_export(path, schema, optional=OPTIONAL_COLUMNS):
+    """逐块读取导出文件中 schema 列出的列并转为紧凑列类型，文件中没有的可选列不读取"""
+    header = set(export_columns(path))
+    columns = [column for column in schema if column and (column in header or column not in optional)]
+    schema = {column: schema[column] for column in columns}
+    chunks = [compact_frame(chunk, schema) for chunk in iter_export_chunks(path, columns=columns)]
+    if not chunks:
+        return compact_frame(pd.DataFrame({column: pd.Series([], dtype="string") for column in columns}), schema)
+    return concat_compact(chunks)
+
+
+def concat_rows(frames):
+    """拼接各文件的记录，只保留各文件共有的列（部分文件缺少可选列时该列不参与汇总）"""
+    frames = list(frames)
+    shared = [column for column in frames[0].columns if all(column in frame.columns for frame in frames[1:])]
+    return concat_compact(frame[shared] for frame in frames)
+
+
+def period_bounds(period):
+    """考核期（月）的起止时间 [start, end)"""
+    period = pd.Period(period, freq="M")
+    return period.start_time, (period + 1).start_time
+
+
+def period_rows(kind, frame, period):
+    """属于考核期的记录：投诉按受理时间、交付工单按创建时间落在考核期内（与上传当月导出文件相同），
+    退服事件与考核期有交集（未结束的事件结束时间为 OPEN_END；结束时间无法解析的事件不计入）"""
+    start, end = period_bounds(period)
+    if kind == "tickets":
+        keep = (frame["受理时间"] >= start) & (frame["受理时间"] < end)
+    elif kind == "orders":
+        keep = (frame["创建时间"] >= start) & (frame["创建时间"] < end)
+    else:
+        keep = (frame["开始时间"] < end) & (frame["结束时间"] > start)
+    return frame[keep.to_numpy(dtype=bool)].reset_index(drop=True)
+
+
+def file_part(kind, frame, period):
+    """一个文件对考核期汇总的贡献：(可累加的各区县计数, 须跨文件汇总的考核期内记录)
+
+    投诉次数按区县累加，重复故障须在全部文件的投诉中按电路查找，保留考核期内的投诉；
+    已完成的交付工单计数与截至时间无关，按区县累加，只保留未完成的工单（汇总时按截至时间判断是否超时）；
+    退服事件须按电路合并区间，没有可累加的计数（为 None），保留与考核期有交集的事件。
+    """
+    rows = period_rows(kind, frame, period)
+    if kind == "tickets":
+        counts = pd.Series(count_complaints([rows]), dtype="int64")
+        return pd.DataFrame({"投诉次数": counts}).rename_axis("区县"), rows
+    if kind == "orders":
+        completed = rows["完成时间"].notna().to_numpy(dtype=bool)
+        counts = summarize_delivery(rows[completed], as_of=period_bounds(period)[1])[DELIVERY_COUNTS]
+        return counts, rows[~completed].reset_index(drop=True)
+    return None, rows
+
+
+def add_counts(totals, counts, sign=1):
+    """累计计数加上（sign=-1 时减去）一个文件的计数，去掉各项计数全为 0 的区县"""
+    if counts is None:
+        return totals
+    if totals is None:
+        totals = counts.iloc[:0]
+    merged = totals.add(counts * sign, fill_value=0).astype("int64")
+    return merged[(merged != 0).any(axis=1)]
+
+
+def kind_summary(kind, counts, rows, period, now, line_counts=None):
+    """由累计计数和考核期内记录汇总一种记录类型的各区县数据
+
+    交付及时率截至考核期末与 now 中较早者；退服事件由 summarize_outages 截取到考核期内。
+    """
+    start, end = period_bounds(period)
+    if kind == "tickets":
+        repeats, _ = detect_repeats(rows, resolved_col="是否解决" if "是否解决" in rows.columns else None)
+        complaints = counts["投诉次数"]
+        summary = repeats.reindex(repeats.index.union(complaints.index))
+        summary["投诉次数"] = complaints.reindex(summary.index).fillna(0).astype("int64")
+        summary["重复故障数"] = summary["重复故障数"].fillna(0).astype("int64")
+        summary["重复投诉"] = summary["重复投诉"].fillna(False).astype(bool)
+        summary.index.name = "区县"
+        return summary
+    if kind == "orders":
+        pending = summarize_delivery(rows, as_of=min(now, end))[DELIVERY_COUNTS]
+        totals = add_counts(counts, pending)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ontime_rate = np.round(totals["按时完成工单数"] / totals["应完成工单数"] * 100, 2)
+            success_rate = np.round(totals["成功工单数"] / totals["已结束工单数"] * 100, 2)
+        summary = totals.copy()
+        summary.insert(3, "及时率(%)", ontime_rate)
+        summary["成功率(%)"] = success_rate
+        return summary.sort_index()
+    return summarize_outages(rows, start, end, line_counts=line_counts)
+
+
+def summarize_period(records, period, now=None, line_counts=None):
+    """汇总一个考核期（月）各区县的数据，records 为 {记录类型: 紧凑列类型的记录}
+
+    与 FolderWatcher 逐文件累计的结果相同（全部记录视为一个文件），
+    返回 {记录类型: 各区县汇总表}，投诉汇总在重复故障统计外另含“投诉次数”列。
+    """
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    summaries = {}
+    for kind, frame in records.items():
+        counts, rows = file_part(kind, frame, period)
+        summaries[kind] = kind_summary(kind, counts, rows, period, now, line_counts=line_counts)
+    return summaries
+
+
+class FolderWatcher:
+    """监控目录的后台导入
+
+    poll() 扫描一次目录：解析新增或变化（大小、修改时间不同）的文件，删除的文件从累计值中减去其计数，
+    只重新汇总有变化的记录类型（交付及时率随时间变化，每次汇总都重新计算）；考核期变化时
+    丢弃上一考核期的全部数据，按新考核期重新读取各文件。start() 启动后台线程按 interval 秒定时调用 poll()。
+    同名文件重新导出时替换原计数，不会重复计数。汇总结果通过 snapshot() 读取，version 在每次汇总更新后加一；
+    各文件的错误和提示通过 errors() 读取。
+    """
+
+    def __init__(self, folder, interval=DEFAULT_POLL_SECONDS, settle=SETTLE_SECONDS, kinds=WATCH_KINDS,
+                 line_counts=None, clock=None):
+        self.folder = folder
+        self.interval = interval
+        self.settle = settle
+        self.kinds = kinds
+        self.line_counts = line_counts
+        self.clock = clock or pd.Timestamp.now
+        self.version = 0
+        self._errors = {}     # 路径 -> 错误或提示文字，后台线程写入、页面读取，由 _lock 保护
+        self._files = {}      # 路径 -> (大小, 修改时间)
+        self._parts = {}      # 路径 -> (记录类型, 可累加的计数, 考核期内须保留的记录)
+        self._totals = {}     # 记录类型 -> 各文件计数之和
+        self._summaries = {}  # 记录类型 -> 各区县汇总表
+        self._period = None
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _scan(self):
+        """目录中匹配的导出文件：路径 -> (记录类型, 大小, 修改时间)"""
+        found = {}
+        for entry in os.scandir(self.folder):
+            kind = file_kind(entry.name, self.kinds)
+            if kind is not None and entry.is_file():
+                stat = entry.stat()
+                found[entry.path] = (kind, stat.st_size, stat.st_mtime_ns)
+        return found
+
+    def _set_error(self, key, message):
+        """记录（message 为空时清除）一个文件或监控目录的错误、提示"""
+        with self._lock:
+            if message:
+                self._errors[key] = message
+            else:
+                self._errors.pop(key, None)
+
+    def errors(self):
+        """各文件（及监控目录本身）的错误和提示：{路径: 文字}（副本）"""
+        with self._lock:
+            return dict(self._errors)
+
+    def _drop(self, path):
+        """从累计值中减去一个文件的计数并丢弃其记录，返回其记录类型（没有时为 None）"""
+        part = self._parts.pop(path, None)
+        if part is None:
+            return None
+        kind, counts, _ = part
+        self._totals[kind] = add_counts(self._totals.get(kind), counts, -1)
+        return kind
+
+    def _add(self, path, kind, counts, rows):
+        self._parts[path] = (kind, counts, rows)
+        self._totals[kind] = add_counts(self._totals.get(kind), counts)
+
+    def poll(self):
+        """扫描一次目录并更新汇总，返回本次解析的文件数"""
+        now = time.time_ns()
+        period = pd.Period(self.clock(), freq="M")
+        if period != self._period:
+            # 上一考核期的计数、记录和各文件的错误全部丢弃，各文件在下面按新考核期重新读取
+            self._files.clear()
+            self._parts.clear()
+            self._totals.clear()
+            self._summaries.clear()
+            with self._lock:
+                self._errors = {key: message for key, message in self._errors.items() if key == self.folder}
+            self._period = period
+
+        found = self._scan()
+        dirty = set()
+        for path in [path for path in self._files if path not in found]:
+            del self._files[path]
+            dirty.add(self._drop(path))
+            self._set_error(path, None)
+
+        parsed = 0
+        for path, (kind, size, mtime) in sorted(found.items()):
+            if self._files.get(path) == (size, mtime) or now - mtime < self.settle * 1e9:
+                continue
+            self._files[path] = (size, mtime)
+            self._drop(path)
+            dirty.add(kind)
+            try:
+                frame = parse_export(path, self.kinds[kind][1])
+            except (OSError, ValueError, KeyError) as e:
+                self._set_error(path, str(e))
+            else:
+                self._add(path, kind, *file_part(kind, frame, period))
+                self._set_error(path, unparsed_message(frame))  # 文件已导入，只提示无法解析的时间
+            parsed += 1
+
+        dirty.discard(None)
+        if dirty or self._snapshot is None or self._snapshot["period"] != period:
+            self._refresh(period, dirty)
+        return parsed
+
+    def _refresh(self, period, dirty):
+        """重新汇总有变化的记录类型及交付工单（及时率截至当前时间）"""
+        now = self.clock()
+        grouped = {}
+        for path, (kind, _, rows) in sorted(self._parts.items()):
+            grouped.setdefault(kind, []).append((path, rows))
+        for kind in list(self._summaries):
+            if kind not in grouped:
+                del self._summaries[kind]
+        for kind, parts in grouped.items():
+            if kind in dirty or kind == "orders" or kind not in self._summaries:
+                rows = concat_rows(rows for _, rows in parts)
+                self._summaries[kind] = kind_summary(kind, self._totals.get(kind), rows, period, now,
+                                                     line_counts=self.line_counts)
+        snapshot = {
+            "period": period,
+            "updated": now,
+            "files": {kind: [os.path.basename(path) for path, _ in grouped.get(kind, [])] for kind in self.kinds},
+            "summaries": dict(self._summaries),
+        }
+        with self._lock:
+            self._snapshot = snapshot
+            self.version += 1
+
+    def snapshot(self):
+        """最近一次汇总：{"period", "updated", "files", "summaries"}，尚未汇总时为 None"""
+        with self._lock:
+            return self._snapshot
+
+    def start(self):
+        """启动后台线程（守护线程，随进程退出），已启动时不重复启动"""
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="score-folder-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            try:
+                self.poll()
+                self._set_error(self.folder, None)
+            except Exception as e:  # 后台线程不能因个别异常退出（如目录暂时不可访问），下次扫描时重试
+                self._set_error(self.folder, str(e))
+            if self._stop.wait(self.interval):
+                return